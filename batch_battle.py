@@ -0,0 +1,386 @@
+"""
+Vectorised battle engine that runs many independent battles at once.
+
+Every battle is stored as struct-of-arrays state: the stats and current HP of
+each monster slot, the team containers of both sides (as arrays of slot ids)
+and the monster currently out. A single call to `BatchBattle.step` advances
+every live battle by one turn, reproducing `Battle.process_turn` exactly.
+The stats of catalog species in simple mode are taken from columns built once
+per catalog, so loading a battle only reads the HP and species of each monster.
+
+On `benchmarks/bench_batch_battle.py` this runs about 6-8x more battles per
+second than `Battle` on one core, not 10x. Loading still has to read every
+team's container and monsters one Python object at a time, about 7us per team
+against about 150us for a whole scalar battle, and that load is about three
+quarters of the batch time. Even with free turns the load alone would cap the
+speedup near 10x. Getting past that needs teams that are stored as arrays in
+the first place, not a faster loader.
+
+Usage:
+```
+engine = BatchBattle()
+results = engine.battle_many([(team1, team2), (team3, team4)])
+```
+"""
+from __future__ import annotations
+
+from operator import attrgetter
+from typing import Optional
+
+import numpy as np
+
+import helpers
+from battle import Battle
+from policy import AttackPolicy, Policy
+from team import MonsterTeam
+
+FRONT = MonsterTeam.TeamMode.FRONT.value
+BACK = MonsterTeam.TeamMode.BACK.value
+OPTIMISE = MonsterTeam.TeamMode.OPTIMISE.value
+LEVEL = MonsterTeam.SortMode.LEVEL.value
+
+ATTACK = Battle.Action.ATTACK.value
+SPECIAL = Battle.Action.SPECIAL.value
+
+# _value_ is what Enum.value returns, without going through the enum descriptor.
+_TEAM_MODE = attrgetter("team_mode._value_")
+_SORT_MODE = attrgetter("sort_mode._value_")
+_ASCEN = attrgetter("ascen")
+_HP = attrgetter("hp")
+_SIMPLE_MODE_SLOT = attrgetter("_simple_mode")
+
+UNDECIDED = 0
+RESULTS = {result.value: result for result in Battle.Result}
+
+
+def _team_contents(team: MonsterTeam) -> tuple[list, Optional[list]]:
+    """
+    Returns the monsters of a team in container storage order, together with
+    their sort keys when the team is in OPTIMISE mode.
+    Storage order is bottom to top for stacks and front to rear for queues.
+    """
+    container = team.team
+    mode = _TEAM_MODE(team)
+    length = container.length
+    array = container.array.array
+    if mode == FRONT:
+        return array[:length], None
+    elif mode == BACK:
+        front = container.front
+        if front + length <= len(array):
+            return array[front:front + length], None
+        return (array[front:] + array[:front])[:length], None
+    items = array[:length]
+    return [item.value for item in items], [item.key for item in items]
+
+
+class _SpeciesRows(dict):
+    """Species -> row in the species columns, and -1 for any class that is not in the catalog."""
+
+    def __missing__(self, species: type) -> int:
+        return -1
+
+
+# (catalog, _SpeciesRows, (number of species, 3) array of simple attack, defense and speed)
+_species_columns = None
+
+
+def _catalog_columns() -> tuple[_SpeciesRows, np.ndarray]:
+    """
+    The simple (attack, defense, speed) of every catalog species as one array, and the row of each species in it.
+    Built once per catalog, so loading a battle only looks each monster's species up.
+    """
+    # n = number of species
+    # O(n) when the catalog changed, O(1) otherwise
+    global _species_columns
+    catalog = helpers.get_all_monsters()
+    if _species_columns is None or _species_columns[0] is not catalog:
+        rows = _SpeciesRows()
+        stats = np.empty((len(catalog), 3))
+        for i in range(len(catalog)):
+            rows[catalog[i]] = i
+            simple = catalog[i].get_simple_stats()
+            stats[i] = (simple.get_attack(), simple.get_defense(), simple.get_speed())
+        _species_columns = (catalog, rows, stats)
+    return _species_columns[1], _species_columns[2]
+
+
+class _BatchSide:
+    """
+    Struct-of-arrays state for one side of every battle in the batch.
+
+    Row b holds battle b. Monsters are stored in slots 0..width-1 and the team
+    container is an array of slot ids: a stack (FRONT), a ring buffer starting
+    at `front` (BACK) or a list kept sorted by `keys` (OPTIMISE).
+    """
+
+    def __init__(self, teams: list[MonsterTeam], policy: Optional[Policy]) -> None:
+        n = len(teams)
+        team_policies = [team.resolve_policy() for team in teams] if policy is None else [policy] * n
+        # Rows sharing a policy are decided together with one decide_many call.
+        policies = {}
+        self.policy_ids = np.array([policies.setdefault(p, len(policies)) for p in team_policies], dtype=np.int64)
+        for team_policy in policies:
+            if not team_policy.can_decide_many():
+                raise ValueError("BatchBattle only supports policies that implement decide_many.")
+        contents = [_team_contents(team) for team in teams]
+        monsters = [monster for team_monsters, _ in contents for monster in team_monsters]
+        keys = [key for _, team_keys in contents if team_keys is not None for key in team_keys]
+        sizes = np.array([len(team_monsters) for team_monsters, _ in contents], dtype=np.int64)
+        if n > 0 and sizes.min() == 0:
+            raise ValueError("Cannot battle with an empty team.")
+        self.length = sizes.copy()
+        self.mode = np.array(list(map(_TEAM_MODE, teams)), dtype=np.int64)
+        self.sort_mode = np.array(list(map(_SORT_MODE, teams)), dtype=np.int64)
+        self.ascen = np.array(list(map(_ASCEN, teams)), dtype=bool)
+        self.width = width = max(MonsterTeam.TEAM_LIMIT, int(sizes.max(initial=0)))
+
+        # Slot of every monster: team b's monsters fill slots 0..size-1 of row b.
+        starts = np.cumsum(sizes) - sizes
+        positions = np.repeat(np.arange(n, dtype=np.int64) * width - starts, sizes) + np.arange(len(monsters))
+
+        # Monsters of a catalog species in simple mode take their stats from the species columns.
+        # Any other monster (complex mode, a class that is not in the catalog) is read one by one.
+        species_rows, species_stats = _catalog_columns()
+        rows = np.fromiter(map(species_rows.__getitem__, map(type, monsters)), dtype=np.int64, count=len(monsters))
+        if rows.min(initial=0) >= 0:
+            # Every monster is an instance of a catalog species, whose getters just read these slots.
+            hps = list(map(_HP, monsters))
+            simple = np.fromiter(map(_SIMPLE_MODE_SLOT, monsters), dtype=bool, count=len(monsters))
+        else:
+            hps = [monster.get_hp() for monster in monsters]
+            simple = np.array([monster.simple_mode for monster in monsters], dtype=bool)
+        rows[~simple] = -1
+        stats = species_stats[rows]
+        for i in np.nonzero(rows < 0)[0].tolist():
+            monster = monsters[i]
+            stats[i] = (monster.get_attack(), monster.get_defense(), monster.get_speed())
+
+        self.attack, self.defense, self.speed, self.hp, self.level, self.keys = (np.zeros((n, width)) for _ in range(6))
+        self.attack.flat[positions] = stats[:, 0]
+        self.defense.flat[positions] = stats[:, 1]
+        self.speed.flat[positions] = stats[:, 2]
+        self.hp.flat[positions] = hps
+        optimise = self.mode == OPTIMISE
+        self.keys.flat[positions[np.repeat(optimise, sizes)]] = keys
+        # Levels only decide the order of OPTIMISE teams sorted by level.
+        by_level = np.nonzero(np.repeat(optimise & (self.sort_mode == LEVEL), sizes))[0]
+        self.level.flat[positions[by_level]] = [monsters[i].get_level() for i in by_level.tolist()]
+        self.order = np.tile(np.arange(width, dtype=np.int64), (n, 1))
+        self.front = np.zeros(n, dtype=np.int64)
+        self.out = np.zeros(n, dtype=np.int64)
+        self.policies = list(policies)
+
+    def choose_attack(self, rows: np.ndarray, enemy: _BatchSide) -> np.ndarray:
+        """
+        Decides the action of the given rows with `Policy.decide_many`.
+        Returns True where the side attacks and False where it swaps.
+        """
+        mine = rows * self.width + self.out[rows]
+        theirs = rows * enemy.width + enemy.out[rows]
+        states = np.column_stack((
+            self.speed.take(mine), self.hp.take(mine), enemy.speed.take(theirs), enemy.hp.take(theirs),
+        ))
+        if len(self.policies) == 1:
+            actions = self.policies[0].decide_many(states)
+        else:
+            actions = np.empty(len(rows), dtype=np.int64)
+            ids = self.policy_ids[rows]
+            for policy_id, policy in enumerate(self.policies):
+                chosen = ids == policy_id
+                if chosen.any():
+                    actions[chosen] = policy.decide_many(states[chosen])
+        if np.any(actions == SPECIAL):
+            raise ValueError("BatchBattle does not support the SPECIAL action.")
+        return actions == ATTACK
+
+    def retrieve(self, rows: np.ndarray) -> np.ndarray:
+        """Vectorised `MonsterTeam.retrieve_from_team`. Returns the retrieved slot of each row."""
+        slots = np.empty(len(rows), dtype=np.int64)
+        mode = self.mode[rows]
+
+        mask = mode == FRONT
+        r = rows[mask]
+        self.length[r] -= 1
+        slots[mask] = self.order.take(r * self.width + self.length[r])
+
+        mask = mode == BACK
+        r = rows[mask]
+        slots[mask] = self.order.take(r * self.width + self.front[r])
+        self.front[r] = (self.front[r] + 1) % self.width
+        self.length[r] -= 1
+
+        mask = mode == OPTIMISE
+        r = rows[mask]
+        slots[mask] = self.order[r, 0]
+        self.order[r, :-1] = self.order[r, 1:]
+        self.keys[r, :-1] = self.keys[r, 1:]
+        self.length[r] -= 1
+        return slots
+
+    def add(self, rows: np.ndarray, slots: np.ndarray) -> None:
+        """Vectorised `MonsterTeam.add_to_team` of the given slot into each row's container."""
+        mode = self.mode[rows]
+
+        mask = mode == FRONT
+        r = rows[mask]
+        self.order[r, self.length[r]] = slots[mask]
+        self.length[r] += 1
+
+        mask = mode == BACK
+        r = rows[mask]
+        self.order[r, (self.front[r] + self.length[r]) % self.width] = slots[mask]
+        self.length[r] += 1
+
+        mask = mode == OPTIMISE
+        if mask.any():
+            self._add_sorted(rows[mask], slots[mask])
+
+    def _add_sorted(self, rows: np.ndarray, slots: np.ndarray) -> None:
+        """Inserts into sorted containers, mirroring `ArraySortedList._index_to_add` including ties."""
+        sort_mode = self.sort_mode[rows]
+        stat = self.level[rows, slots]
+        for mode, table in (
+            (MonsterTeam.SortMode.HP.value, self.hp),
+            (MonsterTeam.SortMode.ATTACK.value, self.attack),
+            (MonsterTeam.SortMode.DEFENSE.value, self.defense),
+            (MonsterTeam.SortMode.SPEED.value, self.speed),
+        ):
+            mask = sort_mode == mode
+            stat[mask] = table[rows[mask], slots[mask]]
+        key = np.where(self.ascen[rows], stat, -stat)
+
+        # Binary search, run in lockstep for every row.
+        low = np.zeros(len(rows), dtype=np.int64)
+        high = self.length[rows] - 1
+        position = np.full(len(rows), -1, dtype=np.int64)
+        active = low <= high
+        while active.any():
+            a = np.nonzero(active)[0]
+            mid = (low[a] + high[a]) // 2
+            mid_key = self.keys[rows[a], mid]
+            less = mid_key < key[a]
+            greater = mid_key > key[a]
+            equal = ~(less | greater)
+            low[a[less]] = mid[less] + 1
+            high[a[greater]] = mid[greater] - 1
+            position[a[equal]] = mid[equal]
+            active[a[equal]] = False
+            active &= low <= high
+        position = np.where(position < 0, low, position)
+
+        # Shuffle right and insert.
+        columns = np.arange(self.width)[None, :]
+        at = position[:, None]
+        for table, value in ((self.order, slots), (self.keys, key)):
+            old = table[rows]
+            shifted = np.roll(old, 1, axis=1)
+            table[rows] = np.where(columns < at, old, np.where(columns == at, value[:, None], shifted))
+        self.length[rows] += 1
+
+
+class BatchBattle:
+    """
+    Runs N independent battles in lockstep, giving the same `Battle.Result`
+    per matchup as `Battle.battle`.
+
+    Teams are read but not modified. Every team's policy must implement
+    `Policy.decide_many` and only choose ATTACK or SWAP, so a choose_action
+    assigned to a team is not supported. If `always_attack` is set, every team
+    uses `AttackPolicy` instead of its own policy.
+
+    Battles still running after `max_turns` turns (for example both teams
+    swapping forever, which would never finish in `Battle.battle`) are
+    reported as None. Use max_turns=None for no limit.
+    """
+
+    def __init__(self, max_turns: Optional[int] = 10000, always_attack: bool = False) -> None:
+        self.max_turns = max_turns
+        self.always_attack = always_attack
+
+    def load(self, pairs: list[tuple[MonsterTeam, MonsterTeam]]) -> None:
+        """Loads the current state of every (team1, team2) matchup and sends out the first monsters."""
+        policy = AttackPolicy() if self.always_attack else None
+        self.side1 = _BatchSide([t1 for t1, _ in pairs], policy)
+        self.side2 = _BatchSide([t2 for _, t2 in pairs], policy)
+        self.results = np.full(len(pairs), UNDECIDED, dtype=np.int64)
+        self.turn_number = 0
+        rows = np.arange(len(pairs))
+        self.side1.out[:] = self.side1.retrieve(rows)
+        self.side2.out[:] = self.side2.retrieve(rows)
+
+    def live(self) -> np.ndarray:
+        """Indices of the battles that are not decided yet."""
+        return np.nonzero(self.results == UNDECIDED)[0]
+
+    def step(self) -> int:
+        """
+        Process a single turn of every live battle.
+        Returns the number of battles still live after the turn.
+        """
+        s1 = self.side1
+        s2 = self.side2
+        rows = self.live()
+        attack1 = s1.choose_attack(rows, s2)
+        attack2 = s2.choose_attack(rows, s1)
+
+        # Team 1 swapping takes priority over team 2 swapping.
+        r = rows[~attack1]
+        s1.add(r, s1.out[r])
+        s1.out[r] = s1.retrieve(r)
+        r = rows[attack1 & ~attack2]
+        s2.add(r, s2.out[r])
+        s2.out[r] = s2.retrieve(r)
+
+        rows = rows[attack1 & attack2]
+        # Flat indices of the monsters out, which are cheaper to gather with than (row, slot) pairs.
+        out1 = rows * s1.width + s1.out[rows]
+        out2 = rows * s2.width + s2.out[rows]
+        speed1 = s1.speed.take(out1)
+        speed2 = s2.speed.take(out2)
+        atk1 = s1.attack.take(out1)
+        atk2 = s2.attack.take(out2)
+        def1 = s1.defense.take(out1)
+        def2 = s2.defense.take(out2)
+
+        # Battle.calc_damage checks out1's attack against out2's defense in its second branch,
+        # whichever side is attacking.
+        middle = atk1 > def2
+        dmg1 = np.where(atk1 / 2 > def2, atk1 - def2, np.where(middle, (atk1 * 5 / 8) - (def2 / 4), atk1 / 4))
+        dmg2 = np.where(atk2 / 2 > def1, atk2 - def1, np.where(middle, (atk2 * 5 / 8) - (def1 / 4), atk2 / 4))
+
+        hits2 = speed1 >= speed2
+        hits1 = speed1 <= speed2
+        hp1 = s1.hp.reshape(-1)
+        hp2 = s2.hp.reshape(-1)
+        hp2[out2[hits2]] -= dmg1[hits2]
+        hp1[out1[hits1]] -= dmg2[hits1]
+        fainted1 = hits1 & (hp1.take(out1) <= 0)
+        fainted2 = hits2 & (hp2.take(out2) <= 0)
+        empty1 = s1.length[rows] <= 0
+        empty2 = s2.length[rows] <= 0
+
+        both = fainted1 & fainted2
+        self.results[rows[both & empty1 & empty2]] = Battle.Result.DRAW.value
+        self.results[rows[both & empty1 & ~empty2]] = Battle.Result.TEAM2.value
+        self.results[rows[both & ~empty1 & empty2]] = Battle.Result.TEAM1.value
+        self.results[rows[fainted2 & ~fainted1 & empty2]] = Battle.Result.TEAM1.value
+        self.results[rows[fainted1 & ~fainted2 & empty1]] = Battle.Result.TEAM2.value
+
+        r = rows[fainted1 & ~empty1 & ~(fainted2 & empty2)]
+        s1.out[r] = s1.retrieve(r)
+        r = rows[fainted2 & ~empty2 & ~(fainted1 & empty1)]
+        s2.out[r] = s2.retrieve(r)
+
+        self.turn_number += 1
+        return int(np.count_nonzero(self.results == UNDECIDED))
+
+    def battle_many(self, pairs: list[tuple[MonsterTeam, MonsterTeam]]) -> list[Optional[Battle.Result]]:
+        """Battles every (team1, team2) pair and returns the result of each, in order."""
+        if len(pairs) == 0:
+            return []
+        self.load(pairs)
+        remaining = len(pairs)
+        while remaining > 0 and (self.max_turns is None or self.turn_number < self.max_turns):
+            remaining = self.step()
+        return [RESULTS.get(code) for code in self.results.tolist()]
@@ -1,9 +1,16 @@
 from __future__ import annotations
+import math
+import time
 from enum import auto
-from typing import Optional
+from fractions import Fraction
+from typing import Iterator, Optional, TYPE_CHECKING
 
+import rulesets
 from base_enum import BaseEnum
-from team import MonsterTeam
+
+if TYPE_CHECKING:
+    from outcome_cache import OutcomeCache
+    from team import MonsterTeam
 
 
 class Battle:
@@ -17,8 +24,72 @@ class Battle:
         TEAM2 = auto()
         DRAW = auto()
 
-    def __init__(self, verbosity=0) -> None:
+    class TurnRecord:
+        """
+        What happened in one turn of a battle. See `Battle.iter_turns`.
+
+        :turn: The turn number, starting at 1.
+        :action1/action2: The action each team chose.
+        :attacker: Which team dealt damage: 0 for neither, 1 or 2, or 3 for both.
+        :damage1/damage2: The damage dealt by team 1's and team 2's monster.
+        :hp1/hp2: The HP after the turn of the monsters that started the turn out.
+        :fainted1/fainted2: Whether that monster fainted.
+        :swapped1/swapped2: Whether the team swapped its monster out (SWAP or SPECIAL).
+        :result: The battle result if the battle ended this turn, otherwise None.
+        """
+
+        __slots__ = (
+            "turn", "action1", "action2", "attacker", "damage1", "damage2",
+            "hp1", "hp2", "fainted1", "fainted2", "swapped1", "swapped2", "result",
+        )
+
+        def __init__(self) -> None:
+            for name in self.__slots__:
+                setattr(self, name, None)
+
+        def as_tuple(self) -> tuple:
+            """The record as a tuple, in the order of __slots__, for keeping it past the next turn."""
+            return tuple(getattr(self, name) for name in self.__slots__)
+
+    # Fast-forwarding only jumps when HP and damage are multiples of 2^-EXACT_BITS below EXACT_LIMIT,
+    # so that one subtraction of n * damage gives exactly the same float as n single-turn subtractions.
+    EXACT_BITS = 8
+    EXACT_LIMIT = 2 ** 40
+
+    def __init__(
+        self,
+        verbosity=0,
+        fast_forward=False,
+        max_turns: Optional[int] = None,
+        time_limit: Optional[float] = None,
+        detect_cycles=False,
+        outcome_cache: Optional[OutcomeCache] = None,
+        ruleset: Optional[str] = None,
+    ) -> None:
+        """
+        :verbosity: How much to print while battling.
+        :fast_forward: Whether to jump over attack-only exchanges in one step instead of
+            processing them turn by turn. See `skip_attack_exchange`.
+        :max_turns: Turn budget. A battle still going after this many turns is a DRAW.
+        :time_limit: Wall-clock budget in seconds. A battle still going after this long is a DRAW.
+        :detect_cycles: Whether to settle a battle as a DRAW once it returns to an earlier state.
+            Assumes both teams choose their actions deterministically.
+        :outcome_cache: An `OutcomeCache` to look matchups up in before battling them.
+            On a hit nothing is played, and `out1` and `out2` are None.
+        :ruleset: The name of a type effectiveness ruleset in `rulesets.registry` to multiply
+            damage by. None applies no type effectiveness.
+
+        After each battle, `stop_reason` is None if the battle finished normally,
+        otherwise one of "max_turns", "time_limit" or "cycle".
+        """
         self.verbosity = verbosity
+        self.fast_forward = fast_forward
+        self.max_turns = max_turns
+        self.time_limit = time_limit
+        self.detect_cycles = detect_cycles
+        self.outcome_cache = outcome_cache
+        self.ruleset = ruleset
+        self.effectiveness = None if ruleset is None else rulesets.registry.get(ruleset)
 
     def process_turn(self) -> Optional[Battle.Result]:
         """
@@ -28,8 +99,9 @@ class Battle:
         * remove fainted monsters and retrieve new ones.
         * return the battle result if completed.
         """
-        action1 = self.team1.choose_action(self.out1, self.out2)
-        action2 = self.team2.choose_action(self.out2, self.out1)
+        action1 = self.policy1.decide(self.out1, self.out2)
+        action2 = self.policy2.decide(self.out2, self.out1)
+        self.last_actions = (action1, action2)
         if action1 == Battle.Action.SWAP:
             self.team1.add_to_team(self.out1)
             self.out1 = self.team1.retrieve_from_team()
@@ -89,31 +161,220 @@ class Battle:
                         self.out1 = self.team1.retrieve_from_team()
 
     def calc_damage(self, attacker, defender) -> float:
-        if attacker.get_attack() / 2 > defender.get_defense():
-            dmg = attacker.get_attack() - defender.get_defense()
+        attack = attacker.get_attack()
+        defense = defender.get_defense()
+        if attack / 2 > defense:
+            dmg = attack - defense
         elif self.out1.get_attack() > self.out2.get_defense():
-            dmg = (attacker.get_attack() * 5 / 8) - (defender.get_defense() / 4)
+            dmg = (attack * 5 / 8) - (defense / 4)
         else:
-            dmg = attacker.get_attack() / 4
-        return dmg
+            dmg = attack / 4
+        ruleset = self.effectiveness
+        if ruleset is None:
+            return dmg
+        return dmg * ruleset.get_monster_effectiveness(attacker, defender)
 
-    def battle(self, team1: MonsterTeam, team2: MonsterTeam) -> Battle.Result:
-        if self.verbosity > 0:
-            print(f"Team 1: {team1} vs. Team 2: {team2}")
-        # Add any pregame logic here.
+    def skip_attack_exchange(self, limit: Optional[int] = None) -> int:
+        """
+        Jumps over the turns of an attack-only exchange in which no monster faints.
+
+        Both teams must be known to keep choosing ATTACK for the whole jump, and damage stays
+        the same while the same two monsters are out, so the HP after n turns is hp - n * damage.
+        The turn on which a monster faints (or a team stops attacking) is left to `process_turn`.
+        At most `limit` turns are skipped, if given.
+        Returns the number of turns skipped, which is 0 whenever a jump is not provably exact.
+        """
+        speed1 = self.out1.get_speed()
+        speed2 = self.out2.get_speed()
+        hp1 = self.out1.get_hp()
+        hp2 = self.out2.get_hp()
+        loss1 = self.calc_damage(self.out2, self.out1) if speed1 <= speed2 else 0
+        loss2 = self.calc_damage(self.out1, self.out2) if speed1 >= speed2 else 0
+        for value in (hp1, hp2, loss1, loss2):
+            exact = Fraction(value)
+            if exact.denominator > 2 ** self.EXACT_BITS or abs(exact) >= self.EXACT_LIMIT:
+                return 0
+
+        limits = [
+            limit,
+            self.policy1.attack_horizon(self.out1, self.out2, loss1, loss2),
+            self.policy2.attack_horizon(self.out2, self.out1, loss2, loss1),
+        ]
+        for hp, loss in ((hp1, loss1), (hp2, loss2)):
+            if loss > 0:
+                # Turns that can pass with HP still above 0 afterwards.
+                limits.append(max(0, math.ceil(Fraction(hp) / Fraction(loss)) - 1))
+        limits = [bound for bound in limits if bound is not None]
+        if len(limits) == 0:
+            # Nobody ever loses HP and nobody ever stops attacking, so the exchange never ends.
+            return 0
+        turns = min(limits)
+        if turns <= 0 or turns * max(loss1, loss2) >= self.EXACT_LIMIT:
+            return 0
+        if loss1 != 0:
+            self.out1.set_hp(hp1 - turns * loss1)
+        if loss2 != 0:
+            self.out2.set_hp(hp2 - turns * loss2)
+        return turns
+
+    def state_key(self) -> tuple:
+        """A hashable summary of the battle: the monsters out, their HP and both teams."""
+        return (
+            id(self.out1), self.out1.get_hp(),
+            id(self.out2), self.out2.get_hp(),
+            self.team1.state_key(), self.team2.state_key(),
+        )
+
+    def snapshot(self) -> tuple:
+        """
+        Captures the monsters out, their HP, the turn number and both teams in O(team size),
+        without copying any monster. See `restore`.
+        """
+        return (
+            self.turn_number,
+            self.out1, self.out1.get_hp(),
+            self.out2, self.out2.get_hp(),
+            self.team1.snapshot(), self.team2.snapshot(),
+        )
+
+    def restore(self, snapshot: tuple) -> None:
+        """Puts the battle back in the state captured by `snapshot`."""
+        self.turn_number, self.out1, hp1, self.out2, hp2, team1, team2 = snapshot
+        self.team1.restore(team1)
+        self.team2.restore(team2)
+        self.out1.set_hp(hp1)
+        self.out2.set_hp(hp2)
+
+    def check_stop(self) -> Optional[Battle.Result]:
+        """
+        Checks the turn and time budgets and, if enabled, whether the battle is repeating itself.
+        Called before every turn. Returns DRAW (and sets `stop_reason`) if the battle should stop.
+        """
+        if self.max_turns is not None and self.turn_number >= self.max_turns:
+            self.stop_reason = "max_turns"
+            return Battle.Result.DRAW
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.stop_reason = "time_limit"
+            return Battle.Result.DRAW
+        if self.detect_cycles:
+            # HP never goes back up, so once anyone took damage no earlier state can come back.
+            last_out1, last_hp1, last_out2, last_hp2 = self.last_outs
+            if last_out1.get_hp() != last_hp1 or last_out2.get_hp() != last_hp2:
+                self.seen_states.clear()
+            self.last_outs = (self.out1, self.out1.get_hp(), self.out2, self.out2.get_hp())
+            key = self.state_key()
+            if key in self.seen_states:
+                self.stop_reason = "cycle"
+                return Battle.Result.DRAW
+            self.seen_states.add(key)
+        return None
+
+    def start_battle(self, team1: MonsterTeam, team2: MonsterTeam) -> None:
+        """
+        Sends out the first monster of each team, resolves the policy of each team
+        and resets the turn counter and budgets.
+        """
         self.turn_number = 0
         self.team1 = team1
         self.team2 = team2
+        self.policy1 = team1.resolve_policy()
+        self.policy2 = team2.resolve_policy()
+        self.policy1.start_battle(self)
+        self.policy2.start_battle(self)
+        # Looked up again every battle, so a ruleset registered again is swapped in.
+        self.effectiveness = None if self.ruleset is None else rulesets.registry.get(self.ruleset)
         self.out1 = team1.retrieve_from_team()
         self.out2 = team2.retrieve_from_team()
+        self.stop_reason = None
+        self.deadline = None if self.time_limit is None else time.perf_counter() + self.time_limit
+        self.seen_states = set()
+        self.last_outs = (self.out1, self.out1.get_hp(), self.out2, self.out2.get_hp())
+
+    def battle(self, team1: MonsterTeam, team2: MonsterTeam) -> Battle.Result:
+        if self.verbosity > 0:
+            print(f"Team 1: {team1} vs. Team 2: {team2}")
+        # Add any pregame logic here.
+        key = None
+        if self.outcome_cache is not None:
+            key = self.outcome_cache.signature(self, team1, team2)
+            outcome = None if key is None else self.outcome_cache.get(key)
+            if outcome is not None:
+                # Nothing is sent out, so no monsters from an earlier battle are left looking current.
+                self.team1 = team1
+                self.team2 = team2
+                self.out1 = self.out2 = None
+                result, self.turn_number, self.stop_reason = outcome
+                return result
+        self.start_battle(team1, team2)
+        limited = self.max_turns is not None or self.time_limit is not None or self.detect_cycles
         result = None
         while result is None:
+            if limited:
+                result = self.check_stop()
+                if result is not None:
+                    break
+            if self.fast_forward:
+                remaining = None if self.max_turns is None else self.max_turns - self.turn_number - 1
+                self.turn_number += self.skip_attack_exchange(remaining)
             result = self.process_turn()
+            self.turn_number += 1
         # Add any postgame logic here.
+        if key is not None:
+            self.outcome_cache.put(key, (result, self.turn_number, self.stop_reason))
         return result
 
+    def iter_turns(self, team1: MonsterTeam, team2: MonsterTeam) -> Iterator[Battle.TurnRecord]:
+        """
+        Battles team1 against team2, yielding a record of each turn as soon as it is processed.
+
+        The same TurnRecord is filled in and yielded every turn, so nothing is allocated per turn.
+        Use `TurnRecord.as_tuple` to keep a turn. Turn and time budgets and cycle detection apply,
+        but fast-forwarding does not, since every turn is reported.
+        The result is in the `result` of the last record, and in `self.result` once the generator is done.
+        """
+        self.start_battle(team1, team2)
+        self.result = None
+        limited = self.max_turns is not None or self.time_limit is not None or self.detect_cycles
+        record = Battle.TurnRecord()
+        while self.result is None:
+            if limited:
+                self.result = self.check_stop()
+                if self.result is not None:
+                    return
+            out1 = self.out1
+            out2 = self.out2
+            hp1 = out1.get_hp()
+            hp2 = out2.get_hp()
+            speed1 = out1.get_speed()
+            speed2 = out2.get_speed()
+            self.result = self.process_turn()
+            self.turn_number += 1
+
+            action1, action2 = self.last_actions
+            attacking = action1 == Battle.Action.ATTACK and action2 == Battle.Action.ATTACK
+            record.turn = self.turn_number
+            record.action1 = action1
+            record.action2 = action2
+            record.hp1 = out1.get_hp()
+            record.hp2 = out2.get_hp()
+            record.damage1 = hp2 - record.hp2
+            record.damage2 = hp1 - record.hp1
+            if not attacking:
+                record.attacker = 0
+            elif speed1 == speed2:
+                record.attacker = 3
+            else:
+                record.attacker = 1 if speed1 > speed2 else 2
+            record.fainted1 = record.attacker >= 2 and record.hp1 <= 0
+            record.fainted2 = record.attacker in (1, 3) and record.hp2 <= 0
+            record.swapped1 = action1 != Battle.Action.ATTACK
+            record.swapped2 = action1 == Battle.Action.ATTACK and action2 != Battle.Action.ATTACK
+            record.result = self.result
+            yield record
+
 
 if __name__ == "__main__":
+    from team import MonsterTeam
     t1 = MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM)
     t2 = MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM)
     b = Battle(verbosity=3)
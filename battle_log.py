@@ -0,0 +1,192 @@
+"""
+Compact binary battle logs.
+
+A log is two files:
+* `path` holds fixed-width turn records, one per turn, for every battle in order.
+* `path.idx` holds one fixed-width entry per battle: its first record, its
+  number of turns and its result.
+
+`BattleRecorder` appends battles to a log, and `BattleLogReader` memory-maps
+one so that any turn of any battle can be read in O(1) without parsing the
+rest of the log.
+
+Usage:
+```
+with BattleRecorder("battles.log") as recorder:
+    recorder.record(Battle(), team1, team2)
+
+with BattleLogReader("battles.log") as log:
+    print(log.result(0), log.turn(0, 3).hp1)
+```
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from typing import Iterator, Optional
+
+from battle import Battle
+from team import MonsterTeam
+
+LOG_MAGIC = b"BLOG"
+INDEX_MAGIC = b"BIDX"
+VERSION = 1
+
+# magic, version, record size
+HEADER = struct.Struct("<4sHH")
+# turn, action1, action2, attacker, flags, result, damage1, damage2, hp1, hp2
+TURN = struct.Struct("<I5B3x4d")
+# first turn record, number of turns, result
+INDEX = struct.Struct("<QI4xB7x")
+
+FAINTED1 = 1
+FAINTED2 = 2
+SWAPPED1 = 4
+SWAPPED2 = 8
+
+ACTIONS = {action.value: action for action in Battle.Action}
+RESULTS = {result.value: result for result in Battle.Result}
+
+
+def index_path(path: str) -> str:
+    """The path of the battle index belonging to the log at `path`."""
+    return path + ".idx"
+
+
+def _open_for_append(path: str, magic: bytes, record_size: int):
+    """Opens a log file for appending, writing its header if it is new."""
+    file = open(path, "ab")
+    if file.tell() == 0:
+        file.write(HEADER.pack(magic, VERSION, record_size))
+    return file
+
+
+def _check_header(data, magic: bytes, record_size: int, path: str) -> None:
+    if len(data) < HEADER.size or HEADER.unpack_from(data, 0) != (magic, VERSION, record_size):
+        raise ValueError(f"{path} is not a version {VERSION} battle log")
+
+
+class BattleRecorder:
+    """Appends battles, turn by turn, to a binary battle log."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.log_file = _open_for_append(path, LOG_MAGIC, TURN.size)
+        self.index_file = _open_for_append(index_path(path), INDEX_MAGIC, INDEX.size)
+        self.n_records = (self.log_file.tell() - HEADER.size) // TURN.size
+
+    def record(self, battle: Battle, team1: MonsterTeam, team2: MonsterTeam) -> Battle.Result:
+        """Battles team1 against team2 with `battle`, logging every turn. Returns the result."""
+        first = self.n_records
+        write = self.log_file.write
+        pack = TURN.pack
+        for rec in battle.iter_turns(team1, team2):
+            flags = (
+                rec.fainted1 * FAINTED1 | rec.fainted2 * FAINTED2 |
+                rec.swapped1 * SWAPPED1 | rec.swapped2 * SWAPPED2
+            )
+            write(pack(
+                rec.turn, rec.action1.value, rec.action2.value, rec.attacker, flags,
+                0 if rec.result is None else rec.result.value,
+                rec.damage1, rec.damage2, rec.hp1, rec.hp2,
+            ))
+            self.n_records += 1
+        self.index_file.write(INDEX.pack(first, self.n_records - first, battle.result.value))
+        return battle.result
+
+    def close(self) -> None:
+        self.log_file.close()
+        self.index_file.close()
+
+    def __enter__(self) -> BattleRecorder:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class BattleLogReader:
+    """
+    Read-only, memory-mapped view of a binary battle log.
+
+    Only the pages that are actually read are loaded, so seeking to any battle
+    or turn is O(1) whatever the size of the log.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.files = []
+        self.log = self._map(path, LOG_MAGIC, TURN.size)
+        self.index = self._map(index_path(path), INDEX_MAGIC, INDEX.size)
+        self.n_battles = (len(self.index) - HEADER.size) // INDEX.size
+
+    def _map(self, path: str, magic: bytes, record_size: int) -> mmap.mmap:
+        file = open(path, "rb")
+        self.files.append(file)
+        if os.fstat(file.fileno()).st_size == 0:
+            raise ValueError(f"{path} is empty")
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        _check_header(data, magic, record_size, path)
+        return data
+
+    def __len__(self) -> int:
+        """The number of battles in the log."""
+        return self.n_battles
+
+    def _entry(self, battle: int) -> tuple[int, int, int]:
+        if not 0 <= battle < self.n_battles:
+            raise IndexError(f"No battle {battle} in {self.path}")
+        return INDEX.unpack_from(self.index, HEADER.size + battle * INDEX.size)
+
+    def result(self, battle: int) -> Battle.Result:
+        """The result of a battle."""
+        return RESULTS[self._entry(battle)[2]]
+
+    def turn_count(self, battle: int) -> int:
+        """The number of turns logged for a battle."""
+        return self._entry(battle)[1]
+
+    def turn(self, battle: int, turn: int, record: Optional[Battle.TurnRecord] = None) -> Battle.TurnRecord:
+        """
+        Reads turn `turn` (starting at 0) of a battle into `record`, or into a new TurnRecord.
+        """
+        first, n_turns, _ = self._entry(battle)
+        if not 0 <= turn < n_turns:
+            raise IndexError(f"No turn {turn} in battle {battle}")
+        values = TURN.unpack_from(self.log, HEADER.size + (first + turn) * TURN.size)
+        record = record or Battle.TurnRecord()
+        (record.turn, action1, action2, record.attacker, flags, result,
+         record.damage1, record.damage2, record.hp1, record.hp2) = values
+        record.action1 = ACTIONS[action1]
+        record.action2 = ACTIONS[action2]
+        record.fainted1 = bool(flags & FAINTED1)
+        record.fainted2 = bool(flags & FAINTED2)
+        record.swapped1 = bool(flags & SWAPPED1)
+        record.swapped2 = bool(flags & SWAPPED2)
+        record.result = RESULTS.get(result)
+        return record
+
+    def turns(self, battle: int) -> Iterator[Battle.TurnRecord]:
+        """Replays every turn of a battle, reusing one TurnRecord like `Battle.iter_turns`."""
+        record = Battle.TurnRecord()
+        for turn in range(self.turn_count(battle)):
+            yield self.turn(battle, turn, record)
+
+    def hp_sequence(self, battle: int) -> list[tuple[float, float]]:
+        """The (hp1, hp2) after every turn of a battle."""
+        first, n_turns, _ = self._entry(battle)
+        start = HEADER.size + first * TURN.size
+        return [values[-2:] for values in TURN.iter_unpack(self.log[start:start + n_turns * TURN.size])]
+
+    def close(self) -> None:
+        self.log.close()
+        self.index.close()
+        for file in self.files:
+            file.close()
+
+    def __enter__(self) -> BattleLogReader:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,70 @@
+"""
+Compares battles per second of the scalar `Battle` engine against `BatchBattle`.
+On a single core BatchBattle is about 6-8x faster, mostly limited by loading the teams,
+see the `batch_battle` module docstring.
+
+Run from the repository root:
+    python -m benchmarks.bench_batch_battle [n_battles] [repeats]
+"""
+import gc
+import sys
+import time
+
+from battle import Battle
+from batch_battle import BatchBattle
+from policy import AttackPolicy
+from random_gen import RandomGen
+from team import MonsterTeam
+
+
+def random_team() -> MonsterTeam:
+    return MonsterTeam(
+        RandomGen.random_choice(list(MonsterTeam.TeamMode)),
+        MonsterTeam.SelectionMode.RANDOM,
+        sort_key=RandomGen.random_choice(list(MonsterTeam.SortMode)),
+    )
+
+
+def run_scalar(pairs):
+    return [Battle().battle(team1, team2) for team1, team2 in pairs]
+
+
+def regenerate(pairs):
+    for team1, team2 in pairs:
+        team1.regenerate_team()
+        team2.regenerate_team()
+
+
+def best_time(function, pairs, repeats):
+    """Returns the fastest of `repeats` runs, and the results of the last run."""
+    best = None
+    for _ in range(repeats):
+        regenerate(pairs)
+        gc.collect()
+        start = time.perf_counter()
+        results = function(pairs)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, results
+
+
+def main(n_battles: int = 10000, repeats: int = 3) -> None:
+    RandomGen.set_seed(1008)
+    pairs = [(random_team(), random_team()) for _ in range(n_battles)]
+    always_attack = AttackPolicy()
+    for team1, team2 in pairs:
+        team1.policy = always_attack
+        team2.policy = always_attack
+
+    batch_time, batch_results = best_time(BatchBattle().battle_many, pairs, repeats)
+    scalar_time, scalar_results = best_time(run_scalar, pairs, repeats)
+
+    assert batch_results == scalar_results, "Batch results differ from the scalar engine."
+    print(f"{'engine':<10}{'battles':>10}{'seconds':>10}{'battles/s':>12}")
+    print(f"{'scalar':<10}{n_battles:>10}{scalar_time:>10.3f}{n_battles / scalar_time:>12.0f}")
+    print(f"{'batch':<10}{n_battles:>10}{batch_time:>10.3f}{n_battles / batch_time:>12.0f}")
+    print(f"speedup: {scalar_time / batch_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,72 @@
+"""
+Compares loading the catalog by parsing monsters.yaml (cold) with loading the
+compiled record file from the catalog cache (warm), both in process and as the
+time for a new interpreter to import helpers and load the catalog. Importing
+helpers alone loads nothing, since the catalog is loaded on first use.
+
+Each process runs in a temporary directory holding a copy of monsters.yaml, so
+the repository's own cache is left alone.
+
+Run from the repository root:
+    python -m benchmarks.bench_catalog_cache [repeats]
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import helpers
+
+
+def best_time(function, repeats):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def load_catalog(directory):
+    env = dict(os.environ, PYTHONPATH=os.getcwd())
+    code = "import helpers; helpers.get_all_monsters()"
+    subprocess.run([sys.executable, "-c", code], cwd=directory, env=env, check=True)
+
+
+def main(repeats: int = 10) -> None:
+    with open("monsters.yaml", "rb") as f:
+        source = f.read()
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        shutil.copy("monsters.yaml", directory)
+        cold = best_time(lambda: helpers._parse_catalog(source), repeats)
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            helpers._load_catalog_records()
+            warm = best_time(helpers._load_catalog_records, repeats)
+        finally:
+            os.chdir(cwd)
+        rows.append(("load records", cold, warm))
+
+        cache = os.path.join(directory, helpers.CACHE_DIR)
+
+        def cold_load():
+            shutil.rmtree(cache, ignore_errors=True)
+            load_catalog(directory)
+
+        cold = best_time(cold_load, repeats)
+        load_catalog(directory)
+        warm = best_time(lambda: load_catalog(directory), repeats)
+        rows.append(("new process", cold, warm))
+
+    print(f"{'workload':<16}{'cold ms':>10}{'warm ms':>10}{'speedup':>9}")
+    for name, cold, warm in rows:
+        print(f"{name:<16}{cold * 1e3:>10.2f}{warm * 1e3:>10.2f}{cold / warm:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
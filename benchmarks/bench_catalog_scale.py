@@ -0,0 +1,129 @@
+"""
+Measures catalog-wide work at catalog sizes well beyond the shipped 41 species,
+so that any O(n) scan over the catalog shows up as the catalog grows.
+
+For each scale a synthetic catalog is written into a temporary directory (see
+`benchmarks.synthetic_catalog`), and the process works from that directory:
+
+* load: parsing monsters.yaml (cold), reading the catalog cache (warm), and
+  installing the species with `helpers.reload_catalog`
+* effectiveness: reading the CSV with `EffectivenessCalculator.from_csv`,
+  compiling it as a ruleset, and looking effectiveness up by name
+* teams: random and manual team selection
+* battles: random teams fighting under the synthetic ruleset
+* tower: one team fighting a series of random teams, regenerated between
+  battles, as a battle tower does
+
+Every row is a time per operation. The shipped catalog is reloaded at the end.
+
+Run from the repository root:
+    python -m benchmarks.bench_catalog_scale [n_species:n_elements ...]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from unittest import mock
+
+import helpers
+import rulesets
+from battle import Battle
+from benchmarks.synthetic_catalog import element_names, write_catalog
+from elements import EffectivenessCalculator
+from policy import AttackPolicy
+from random_gen import RandomGen
+from team import MonsterTeam
+
+SCALES = [(41, 18), (1000, 50), (10000, 200)]
+N_TEAMS = 2000
+N_BATTLES = 500
+N_LOOKUPS = 100000
+TOWER_TEAMS = 50
+MAX_TURNS = 1000
+
+
+def timed(function, count: int = 1) -> float:
+    """The time per operation of `function`, which does `count` operations."""
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) / count
+
+
+def random_team(mode=MonsterTeam.TeamMode.BACK) -> MonsterTeam:
+    return MonsterTeam(mode, MonsterTeam.SelectionMode.RANDOM, policy=AttackPolicy())
+
+
+def manual_team() -> MonsterTeam:
+    spawnable = helpers.get_spawnable_monsters()
+    catalog = helpers.get_all_monsters()
+    positions = {catalog[i]: i + 1 for i in range(len(catalog))}
+    answers = ["3"] + [str(positions[spawnable[RandomGen.randint(0, len(spawnable) - 1)]]) for _ in range(3)]
+    with mock.patch("builtins.input", side_effect=answers), contextlib.redirect_stdout(io.StringIO()):
+        return MonsterTeam(MonsterTeam.TeamMode.FRONT, MonsterTeam.SelectionMode.MANUAL)
+
+
+def battles(ruleset: str, pairs) -> None:
+    for team1, team2 in pairs:
+        Battle(ruleset=ruleset, max_turns=MAX_TURNS).battle(team1, team2)
+
+
+def tower_run(ruleset: str, team: MonsterTeam, tower_teams) -> None:
+    for tower_team in tower_teams:
+        team.regenerate_team()
+        tower_team.regenerate_team()
+        Battle(ruleset=ruleset, max_turns=MAX_TURNS).battle(team, tower_team)
+
+
+def measure(n_species: int, n_elements: int) -> list[tuple[str, float]]:
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        _, csv_path = write_catalog(directory, n_species, n_elements)
+        rows.append(("write files", time.perf_counter() - start))
+        os.chdir(directory)
+
+        rows.append(("load cold", timed(helpers._load_catalog_records)))
+        rows.append(("load warm", timed(helpers._load_catalog_records)))
+        rows.append(("install", timed(helpers.reload_catalog)))
+
+        rows.append(("csv calculator", timed(lambda: EffectivenessCalculator.from_csv(csv_path))))
+        ruleset_name = f"synthetic-{n_species}-{n_elements}"
+        rows.append(("compile ruleset", timed(lambda: rulesets.registry.register(ruleset_name, csv_path))))
+        ruleset = rulesets.registry.get(ruleset_name)
+        names = element_names(n_elements)
+        pairs = [(names[i % n_elements], names[(7 * i) % n_elements]) for i in range(N_LOOKUPS)]
+        rows.append(("effectiveness", timed(lambda: [ruleset.effectiveness(a, b) for a, b in pairs], N_LOOKUPS)))
+
+        RandomGen.set_seed(1008)
+        rows.append(("random team", timed(lambda: [random_team() for _ in range(N_TEAMS)], N_TEAMS)))
+        rows.append(("manual team", timed(lambda: [manual_team() for _ in range(N_TEAMS // 10)], N_TEAMS // 10)))
+
+        pairs = [(random_team(), random_team(MonsterTeam.TeamMode.FRONT)) for _ in range(N_BATTLES)]
+        rows.append(("battle", timed(lambda: battles(ruleset_name, pairs), N_BATTLES)))
+        team = random_team(MonsterTeam.TeamMode.OPTIMISE)
+        tower_teams = [random_team() for _ in range(TOWER_TEAMS)]
+        rows.append(("tower battle", timed(lambda: tower_run(ruleset_name, team, tower_teams), TOWER_TEAMS)))
+    return rows
+
+
+def main(scales=SCALES) -> None:
+    cwd = os.getcwd()
+    results = []
+    try:
+        for n_species, n_elements in scales:
+            results.append(measure(n_species, n_elements))
+            os.chdir(cwd)
+    finally:
+        os.chdir(cwd)
+        helpers.reload_catalog()
+
+    header = "".join(f"{f'{n}x{e} ms':>16}" for n, e in scales)
+    print(f"{'workload':<18}{header}")
+    for i, (name, _) in enumerate(results[0]):
+        print(f"{name:<18}" + "".join(f"{rows[i][1] * 1e3:>16.4f}" for rows in results))
+
+
+if __name__ == "__main__":
+    main([tuple(int(part) for part in arg.split(":")) for arg in sys.argv[1:]] or SCALES)
@@ -0,0 +1,79 @@
+"""
+Measures how long a fresh interpreter takes to import the game modules, and
+checks that importing them loads neither the monster catalog nor the type
+effectiveness table.
+
+"eager" imports the same modules and then forces both loads. "baseline"
+imports each module from a checkout of the baseline commit (the repository's
+first commit, or the one given), where importing loaded both eagerly, and
+"saved" is measured against it, so anything the import has picked up since
+(such as NumPy) shows as a smaller saving. The interpreter start-up time
+("python -c pass") is subtracted from every row.
+
+Run from the repository root:
+    python -m benchmarks.bench_import_time [repeats] [baseline commit]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+MODULES = ["elements", "helpers", "team", "battle"]
+
+CHECK = """
+import helpers
+from elements import EffectivenessCalculator
+assert helpers._monsters is None, "importing {module} loaded the catalog"
+assert EffectivenessCalculator.instance is None, "importing {module} read the effectiveness table"
+import sys
+assert "numpy" not in sys.modules, "importing {module} imported NumPy"
+"""
+
+EAGER = """
+import helpers
+from elements import EffectivenessCalculator
+helpers.get_all_monsters()
+EffectivenessCalculator.get_instance()
+"""
+
+
+def run(code: str, directory: str = None) -> float:
+    directory = directory or os.getcwd()
+    env = dict(os.environ, PYTHONPATH=directory)
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=directory, env=env, check=True)
+    return time.perf_counter() - start
+
+
+def best_time(code: str, repeats: int, directory: str = None) -> float:
+    return min(run(code, directory) for _ in range(repeats))
+
+
+def checkout(commit: str, directory: str) -> None:
+    """Writes the tree of `commit` into `directory`."""
+    archive = subprocess.run(["git", "archive", commit], capture_output=True, check=True).stdout
+    subprocess.run(["tar", "-x", "-C", directory], input=archive, check=True)
+
+
+def main(repeats: int = 10, baseline: str = None) -> None:
+    if baseline is None:
+        baseline = subprocess.run(
+            ["git", "rev-list", "--max-parents=0", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.split()[0]
+    for module in MODULES:
+        run(f"import {module}\n" + CHECK.format(module=module))
+    startup = best_time("pass", repeats)
+
+    with tempfile.TemporaryDirectory() as directory:
+        checkout(baseline, directory)
+        print(f"{'module':<10}{'lazy ms':>10}{'eager ms':>10}{'baseline ms':>13}{'saved':>8}")
+        for module in MODULES:
+            lazy = best_time(f"import {module}", repeats) - startup
+            eager = best_time(f"import {module}\n" + EAGER, repeats) - startup
+            old = best_time(f"import {module}", repeats, directory) - startup
+            print(f"{module:<10}{lazy * 1e3:>10.1f}{eager * 1e3:>10.1f}{old * 1e3:>13.1f}{1 - lazy / old:>8.0%}")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]], *sys.argv[2:3])
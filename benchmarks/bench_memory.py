@@ -0,0 +1,98 @@
+"""
+Measures the memory taken by monsters and teams with the slot-based layouts,
+against the same classes with a per-instance `__dict__` (the layout before
+`__slots__` was added).
+
+The dict layout is rebuilt by subclassing every slotted class without
+`__slots__`, and swapping the subclasses into the team module while the
+"dict" teams are built.
+
+Run from the repository root:
+    python -m benchmarks.bench_memory [n_monsters] [n_teams]
+"""
+import contextlib
+import gc
+import sys
+import tracemalloc
+
+import team as team_module
+from data_structures.array_sorted_list import ArraySortedList
+from data_structures.queue_adt import CircularQueue
+from data_structures.referential_array import ArrayR
+from data_structures.sorted_list_adt import ListItem
+from data_structures.stack_adt import ArrayStack
+from helpers import get_all_monsters
+from random_gen import RandomGen
+from team import MonsterTeam
+
+
+def with_dict(cls):
+    """A subclass of `cls` that adds nothing but a per-instance __dict__."""
+    return type(cls.__name__, (cls,), {})
+
+
+@contextlib.contextmanager
+def dict_layouts():
+    """Makes the team module build its containers, items and monsters from __dict__ subclasses."""
+    monsters = get_all_monsters()
+    species = ArrayR(len(monsters))
+    for i in range(len(monsters)):
+        species[i] = with_dict(monsters[i])
+    spawnable = ArrayR.from_list([species[i] for i in range(len(species)) if species[i].can_be_spawned()])
+    replacements = {
+        "ArrayR": with_dict(ArrayR),
+        "ArrayStack": with_dict(ArrayStack),
+        "CircularQueue": with_dict(CircularQueue),
+        "ArraySortedList": with_dict(ArraySortedList),
+        "ListItem": with_dict(ListItem),
+        "get_spawnable_monsters": lambda: spawnable,
+    }
+    originals = {name: getattr(team_module, name) for name in replacements}
+    for name, value in replacements.items():
+        setattr(team_module, name, value)
+    try:
+        yield species
+    finally:
+        for name, value in originals.items():
+            setattr(team_module, name, value)
+
+
+def bytes_per_object(make, n):
+    """The memory held per object when `n` objects made by `make` are kept alive."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [make() for _ in range(n)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return (after - before) / n
+
+
+def main(n_monsters: int = 20000, n_teams: int = 2000) -> None:
+    def monster_maker(species):
+        counter = iter(range(n_monsters))
+        return lambda: species[next(counter) % len(species)]()
+
+    def team_maker(mode):
+        return lambda: MonsterTeam(mode, MonsterTeam.SelectionMode.RANDOM)
+
+    after = bytes_per_object(monster_maker(get_all_monsters()), n_monsters)
+    with dict_layouts() as species:
+        before = bytes_per_object(monster_maker(species), n_monsters)
+    rows = [("monster", before, after)]
+    for mode in MonsterTeam.TeamMode:
+        RandomGen.set_seed(1008)
+        after = bytes_per_object(team_maker(mode), n_teams)
+        RandomGen.set_seed(1008)
+        with dict_layouts():
+            before = bytes_per_object(team_maker(mode), n_teams)
+        rows.append((f"team {mode.name.lower()}", before, after))
+
+    print(f"{'object':<16}{'dict bytes':>12}{'slots bytes':>13}{'saved':>8}")
+    for name, before, after in rows:
+        print(f"{name:<16}{before:>12.0f}{after:>13.0f}{1 - after / before:>8.0%}")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,101 @@
+"""
+Compares `MonsterTeam.regenerate_team` (a restore of the starting layout) with
+clearing the team and adding every starting monster again, and
+`MonsterTeam.clone` with building the same team again from its classes.
+
+For resets, the memory column is the peak traced memory per reset, since a
+reset keeps nothing. For new teams it is the number of memory blocks each new
+team holds on to.
+
+Run from the repository root:
+    python -m benchmarks.bench_team_reset [n_teams] [repeats]
+"""
+import gc
+import sys
+import time
+import tracemalloc
+
+from data_structures.referential_array import ArrayR
+from random_gen import RandomGen
+from team import MonsterTeam
+
+
+def re_add(team):
+    """Resets the team by clearing it and adding every starting monster again."""
+    team.team.clear()
+    team.ascen = False
+    for i in range(len(team.starting_monsters)):
+        if team.starting_monsters[i] is not None:
+            team.starting_monsters[i].set_hp(team.starting_monsters[i].get_max_hp())
+            team.add_to_team(team.starting_monsters[i])
+
+
+def rebuild(team):
+    """A new team with the same monster classes, made by selection."""
+    provided = ArrayR.from_list([
+        type(team.starting_monsters[i]) for i in range(len(team.starting_monsters)) if team.starting_monsters[i] is not None
+    ])
+    return MonsterTeam(team.team_mode, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=provided, sort_key=team.sort_mode)
+
+
+def best_time(function, teams, repeats):
+    best = None
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        for team in teams:
+            function(team)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(teams)
+
+
+def peak_bytes(function, teams):
+    """The largest traced memory in use during one call, above what was in use before it."""
+    gc.collect()
+    tracemalloc.start()
+    peak = 0
+    for team in teams:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        function(team)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+    return peak
+
+
+def blocks_kept(function, teams):
+    """The number of memory blocks held per result of `function`."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    results = [function(team) for team in teams]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "lineno"))
+    del results
+    return blocks / len(teams)
+
+
+def main(n_teams: int = 3000, repeats: int = 5) -> None:
+    RandomGen.set_seed(1008)
+    rows = []
+    for mode in MonsterTeam.TeamMode:
+        teams = [MonsterTeam(mode, MonsterTeam.SelectionMode.RANDOM) for _ in range(n_teams)]
+        for team in teams:
+            team.special()
+        rows.append((f"reset {mode.name.lower()}", "peak bytes",
+                     best_time(re_add, teams, repeats), peak_bytes(re_add, teams),
+                     best_time(MonsterTeam.regenerate_team, teams, repeats), peak_bytes(MonsterTeam.regenerate_team, teams)))
+        rows.append((f"new {mode.name.lower()}", "blocks",
+                     best_time(rebuild, teams, repeats), blocks_kept(rebuild, teams),
+                     best_time(MonsterTeam.clone, teams, repeats), blocks_kept(MonsterTeam.clone, teams)))
+
+    print(f"{'workload':<18}{'memory':>12}{'old us':>9}{'old mem':>9}{'new us':>9}{'new mem':>9}{'speedup':>9}")
+    for name, memory, old_time, old_memory, new_time, new_memory in rows:
+        print(f"{name:<18}{memory:>12}{old_time * 1e6:>9.2f}{old_memory:>9.0f}"
+              f"{new_time * 1e6:>9.2f}{new_memory:>9.0f}{old_time / new_time:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
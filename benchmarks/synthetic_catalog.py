@@ -0,0 +1,99 @@
+"""
+Writes synthetic catalogs of any size: a monsters.yaml and a matching
+type_effectiveness.csv, in the same formats as the shipped files.
+
+Species come in evolution chains of one to `max_chain` forms. First forms can
+usually be spawned and later forms cannot, as in the shipped catalog. Complex
+stats are real formulas of the level (using "+", "*", "/", "sqrt" and
+"middle"), and every stat is positive at every level. The first elements reuse
+the names of the shipped elements, so `Element` constants still resolve.
+
+Run from the repository root:
+    python -m benchmarks.synthetic_catalog directory n_species n_elements [seed]
+"""
+from __future__ import annotations
+
+import os
+import random
+import sys
+
+import yaml
+
+from elements import Element
+
+EFFECTIVENESS_VALUES = (0, 0.5, 1, 2)
+EFFECTIVENESS_WEIGHTS = (1, 4, 10, 4)
+
+
+def element_names(n_elements: int) -> list[str]:
+    """The shipped element names first, then Element19, Element20 and so on."""
+    names = [element.name.title() for element in Element][:n_elements]
+    return names + [f"Element{i + 1}" for i in range(len(names), n_elements)]
+
+
+def complex_formulas(rng: random.Random, boost: int) -> dict[str, str]:
+    """Postfix formulas for each stat, growing with the level and with `boost` (the evolution depth)."""
+    return {
+        "attack": f"{rng.randint(2, 6) + boost} level sqrt {rng.randint(1, 3)} * +",
+        "defense": f"{rng.randint(2, 6) + boost} level {rng.randint(2, 5)} / +",
+        "speed": f"level {rng.randint(1, 3)} * {rng.randint(1, 4)} {rng.randint(8, 15) + boost} middle",
+        "max_hp": f"{rng.randint(5, 12) + 2 * boost} level {rng.randint(1, 3)} * +",
+    }
+
+
+def generate_monsters(n_species: int, n_elements: int, seed: int = 1008, max_chain: int = 3) -> list[dict]:
+    """The species of a catalog, as they are written to monsters.yaml."""
+    rng = random.Random(seed)
+    elements = element_names(n_elements)
+    monsters = []
+    while len(monsters) < n_species:
+        chain = min(rng.randint(1, max_chain), n_species - len(monsters))
+        element = rng.choice(elements)
+        # The first species of the catalog is always spawnable, so teams can be made.
+        spawnable = len(monsters) == 0 or rng.random() < 0.9
+        for depth in range(chain):
+            name = f"Synth{len(monsters) + 1:05d}"
+            monster = {
+                "name": name,
+                "description": f"A synthetic {element} monster at stage {depth + 1} of {chain}.",
+                "element": element,
+                "can_be_spawned": spawnable and depth == 0,
+                "simple": {
+                    "attack": rng.randint(1, 8) + 2 * depth,
+                    "defense": rng.randint(1, 8) + 2 * depth,
+                    "speed": rng.randint(1, 8) + depth,
+                    "max_hp": rng.randint(5, 12) + 3 * depth,
+                },
+                "complex": complex_formulas(rng, depth),
+            }
+            if depth + 1 < chain:
+                monster["evolution"] = f"Synth{len(monsters) + 2:05d}"
+            monsters.append(monster)
+    return monsters
+
+
+def generate_effectiveness(n_elements: int, seed: int = 1008) -> list[list[float]]:
+    """An n_elements by n_elements effectiveness table, mostly 1s, with some 0s, 0.5s and 2s."""
+    rng = random.Random(seed)
+    return [rng.choices(EFFECTIVENESS_VALUES, EFFECTIVENESS_WEIGHTS, k=n_elements) for _ in range(n_elements)]
+
+
+def write_catalog(directory: str, n_species: int, n_elements: int, seed: int = 1008) -> tuple[str, str]:
+    """Writes monsters.yaml and type_effectiveness.csv into `directory`, and returns their paths."""
+    os.makedirs(directory, exist_ok=True)
+    monsters_path = os.path.join(directory, "monsters.yaml")
+    csv_path = os.path.join(directory, "type_effectiveness.csv")
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    with open(monsters_path, "w") as f:
+        yaml.dump(generate_monsters(n_species, n_elements, seed), f, Dumper=dumper, sort_keys=True)
+    with open(csv_path, "w") as f:
+        f.write(",".join(element_names(n_elements)) + "\n")
+        for row in generate_effectiveness(n_elements, seed):
+            f.write(",".join(str(value) for value in row) + "\n")
+    return monsters_path, csv_path
+
+
+if __name__ == "__main__":
+    directory, n_species, n_elements, *rest = sys.argv[1:]
+    for path in write_catalog(directory, int(n_species), int(n_elements), *[int(arg) for arg in rest]):
+        print(path)
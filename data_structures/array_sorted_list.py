@@ -11,6 +11,7 @@ __docformat__ = 'reStructuredText'
 
 class ArraySortedList(SortedList[T]):
     """ SortedList ADT implemented with arrays. """
+    __slots__ = ("array",)
     MIN_CAPACITY = 1
 
     def __init__(self, max_capacity: int) -> None:
@@ -13,6 +13,7 @@ from data_structures.referential_array import ArrayR, T
 
 class Queue(ABC, Generic[T]):
     """ Abstract class for a generic Queue. """
+    __slots__ = ("length",)
 
     def __init__(self) -> None:
         self.length = 0
@@ -55,6 +56,7 @@ class CircularQueue(Queue[T]):
 
     ArrayR cannot create empty arrays. So MIN_CAPACITY used to avoid this.
     """
+    __slots__ = ("front", "rear", "array")
     MIN_CAPACITY = 1
 
     def __init__(self,max_capacity:int) -> None:
@@ -28,6 +28,8 @@ T = TypeVar("T")
 
 
 class ArrayR(Generic[T]):
+    __slots__ = ("array",)
+
     def __init__(self, length: int) -> None:
         """Creates an array of references to objects of the given length
         :complexity: O(length) for best/worst case to initialise to None
@@ -46,6 +46,17 @@ class Element(BaseEnum):
                 return elem
         raise ValueError(f"Unexpected string {string}")
 
+# Upper case name of each Element constant -> its value.
+_element_ids = {elem.name: elem.value for elem in Element}
+
+def element_id(name: str) -> Optional[int]:
+    """
+    Returns the id of the element called name, its `Element.value`, or None if it is not an Element constant.
+    Nothing is registered by looking a name up, so ids only ever cover the Element constants.
+    """
+    # O(1)
+    return _element_ids.get(name.upper())
+
 class EffectivenessCalculator:
     """
     Helper class for calculating the element effectiveness for two elements.
@@ -75,9 +86,44 @@ class EffectivenessCalculator:
         Water is double effective to Fire, and half effective to Water and Grass [2, 0.5, 0.5]
         Grass is half effective to Fire and Grass, and double effective to Water [0.5, 2, 0.5]
         """
+        # n = number of elements in element_names
+        # O(n^2)
+        n = len(element_names)
+        if len(effectiveness_values) != n * n:
+            raise ValueError(f"Expected {n * n} effectiveness values for {n} elements, got {len(effectiveness_values)}")
         self.effectiveness_values = effectiveness_values
         self.element_names = element_names
-        #raise NotImplementedError
+
+        # Row/column of each element in the values, by name and by Element.value.
+        self.name_index = {}
+        for i in range(n):
+            self.name_index[element_names[i].upper()] = i
+        # Index of each element in the dense matrix: Element.value for Element constants,
+        # and the indices after the last Element.value for elements of this CSV that have none.
+        size = max(elem.value for elem in Element) + 1
+        self.value_index = [None] * size
+        self.dense_index = {}
+        for elem in Element:
+            self.value_index[elem.value] = self.name_index.get(elem.name)
+            self.dense_index[elem.name] = elem.value
+        for i in range(n):
+            name = element_names[i].upper()
+            if name not in self.dense_index:
+                self.dense_index[name] = len(self.value_index)
+                self.value_index.append(i)
+        size = len(self.value_index)
+
+        # Dense matrix indexed by [attacker][defender] dense index. None for elements missing from the values.
+        self.matrix = [[None] * size for _ in range(size)]
+        for attacker in range(size):
+            row = self.value_index[attacker]
+            if row is None:
+                continue
+            for defender in range(size):
+                column = self.value_index[defender]
+                if column is not None:
+                    self.matrix[attacker][defender] = effectiveness_values[row * n + column]
+        self.dense = None
 
     @classmethod
     def get_effectiveness(cls, type1: Element, type2: Element) -> float:
@@ -86,21 +132,52 @@ class EffectivenessCalculator:
 
         Example: EffectivenessCalculator.get_effectiveness(Element.FIRE, Element.WATER) == 0.5
         """
-        # O(n)
-        elements = cls.instance.element_names
-        effectiveness = cls.instance.effectiveness_values
-        elem = None
-        effect = None
-        for i in range(len(elements)):
-            if elements[i].upper() == type1.name:
-                elem = i
-            if elements[i].upper() == type2.name:
-                effect = i
-        return effectiveness[int(324/18)*(elem) + effect]
-
+        # O(1)
+        instance = cls.instance
+        if instance is None:
+            instance = cls.get_instance()
+        effectiveness = instance.matrix[type1.value][type2.value]
+        if effectiveness is None:
+            raise ValueError(f"No effectiveness known for {type1.name} against {type2.name}")
+        return effectiveness
 
+    @classmethod
+    def get_effectiveness_by_name(cls, name1: str, name2: str) -> float:
+        """
+        Returns the effectiveness of the element called name1 attacking the one called name2,
+        including elements in the CSV that have no Element constant.
+        """
+        # O(1)
+        instance = cls.get_instance()
+        n = len(instance.element_names)
+        return instance.effectiveness_values[instance.name_index[name1.upper()] * n + instance.name_index[name2.upper()]]
 
+    @classmethod
+    def index_of(cls, name: str) -> int:
+        """
+        Returns the index of the element called name in the dense matrix used by `get_effectiveness_many`.
+        This is `Element.value` for Element constants, and an index after the last one for the other elements of the CSV.
+        """
+        # O(1)
+        return cls.get_instance().dense_index[name.upper()]
 
+    @classmethod
+    def get_effectiveness_many(cls, types1, types2):
+        """
+        Returns a NumPy array of the effectiveness of each of types1 attacking the matching one of types2.
+        Both are arrays (or sequences) of the same length of `Element.value`s, or of `index_of(name)`
+        for elements of the CSV that are not Element constants.
+        """
+        # n = number of pairs
+        # O(n)
+        import numpy as np
+        instance = cls.get_instance()
+        if instance.dense is None:
+            # Missing elements are NaN.
+            instance.dense = np.array(
+                [[np.nan if value is None else value for value in row] for row in instance.matrix], dtype=float
+            )
+        return instance.dense[np.asarray(types1, dtype=np.int64), np.asarray(types2, dtype=np.int64)]
 
     @classmethod
     def from_csv(cls, csv_file: str) -> EffectivenessCalculator:
@@ -122,5 +199,10 @@ class EffectivenessCalculator:
     def make_singleton(cls):
         cls.instance = EffectivenessCalculator.from_csv("type_effectiveness.csv")
 
-EffectivenessCalculator.make_singleton()
+    @classmethod
+    def get_instance(cls) -> EffectivenessCalculator:
+        """The shared calculator, read from type_effectiveness.csv the first time it is needed."""
+        if cls.instance is None:
+            cls.make_singleton()
+        return cls.instance
 
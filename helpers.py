@@ -1,6 +1,8 @@
 from __future__ import annotations
-import yaml
-from typing import TYPE_CHECKING
+import hashlib
+import marshal
+import os
+from typing import Callable, TYPE_CHECKING
 
 from data_structures.referential_array import ArrayR
 
@@ -9,16 +11,35 @@ if TYPE_CHECKING:
 
 
 _monsters: ArrayR[MonsterBase] = None
+_evolutions: dict[type[MonsterBase], Evolution] = None
+_index: CatalogIndex = None
+# Species name -> the record it was built from
+_records: dict[str, tuple] = None
+# SHA-1 of monsters.yaml as it was read for the loaded catalog
+_catalog_hash: str = None
+_reload_listeners = []
+
+CURVE_STATS = ("attack", "defense", "speed", "max_hp")
+CACHE_DIR = ".catalog_cache"
+# Bumped whenever the layout of the catalog records changes.
+CATALOG_FORMAT = 1
+_curves = {}
 
 
 def MonsterBaseFactory(name, description, evolution, element, simple_stats, complex_stats, can_be_spawned) -> type[MonsterBase]:
+    from elements import element_id
     from monster_base import MonsterBase
+    id = element_id(element)
     return type(name, (MonsterBase, ), {
+        # Species classes add no attributes of their own, so their instances have no __dict__.
+        "__slots__": (),
         "get_name": classmethod(lambda s: name),
         "get_description": classmethod(lambda s: description),
-        # This will be defined later when we have all names.
-        "get_evolution": classmethod(lambda s: None),
+        # This will be set later when we have all names.
+        "evolution_class": None,
+        "get_evolution": classmethod(lambda s: s.evolution_class),
         "get_element": classmethod(lambda s: element),
+        "get_element_id": classmethod(lambda s: id),
         "get_simple_stats": classmethod(lambda s: simple_stats),
         "get_complex_stats": classmethod(lambda s: complex_stats),
         "can_be_spawned": classmethod(lambda s: can_be_spawned),
@@ -30,42 +51,400 @@ def get_all_monsters():
     return _monsters
 
 def _make_all_monster_classes():
+    _install(*_read_catalog_records())
+
+def _install(digest: str, records: list[tuple]) -> CatalogDiff:
+    """
+    Makes `records`, read from a monsters.yaml with SHA-1 `digest`, the loaded catalog.
+    A species already loaded whose record is the same apart from its evolution keeps its class,
+    and only has its evolution link updated. Every other species gets a new class.
+    Raises ValueError, leaving the loaded catalog as it was, if a species evolves into one that is not in `records`,
+    or if the evolutions form a cycle.
+    """
+    # n = number of species
+    # O(n log n + n * length of the longest chain)
     from stats import SimpleStats, ComplexStats
-    global _monsters
-    with open("monsters.yaml", "r") as f:
-        monsters_yaml = yaml.safe_load(f)
-    _monsters = ArrayR(len(monsters_yaml))
+    global _monsters, _records, _evolutions, _index, _catalog_hash
+    evolves_into = {record[0]: record[2] for record in records}
+    for name, evolution in evolves_into.items():
+        if evolution is not None and evolution not in evolves_into:
+            raise ValueError(f"{name} evolves into {evolution}, which is not in the catalog")
+    for name in evolves_into:
+        steps = 0
+        evolution = evolves_into[name]
+        while evolution is not None:
+            steps += 1
+            if steps > len(evolves_into):
+                raise ValueError(f"The evolutions of {name} form a cycle")
+            evolution = evolves_into[evolution]
+    previous = {}
+    if _monsters is not None:
+        for i in range(len(_monsters)):
+            previous[_monsters[i].get_name()] = _monsters[i]
+    old_records = _records or {}
+    monsters = ArrayR(len(records))
+    by_name = {}
+    added = []
+    changed = []
     idx = 0
-    for monster in monsters_yaml:
+    for record in records:
+        name, description, evolution, element, simple, complex, can_be_spawned = record
+        old = old_records.get(name)
+        if old is not None and old[:2] + old[3:] == record[:2] + record[3:]:
+            new_class = previous[name]
+        else:
+            new_class = MonsterBaseFactory(
+                name,
+                description,
+                evolution,
+                element,
+                SimpleStats(*simple),
+                ComplexStats(*[ArrayR.from_list(tokens) for tokens in complex]),
+                can_be_spawned,
+            )
+            (added if old is None else changed).append(name)
+        by_name[name] = new_class
+        monsters[idx] = new_class
+        idx += 1
+    next_of = {
+        by_name[name]: None if evolution is None else by_name[evolution]
+        for name, evolution in evolves_into.items()
+    }
+    evolutions = _evolution_table(monsters, next_of)
+    index = CatalogIndex(monsters, evolutions)
+    # Everything is built, so only now change the loaded catalog, starting with the evolution links.
+    relinked = []
+    for species, evolution_class in next_of.items():
+        if previous.get(species.get_name()) is species and species.evolution_class is not evolution_class:
+            relinked.append(species.get_name())
+        species.evolution_class = evolution_class
+    removed = [name for name in previous if name not in by_name]
+    for name in removed:
+        del globals()[name]
+    globals().update(by_name)
+    _monsters = monsters
+    _records = {record[0]: record for record in records}
+    _catalog_hash = digest
+    _evolutions = evolutions
+    _index = index
+    return CatalogDiff(added, changed, removed, relinked)
+
+
+class CatalogDiff:
+    """
+    What a reload changed, as species names.
+
+    :added: Species that are new.
+    :changed: Species whose record changed. They have new classes, and the old ones are left as they were.
+    :removed: Species that are gone.
+    :relinked: Species that kept their class, but now evolve into a different class.
+    """
+
+    def __init__(self, added: list[str], changed: list[str], removed: list[str], relinked: list[str]) -> None:
+        self.added = tuple(added)
+        self.changed = tuple(changed)
+        self.removed = tuple(removed)
+        self.relinked = tuple(relinked)
+
+    def __bool__(self) -> bool:
+        return len(self.added) + len(self.changed) + len(self.removed) + len(self.relinked) > 0
+
+def add_reload_listener(listener: Callable[[CatalogDiff], None]) -> None:
+    """Calls `listener` with the CatalogDiff after every `reload_catalog` that changes anything."""
+    _reload_listeners.append(listener)
+
+def reload_catalog() -> CatalogDiff:
+    """
+    Reads monsters.yaml again and swaps the species that changed into the catalog.
+
+    Species that did not change keep their classes, so nothing derived from them has to be rebuilt:
+    level curves already worked out are carried over, with only the rows of the new classes worked out again. Monsters, teams and battles
+    made before the reload keep using the classes they were made with.
+    """
+    # n = number of species, c = number of species that changed, L = max_level of the cached level curves
+    # O(n log n + n * L + c * L), and O(n) parsing if the catalog cache has no entry for the new content
+    previous = _monsters
+    diff = _install(*_read_catalog_records())
+    for key in [key for key in _curves if key[0] != _catalog_hash]:
+        curves = _curves.pop(key)
+        if previous is not None:
+            _carry_curves(curves, previous, key[1], key[2])
+    if diff:
+        for listener in _reload_listeners:
+            listener(diff)
+    return diff
+
+def _parse_catalog(source: bytes) -> list[tuple]:
+    """Parses monsters.yaml into one record per species, with every complex formula split into tokens."""
+    import yaml
+    records = []
+    for monster in yaml.safe_load(source):
         simple = monster["simple"]
         complex = monster["complex"]
-        new_class = MonsterBaseFactory(
+        records.append((
             monster["name"],
             monster["description"],
             monster.get("evolution", None),
             monster["element"],
-            SimpleStats(simple["attack"], simple["defense"], simple["speed"], simple["max_hp"]),
-            ComplexStats(
-                ArrayR.from_list(str(complex["attack"]).split()),
-                ArrayR.from_list(str(complex["defense"]).split()),
-                ArrayR.from_list(str(complex["speed"]).split()),
-                ArrayR.from_list(str(complex["max_hp"]).split()),
-            ),
-            monster.get("can_be_spawned", False)
-        )
-        globals()[monster["name"]] = new_class
-        _monsters[idx] = new_class
-        idx += 1
-    # Now assign evolution
-    for monster in monsters_yaml:
-        evolution = monster.get("evolution", None)
-        if evolution is None:
-            continue
-        evolution_class = globals()[evolution]
-        globals()[monster["name"]].evolution_class = evolution_class
-        globals()[monster["name"]].get_evolution = classmethod(lambda s: s.evolution_class)
-
-get_all_monsters()
+            tuple(simple[stat] for stat in CURVE_STATS),
+            tuple(tuple(str(complex[stat]).split()) for stat in CURVE_STATS),
+            monster.get("can_be_spawned", False),
+        ))
+    return records
+
+def _load_catalog_records() -> list[tuple]:
+    """
+    The species records of monsters.yaml, read with marshal from CACHE_DIR if it holds a record file
+    for the current content of monsters.yaml. Otherwise the YAML is parsed and the record file written.
+    """
+    return _read_catalog_records()[1]
+
+def _read_catalog_records() -> tuple[str, list[tuple]]:
+    """The SHA-1 of monsters.yaml and its species records, see `_load_catalog_records`."""
+    with open("monsters.yaml", "rb") as f:
+        source = f.read()
+    digest = hashlib.sha1(source).hexdigest()
+    path = os.path.join(CACHE_DIR, f"catalog-{digest}.marshal")
+    try:
+        with open(path, "rb") as f:
+            version, records = marshal.load(f)
+        if version == CATALOG_FORMAT:
+            return digest, records
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+    records = _parse_catalog(source)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            marshal.dump((CATALOG_FORMAT, records), f)
+        os.replace(temp_path, path)
+    except OSError:
+        # A read-only checkout still works, it just parses the YAML every time.
+        pass
+    return digest, records
+
+
+class Evolution:
+    """
+    Where a species sits in its evolution chain.
+
+    :next: The species it evolves into, or None if it does not evolve.
+    :depth: The number of evolutions from the first form of the chain to this species.
+    :final: The last form of the chain, which is the species itself if it does not evolve.
+    :deltas: The change in simple (attack, defense, speed, max HP) when it evolves, or None.
+    """
+
+    __slots__ = ("next", "depth", "final", "deltas")
+
+    def __init__(self, next: type[MonsterBase], depth: int, final: type[MonsterBase], deltas: tuple) -> None:
+        self.next = next
+        self.depth = depth
+        self.final = final
+        self.deltas = deltas
+
+
+def _evolution_table(
+    monsters: ArrayR[type[MonsterBase]], next_of: dict[type[MonsterBase], type[MonsterBase]]
+) -> dict[type[MonsterBase], Evolution]:
+    """
+    The Evolution of every species in `monsters`, where species evolves into next_of[species] (or None).
+    The evolutions must not form a cycle.
+    """
+    # n = number of species
+    # O(n * length of the longest chain)
+    previous = {}
+    for species, evolution in next_of.items():
+        if evolution is not None:
+            previous[evolution] = species
+    evolutions = {}
+    for i in range(len(monsters)):
+        species = monsters[i]
+        depth = 0
+        first = species
+        while first in previous:
+            first = previous[first]
+            depth += 1
+        final = species
+        while next_of[final] is not None:
+            final = next_of[final]
+        deltas = None
+        if next_of[species] is not None:
+            before = species.get_simple_stats()
+            after = next_of[species].get_simple_stats()
+            deltas = (
+                after.get_attack() - before.get_attack(),
+                after.get_defense() - before.get_defense(),
+                after.get_speed() - before.get_speed(),
+                after.get_max_hp() - before.get_max_hp(),
+            )
+        evolutions[species] = Evolution(next_of[species], depth, final, deltas)
+    return evolutions
+
+def get_evolution_table() -> dict[type[MonsterBase], Evolution]:
+    """The Evolution of every species in the catalog, computed when the catalog is loaded."""
+    if _monsters is None:
+        _make_all_monster_classes()
+    return _evolutions
+
+class CatalogIndex:
+    """
+    Precomputed groupings of the catalog. Every group is an ArrayR of species in catalog order,
+    except `by_stat`, which is ordered by the stat, smallest first (ties in catalog order).
+
+    :spawnable: The species that can be spawned.
+    :by_element: Element name in upper case -> its species.
+    :by_stage: Evolution depth (0 for first forms) -> the species at that depth.
+    :by_stat: Name in CURVE_STATS -> every species, ordered by that simple stat.
+    """
+
+    def __init__(self, catalog: ArrayR[type[MonsterBase]], evolutions: dict[type[MonsterBase], Evolution]) -> None:
+        # n = number of species
+        # O(n log n)
+        species = [catalog[i] for i in range(len(catalog))]
+        self.spawnable = ArrayR.from_list([monster for monster in species if monster.can_be_spawned()])
+        by_element = {}
+        by_stage = {}
+        for monster in species:
+            by_element.setdefault(monster.get_element().upper(), []).append(monster)
+            by_stage.setdefault(evolutions[monster].depth, []).append(monster)
+        self.by_element = {element: ArrayR.from_list(group) for element, group in by_element.items()}
+        self.by_stage = {depth: ArrayR.from_list(group) for depth, group in by_stage.items()}
+        self.by_stat = {}
+        for stat in CURVE_STATS:
+            getter = f"get_{stat}"
+            self.by_stat[stat] = ArrayR.from_list(
+                sorted(species, key=lambda monster: getattr(monster.get_simple_stats(), getter)())
+            )
+
+    def of_element(self, element: str) -> ArrayR[type[MonsterBase]]:
+        """The species of the element called `element` (e.g. "Fire" or Element.FIRE.name), which may be none."""
+        return self.by_element.get(element.upper(), ArrayR(0))
+
+    def at_stage(self, depth: int) -> ArrayR[type[MonsterBase]]:
+        """The species `depth` evolutions from the first form of their chain, which may be none."""
+        return self.by_stage.get(depth, ArrayR(0))
+
+    def sorted_by(self, stat: str) -> ArrayR[type[MonsterBase]]:
+        """Every species, ordered by the simple stat called `stat` ("attack", "defense", "speed" or "max_hp")."""
+        return self.by_stat[stat]
+
+def get_catalog_index() -> CatalogIndex:
+    """The CatalogIndex of the current catalog, built when the catalog is loaded."""
+    if _monsters is None:
+        _make_all_monster_classes()
+    return _index
+
+def get_spawnable_monsters() -> ArrayR[type[MonsterBase]]:
+    """The species that can be spawned, in catalog order."""
+    return get_catalog_index().spawnable
+
+def catalog_hash() -> str:
+    """
+    The SHA-1 of monsters.yaml as it was when the loaded catalog was read, identifying the catalog in on-disk caches.
+    Editing monsters.yaml does not change it until `reload_catalog`.
+    """
+    if _monsters is None:
+        _make_all_monster_classes()
+    return _catalog_hash
+
+def get_level_curves(max_level: int, simple_mode: bool = False):
+    """
+    The stats of every species at every level from 1 to max_level, as a NumPy array of
+    shape (number of species, 4, max_level).
+    Index [i, s, level - 1] is stat CURVE_STATS[s] of get_all_monsters()[i] at that level.
+
+    Curves are cached in memory, and on disk in CACHE_DIR keyed by `catalog_hash()`, the hash of
+    monsters.yaml when the loaded catalog was read.
+    """
+    # n = number of species, L = max_level
+    # O(n * L) the first time, O(1) from memory, O(n * L) to read from disk
+    import numpy as np
+    key = (catalog_hash(), simple_mode, max_level)
+    if key in _curves:
+        return _curves[key]
+    path = _curves_path(key)
+    if os.path.exists(path):
+        curves = np.load(path)
+        curves.flags.writeable = False
+        _curves[key] = curves
+        return curves
+    monsters = get_all_monsters()
+    curves = np.empty((len(monsters), len(CURVE_STATS), max_level))
+    _fill_curves(curves, monsters, range(len(monsters)), simple_mode)
+    return _store_curves(key, curves)
+
+def _curves_path(key: tuple) -> str:
+    digest, simple_mode, max_level = key
+    return os.path.join(CACHE_DIR, f"curves-{digest}-{'simple' if simple_mode else 'complex'}-{max_level}.npy")
+
+def _fill_curves(curves, monsters: ArrayR[type[MonsterBase]], rows, simple_mode: bool) -> None:
+    """Works out the rows `rows` of `curves`, laid out as in `get_level_curves`, for the species `monsters`."""
+    # r = number of rows, L = max_level
+    # O(r * L)
+    import numpy as np
+    levels = np.arange(1, curves.shape[2] + 1)
+    for i in rows:
+        if simple_mode:
+            stats = monsters[i].get_simple_stats()
+            for s, stat in enumerate(CURVE_STATS):
+                curves[i, s] = getattr(stats, f"get_{stat}")()
+        else:
+            stats = monsters[i].get_complex_stats()
+            for s, stat in enumerate(CURVE_STATS):
+                curves[i, s] = getattr(stats, stat).evaluate_many(levels)
+
+def _store_curves(key: tuple, curves):
+    """Caches `curves` under `key` in memory and on disk, and returns them."""
+    import numpy as np
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        path = _curves_path(key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            np.save(f, curves)
+        os.replace(temp_path, path)
+    except OSError:
+        # A read-only checkout still works, the curves are just only cached in memory.
+        pass
+    curves.flags.writeable = False
+    _curves[key] = curves
+    return curves
+
+def _carry_curves(curves, previous: ArrayR[type[MonsterBase]], simple_mode: bool, max_level: int) -> None:
+    """
+    Caches the level curves of the loaded catalog from `curves`, those of the catalog `previous`.
+    Rows of species that kept their class are copied, and only the others are worked out.
+    """
+    # n = number of species, L = max_level
+    # O(n * L)
+    import numpy as np
+    key = (_catalog_hash, simple_mode, max_level)
+    if key in _curves:
+        return
+    old_rows = {previous[i]: i for i in range(len(previous))}
+    monsters = _monsters
+    carried = np.empty((len(monsters), len(CURVE_STATS), max_level))
+    fresh = []
+    for i in range(len(monsters)):
+        j = old_rows.get(monsters[i])
+        if j is None:
+            fresh.append(i)
+        else:
+            carried[i] = curves[j]
+    _fill_curves(carried, monsters, fresh, simple_mode)
+    _store_curves(key, carried)
+
+def __getattr__(name: str):
+    """
+    Loads the catalog the first time a species is looked up, so importing this module reads no files.
+    `from helpers import Flamikin` works as before.
+    """
+    if not name.startswith("__") and _monsters is None:
+        _make_all_monster_classes()
+        if name in globals():
+            return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if TYPE_CHECKING:
     # Makes no sense but fixes the red squigglies
@@ -0,0 +1,105 @@
+"""
+Opt-in call counters and timers for the battle hot path.
+
+`enable` wraps every method in TARGETS so that it counts its calls and
+accumulates the time spent in it, and `disable` removes those wrappers again.
+Nothing is wrapped until `enable` is called, so there is no cost at all
+while instrumentation is off. Wrappers go through the shared `patches`
+registry, so tracing can be started and stopped in between.
+
+Times are inclusive: `Battle.process_turn` includes the time spent in the
+team and container methods it calls.
+
+Usage:
+```
+instrumentation.enable()
+tower_run()
+instrumentation.disable()
+print(instrumentation.report())
+```
+"""
+from __future__ import annotations
+
+import functools
+import time
+
+import patches
+from battle import Battle
+from data_structures.array_sorted_list import ArraySortedList
+from data_structures.queue_adt import CircularQueue
+from data_structures.stack_adt import ArrayStack
+from team import MonsterTeam
+
+TARGETS = [
+    (Battle, "process_turn"),
+    (Battle, "calc_damage"),
+    (MonsterTeam, "add_to_team"),
+    (MonsterTeam, "retrieve_from_team"),
+    (MonsterTeam, "special"),
+    (MonsterTeam, "regenerate_team"),
+    (ArrayStack, "push"),
+    (ArrayStack, "pop"),
+    (CircularQueue, "append"),
+    (CircularQueue, "serve"),
+    (ArraySortedList, "add"),
+    (ArraySortedList, "delete_at_index"),
+]
+
+# "Class.method" -> [calls, seconds]
+_counters: dict[str, list] = {}
+# Owner of the wrappers in the `patches` registry.
+_OWNER = __name__
+
+
+def _wrap(name: str, function):
+    counter = _counters.setdefault(name, [0, 0.0])
+    perf_counter = time.perf_counter
+
+    @functools.wraps(function)
+    def counted(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            counter[0] += 1
+            counter[1] += perf_counter() - start
+
+    return counted
+
+
+def is_enabled() -> bool:
+    return patches.is_wrapped(_OWNER)
+
+
+def enable() -> None:
+    """Starts counting calls to every method in TARGETS. Counts carry on from any earlier run."""
+    if is_enabled():
+        return
+    for cls, method in TARGETS:
+        patches.wrap(_OWNER, cls, method, functools.partial(_wrap, f"{cls.__name__}.{method}"))
+
+
+def disable() -> None:
+    """Removes the counting wrappers. The counts are kept until `reset`."""
+    patches.unwrap(_OWNER)
+
+
+def reset() -> None:
+    """Sets every count and time back to 0."""
+    for counter in _counters.values():
+        counter[0] = 0
+        counter[1] = 0.0
+
+
+def snapshot() -> dict[str, tuple[int, float]]:
+    """The (calls, seconds) of every method called so far, by "Class.method"."""
+    return {name: (calls, seconds) for name, (calls, seconds) in _counters.items() if calls > 0}
+
+
+def report() -> str:
+    """A table of calls, total time and time per call for every method called, slowest first."""
+    rows = sorted(snapshot().items(), key=lambda row: row[1][1], reverse=True)
+    lines = [f"{'method':<32}{'calls':>12}{'total s':>12}{'per call us':>14}"]
+    for name, (calls, seconds) in rows:
+        lines.append(f"{name:<32}{calls:>12}{seconds:>12.4f}{seconds / calls * 1e6:>14.2f}")
+    return "\n".join(lines)
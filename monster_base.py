@@ -1,13 +1,15 @@
 from __future__ import annotations
 import abc
+from typing import Optional
 
 import stats
+from elements import element_id
 from stats import Stats
 
 
 class MonsterBase(abc.ABC):
 
-    original_level = 1
+    __slots__ = ("original_level", "_level", "_simple_mode", "cached_stats", "hp")
 
     def __init__(self, simple_mode=True, level:int=1) -> None:
         """
@@ -18,20 +20,50 @@ class MonsterBase(abc.ABC):
         :original_level: stores the level of the monster when it was created for evolution purposes.
         """
         self.original_level = level
-        self.level = level
-        self.simple_mode = simple_mode
-        if simple_mode:
-            self.hp = self.get_max_hp()
-
+        self._level = level
+        self._simple_mode = simple_mode
+        self.refresh_stats()
+        self.hp = self.get_max_hp()
+
+    @property
+    def level(self) -> int:
+        return self._level
+
+    @level.setter
+    def level(self, val: int) -> None:
+        self._level = val
+        self.refresh_stats()
+
+    @property
+    def simple_mode(self) -> bool:
+        return self._simple_mode
+
+    @simple_mode.setter
+    def simple_mode(self, val: bool) -> None:
+        self._simple_mode = val
+        self.refresh_stats()
+
+    def refresh_stats(self) -> None:
+        """
+        Recomputes the cached (attack, defense, speed, max HP) of this monster instance.
+        Called whenever the level or the stats mode changes, so the getters never evaluate the stats themselves.
+        """
+        if self._simple_mode:
+            stats = self.get_simple_stats()
+            self.cached_stats = (stats.get_attack(), stats.get_defense(), stats.get_speed(), stats.get_max_hp())
+        else:
+            stats = self.get_complex_stats()
+            level = self._level
+            self.cached_stats = (stats.get_attack(level), stats.get_defense(level), stats.get_speed(level), stats.get_max_hp(level))
 
     def get_level(self):
         """The current level of this monster instance"""
-        return self.level
+        return self._level
 
     def level_up(self):
         """Increase the level of this monster instance by 1"""
-        diff = self.get_max_hp() - self.get_hp()
-        self.level += 1
+        diff = self.get_max_hp() - self.hp
+        self.level = self._level + 1
         self.hp = self.get_max_hp() - diff
 
 
@@ -45,19 +77,23 @@ class MonsterBase(abc.ABC):
 
     def get_attack(self):
         """Get the attack of this monster instance"""
-        return self.get_simple_stats().get_attack()
+        # O(1)
+        return self.cached_stats[0]
 
     def get_defense(self):
         """Get the defense of this monster instance"""
-        return self.get_simple_stats().get_defense()
+        # O(1)
+        return self.cached_stats[1]
 
     def get_speed(self):
         """Get the speed of this monster instance"""
-        return self.get_simple_stats().get_speed()
+        # O(1)
+        return self.cached_stats[2]
 
     def get_max_hp(self):
         """Get the maximum HP of this monster instance"""
-        return self.get_simple_stats().get_max_hp()
+        # O(1)
+        return self.cached_stats[3]
 
     def alive(self) -> bool:
         """Whether the current monster instance is alive (HP > 0 )"""
@@ -83,15 +119,47 @@ class MonsterBase(abc.ABC):
             return True
         return False
 
-    def evolve(self) -> MonsterBase:
-        """Evolve this monster instance by returning a new instance of a monster class."""
+    def evolve(self, in_place: bool = False) -> MonsterBase:
+        """
+        Evolve this monster instance by returning a new instance of a monster class.
+
+        :in_place: Instead of making a new instance, turn this instance into its evolution and return it,
+            so it keeps its place in any team. Only species from the catalog can evolve in place.
+        """
         if self.ready_to_evolve():
-            new_mon = self.get_evolution()(self.simple_mode, self.level)
-            diff = self.get_max_hp() - self.get_hp()
-            new_hp = new_mon.get_max_hp() -diff
-            new_mon.set_hp(new_hp)
+            if in_place:
+                return self._evolve_in_place()
+            new_mon = self.get_evolution()(self._simple_mode, self._level)
+            diff = self.get_max_hp() - self.hp
+            new_mon.set_hp(new_mon.get_max_hp() - diff)
             return new_mon
 
+    def save_form(self) -> tuple:
+        """The species, level and original level of this monster instance, to put back with `restore_form`."""
+        return (type(self), self._level, self.original_level)
+
+    def restore_form(self, form: tuple) -> None:
+        """Puts back the species, level and original level captured by `save_form`, for example after evolving in place."""
+        species, level, original_level = form
+        if self.__class__ is not species or self._level != level:
+            self.__class__ = species
+            self._level = level
+            self.refresh_stats()
+        self.original_level = original_level
+
+    def _evolve_in_place(self) -> MonsterBase:
+        import helpers
+        evolution = helpers.get_evolution_table().get(type(self))
+        if evolution is None:
+            raise ValueError(f"{type(self).__name__} is not a catalog species, so it cannot evolve in place")
+        diff = self.cached_stats[3] - self.hp
+        # Species classes share the slots of MonsterBase, so the instance can switch class.
+        self.__class__ = evolution.next
+        self.original_level = self._level
+        self.refresh_stats()
+        self.hp = self.cached_stats[3] - diff
+        return self
+
     def __str__(self):
         """Returns string value of the monster"""
         return f"LV.{self.get_level()} {self.get_name()}, {self.get_hp()}/{self.get_max_hp()} HP"
@@ -131,6 +199,14 @@ class MonsterBase(abc.ABC):
         """
         pass
 
+    @classmethod
+    def get_element_id(cls) -> Optional[int]:
+        """
+        Returns the `element_id` of the element of the Monster, for indexing effectiveness tables,
+        or None if the element is not an Element constant.
+        """
+        return element_id(cls.get_element())
+
     @classmethod
     @abc.abstractmethod
     def can_be_spawned(cls) -> bool:
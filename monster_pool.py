@@ -0,0 +1,348 @@
+"""
+A struct-of-arrays store for very large numbers of live monsters.
+
+A `MonsterPool` keeps the species, level, original level, HP and stats mode
+of every monster in typed parallel arrays, so a pooled monster takes a few
+bytes in each array instead of a whole Python object. `spawn` hands out a
+`PooledMonster` handle, which implements the `MonsterBase` interface on top of
+the arrays, so `MonsterTeam` and `Battle` work on pooled monsters unchanged.
+
+The handle class of each species is a distinct type, named after the species,
+so code that tells monsters apart by `type(monster)` still does. Handle classes
+are made once per species and shared by every pool; a catalog reload only makes
+new ones for the species it replaced. Handles compare equal when they point at
+the same slot of the same pool.
+
+A slot is freed when the last handle to it is dropped, or earlier with `free`.
+Freed slots go on a free list and are handed out again by later spawns.
+A handle must not be used after its monster is freed.
+
+Usage:
+```
+pool = MonsterPool()
+monster = pool.spawn(Flamikin, level=3)
+monster.level_up()
+pool.free(monster)
+```
+"""
+from __future__ import annotations
+
+from array import array
+from itertools import repeat
+from typing import Optional
+
+import helpers
+from monster_base import MonsterBase
+
+# Species id of a slot that is on the free list.
+FREE = 0xFFFF
+
+
+class PooledMonster:
+    """A handle to one monster in a MonsterPool, with the interface of MonsterBase."""
+
+    __slots__ = ("pool", "index")
+
+    # Set on the handle class of each species.
+    species: type[MonsterBase] = None
+
+    def __init__(self, pool: MonsterPool, index: int) -> None:
+        self.pool = pool
+        self.index = index
+        pool.handle_counts[index] += 1
+
+    def __del__(self) -> None:
+        self.pool.release(self.index)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, PooledMonster) and self.pool is other.pool and self.index == other.index
+
+    def __hash__(self) -> int:
+        return hash((id(self.pool), self.index))
+
+    @property
+    def level(self) -> int:
+        return self.pool.levels[self.index]
+
+    @property
+    def simple_mode(self) -> bool:
+        return self.pool.simple_modes[self.index] == 1
+
+    @simple_mode.setter
+    def simple_mode(self, val: bool) -> None:
+        self.pool.simple_modes[self.index] = 1 if val else 0
+
+    def get_level(self):
+        """The current level of this monster instance"""
+        return self.pool.levels[self.index]
+
+    def level_up(self):
+        """Increase the level of this monster instance by 1"""
+        diff = self.get_max_hp() - self.get_hp()
+        self.pool.levels[self.index] += 1
+        self.set_hp(self.get_max_hp() - diff)
+
+    def get_hp(self):
+        """Get the current HP of this monster instance"""
+        return self.pool.hps[self.index]
+
+    def set_hp(self, val):
+        """Set the current HP of this monster instance"""
+        self.pool.hps[self.index] = val
+
+    def get_attack(self):
+        """Get the attack of this monster instance"""
+        return self.pool.stat(self.index, 0)
+
+    def get_defense(self):
+        """Get the defense of this monster instance"""
+        return self.pool.stat(self.index, 1)
+
+    def get_speed(self):
+        """Get the speed of this monster instance"""
+        return self.pool.stat(self.index, 2)
+
+    def get_max_hp(self):
+        """Get the maximum HP of this monster instance"""
+        return self.pool.stat(self.index, 3)
+
+    def alive(self) -> bool:
+        """Whether the current monster instance is alive (HP > 0 )"""
+        return self.get_hp() > 0
+
+    def get_original_level(self) -> int:
+        """Returns the level of the monster when it was just created"""
+        return self.pool.original_levels[self.index]
+
+    def ready_to_evolve(self) -> bool:
+        """Whether this monster is ready to evolve. See assignment spec for specific logic."""
+        return self.get_evolution() is not None and self.get_level() > self.get_original_level()
+
+    def evolve(self, in_place: bool = False) -> PooledMonster:
+        """
+        Evolve this monster instance by spawning its evolution in the same pool.
+        Like MonsterBase.evolve, this monster is left as it was, and stays allocated until freed.
+
+        :in_place: Instead, change the species in this monster's slot and return this handle.
+            Other handles to the same slot keep the class of the old species.
+        """
+        if self.ready_to_evolve():
+            if in_place:
+                diff = self.get_max_hp() - self.get_hp()
+                pool = self.pool
+                species_id = pool.species_ids[self.get_evolution()]
+                pool.species[self.index] = species_id
+                pool.original_levels[self.index] = pool.levels[self.index]
+                self.__class__ = pool.handle_classes[species_id]
+                self.set_hp(self.get_max_hp() - diff)
+                return self
+            new_mon = self.pool.spawn(self.get_evolution(), self.simple_mode, self.get_level())
+            diff = self.get_max_hp() - self.get_hp()
+            new_mon.set_hp(new_mon.get_max_hp() - diff)
+            return new_mon
+
+    def save_form(self) -> tuple:
+        """The species, level and original level of this monster, to put back with `restore_form`."""
+        return (type(self), self.pool.levels[self.index], self.pool.original_levels[self.index])
+
+    def restore_form(self, form: tuple) -> None:
+        """Puts back the species, level and original level captured by `save_form`."""
+        handle_class, level, original_level = form
+        pool = self.pool
+        if self.__class__ is not handle_class:
+            pool.species[self.index] = pool.species_ids[handle_class.species]
+            self.__class__ = handle_class
+        pool.levels[self.index] = level
+        pool.original_levels[self.index] = original_level
+
+    def __copy__(self) -> PooledMonster:
+        """A new monster in the same pool, in the same state as this one."""
+        return self.pool.copy(self)
+
+    def __str__(self):
+        """Returns string value of the monster"""
+        return f"LV.{self.get_level()} {self.get_name()}, {self.get_hp()}/{self.get_max_hp()} HP"
+
+    @classmethod
+    def get_name(cls) -> str:
+        return cls.species.get_name()
+
+    @classmethod
+    def get_description(cls) -> str:
+        return cls.species.get_description()
+
+    @classmethod
+    def get_evolution(cls) -> type[MonsterBase]:
+        return cls.species.get_evolution()
+
+    @classmethod
+    def get_element(cls) -> str:
+        return cls.species.get_element()
+
+    @classmethod
+    def get_element_id(cls) -> Optional[int]:
+        return cls.species.get_element_id()
+
+    @classmethod
+    def can_be_spawned(cls) -> bool:
+        return cls.species.can_be_spawned()
+
+    @classmethod
+    def get_simple_stats(cls):
+        return cls.species.get_simple_stats()
+
+    @classmethod
+    def get_complex_stats(cls):
+        return cls.species.get_complex_stats()
+
+
+MonsterBase.register(PooledMonster)
+
+
+# Species -> its handle class, for the species of _handle_catalog.
+_handle_classes: dict[type[MonsterBase], type[PooledMonster]] = {}
+_handle_catalog = None
+
+
+def _catalog_handle_classes(catalog) -> dict[type[MonsterBase], type[PooledMonster]]:
+    """
+    The handle class of every species of `catalog`, the loaded catalog.
+    They are made again only when the catalog has been reloaded, and then only for the species it replaced.
+    """
+    # n = number of species
+    # O(1) for the same catalog, O(n) after a reload
+    global _handle_classes, _handle_catalog
+    if catalog is not _handle_catalog:
+        handle_classes = {}
+        for i in range(len(catalog)):
+            species = catalog[i]
+            handle_class = _handle_classes.get(species)
+            if handle_class is None:
+                handle_class = type(species.get_name(), (PooledMonster,), {"__slots__": (), "species": species})
+            handle_classes[species] = handle_class
+        _handle_classes = handle_classes
+        _handle_catalog = catalog
+    return _handle_classes
+
+
+class MonsterPool:
+    """
+    :capacity: The number of slots allocated up front. The pool doubles in size whenever it is full.
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        catalog = helpers.get_all_monsters()
+        handle_classes = _catalog_handle_classes(catalog)
+        self.catalog = catalog
+        self.species_ids = {}
+        self.handle_classes = []
+        self.simple_stats = []
+        for i in range(len(catalog)):
+            species = catalog[i]
+            self.species_ids[species] = i
+            self.handle_classes.append(handle_classes[species])
+            stats = species.get_simple_stats()
+            self.simple_stats.append((stats.get_attack(), stats.get_defense(), stats.get_speed(), stats.get_max_hp()))
+        self.complex_stats = [catalog[i].get_complex_stats() for i in range(len(catalog))]
+
+        self.species = array("H")
+        self.levels = array("I")
+        self.original_levels = array("I")
+        self.hps = array("d")
+        self.simple_modes = array("B")
+        # Number of live handles to each slot
+        self.handle_counts = array("I")
+        # Slots to reuse, most recently freed last.
+        self.free_list = array("I")
+        self.size = 0
+        self.live = 0
+        self._grow(max(1, capacity))
+
+    def __len__(self) -> int:
+        """The number of live monsters."""
+        return self.live
+
+    @property
+    def capacity(self) -> int:
+        return len(self.species)
+
+    def _grow(self, extra: int) -> None:
+        for column in (self.levels, self.original_levels, self.hps, self.simple_modes, self.handle_counts):
+            column.extend(repeat(0, extra))
+        self.species.extend(repeat(FREE, extra))
+
+    def spawn(self, species: type[MonsterBase], simple_mode: bool = True, level: int = 1) -> PooledMonster:
+        """Allocates a monster of `species` at full HP and returns its handle."""
+        # O(1) amortised
+        species_id = self.species_ids.get(species)
+        if species_id is None:
+            raise ValueError(f"{species.__name__} is not in the catalog")
+        index = self._allocate()
+        self.species[index] = species_id
+        self.levels[index] = level
+        self.original_levels[index] = level
+        self.simple_modes[index] = 1 if simple_mode else 0
+        handle = self.handle_classes[species_id](self, index)
+        self.hps[index] = handle.get_max_hp()
+        return handle
+
+    def copy(self, monster: PooledMonster) -> PooledMonster:
+        """Allocates a new monster in the same state as `monster`, which must be in this pool."""
+        # O(1) amortised
+        source = monster.index
+        index = self._allocate()
+        for column in (self.species, self.levels, self.original_levels, self.hps, self.simple_modes):
+            column[index] = column[source]
+        return self.handle_classes[self.species[index]](self, index)
+
+    def _allocate(self) -> int:
+        """The index of a slot to put a new monster in."""
+        self.live += 1
+        if len(self.free_list) > 0:
+            return self.free_list.pop()
+        if self.size == self.capacity:
+            self._grow(self.capacity)
+        self.size += 1
+        return self.size - 1
+
+    def handle(self, index: int) -> PooledMonster:
+        """A handle to the live monster in slot `index`."""
+        if index >= self.size or self.species[index] == FREE:
+            raise IndexError(f"Slot {index} holds no monster")
+        return self.handle_classes[self.species[index]](self, index)
+
+    def release(self, index: int) -> None:
+        """Called when a handle to slot `index` is dropped. Frees the slot if that was the last handle to it."""
+        # O(1)
+        self.handle_counts[index] -= 1
+        if self.handle_counts[index] == 0 and self.species[index] != FREE:
+            self._free_slot(index)
+
+    def free(self, monster: PooledMonster) -> None:
+        """Returns the slot of `monster` to the free list."""
+        # O(1)
+        index = monster.index
+        if monster.pool is not self or self.species[index] == FREE:
+            raise ValueError(f"{monster.get_name()} is not a live monster of this pool")
+        self._free_slot(index)
+
+    def _free_slot(self, index: int) -> None:
+        self.species[index] = FREE
+        self.free_list.append(index)
+        self.live -= 1
+
+    def stat(self, index: int, stat: int):
+        """Stat number `stat` (attack, defense, speed, max HP) of the monster in slot `index`."""
+        # O(1)
+        species_id = self.species[index]
+        if self.simple_modes[index]:
+            return self.simple_stats[species_id][stat]
+        stats = self.complex_stats[species_id]
+        level = self.levels[index]
+        if stat == 0:
+            return stats.get_attack(level)
+        if stat == 1:
+            return stats.get_defense(level)
+        if stat == 2:
+            return stats.get_speed(level)
+        return stats.get_max_hp(level)
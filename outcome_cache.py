@@ -0,0 +1,100 @@
+"""
+Cache of battle outcomes keyed by team composition.
+
+A battle between deterministic policies is decided entirely by the teams'
+contents, so replaying a matchup (for example after `regenerate_team`) always
+gives the same result. `OutcomeCache` remembers results by a canonical
+signature of both teams and of the battle settings, evicting the least
+recently used matchup once it holds `max_size` of them.
+
+Usage:
+```
+b = Battle(outcome_cache=OutcomeCache())
+b.battle(team1, team2)
+```
+On a hit the battle is not played, so the teams are left as they were.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Optional, TYPE_CHECKING
+
+import rulesets
+from team import MonsterTeam
+
+if TYPE_CHECKING:
+    from battle import Battle
+
+
+def team_signature(team: MonsterTeam) -> Optional[tuple]:
+    """
+    The species, level and HP of every monster in the team, in order, with the team and sort modes
+    and the policy. None if the team's policy does not opt in to caching with `Policy.cache_key`.
+    """
+    # n = length of team
+    # O(n)
+    policy_key = team.resolve_policy().cache_key()
+    if policy_key is None:
+        return None
+    _, ascen, entries, hps, _ = team.snapshot()
+    if team.team_mode == MonsterTeam.TeamMode.OPTIMISE:
+        monsters = tuple((type(item.value), item.value.get_level(), item.value.simple_mode, key) for item, key in entries)
+    else:
+        monsters = tuple((type(monster), monster.get_level(), monster.simple_mode) for monster in entries)
+    # The modes are BaseEnums, which are not hashable.
+    return team.team_mode.value, team.sort_mode.value, ascen, policy_key, monsters, hps
+
+
+class OutcomeCache:
+    """
+    :max_size: The most matchups remembered.
+
+    `hits` and `misses` count lookups, and `bypasses` counts battles that could not be
+    cached: a team with a non-deterministic or custom policy, or a battle with a time limit.
+    """
+
+    def __init__(self, max_size: int = 4096) -> None:
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def signature(self, battle: Battle, team1: MonsterTeam, team2: MonsterTeam) -> Optional[tuple]:
+        """The key of a battle about to start, or None (counted as a bypass) if it cannot be cached."""
+        # n = length of the longer team
+        # O(n)
+        signature1 = team_signature(team1)
+        signature2 = None if signature1 is None else team_signature(team2)
+        if signature2 is None or battle.time_limit is not None:
+            self.bypasses += 1
+            return None
+        ruleset = None if battle.ruleset is None else rulesets.registry.get(battle.ruleset)
+        return type(battle), battle.max_turns, battle.detect_cycles, ruleset, signature1, signature2
+
+    def get(self, key: tuple) -> Optional[tuple]:
+        """The (result, turn_number, stop_reason) stored for `key`, or None."""
+        # O(1)
+        outcome = self.entries.get(key)
+        if outcome is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return outcome
+
+    def put(self, key: tuple, outcome: tuple) -> None:
+        # O(1)
+        self.entries[key] = outcome
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
@@ -0,0 +1,71 @@
+"""
+Shared registry of the method wrappers installed by `instrumentation` and `tracing`.
+
+Every patched method keeps its original function and one wrapper layer per
+owner (the instrumentation module, or a started `Tracer`). Adding or removing
+a layer rebuilds the method from the original with the layers that are left,
+so owners can be turned on and off in any order without putting back each
+other's wrappers. Once a method has no layers its original function is put
+back as it was.
+
+Usage:
+```
+patches.wrap(owner, Battle, "process_turn", lambda function: counted(function))
+patches.unwrap(owner)
+```
+"""
+from __future__ import annotations
+
+from typing import Callable
+
+# (class, method name) -> the function the class defined
+_originals: dict[tuple[type, str], object] = {}
+# (class, method name) -> [(owner, make_wrapper)], innermost first
+_layers: dict[tuple[type, str], list] = {}
+
+
+def _rebuild(cls: type, method: str) -> None:
+    # n = number of layers on the method
+    # O(n)
+    key = (cls, method)
+    function = _originals[key]
+    layers = _layers[key]
+    for _, make_wrapper in layers:
+        function = make_wrapper(function)
+    setattr(cls, method, function)
+    if len(layers) == 0:
+        del _originals[key]
+        del _layers[key]
+
+
+def wrap(owner: object, cls: type, method: str, make_wrapper: Callable) -> None:
+    """
+    Adds a layer to `cls.method` for `owner`. `make_wrapper(function)` returns the function that
+    replaces `function`, and is called again whenever the layers under it change.
+    Layers added later wrap the ones added earlier.
+    """
+    key = (cls, method)
+    if key not in _originals:
+        _originals[key] = cls.__dict__[method]
+        _layers[key] = []
+    _layers[key].append((owner, make_wrapper))
+    _rebuild(cls, method)
+
+
+def unwrap(owner: object) -> None:
+    """Removes every layer of `owner`, leaving the layers of other owners in place."""
+    for key, layers in list(_layers.items()):
+        kept = [layer for layer in layers if layer[0] is not owner]
+        if len(kept) != len(layers):
+            _layers[key] = kept
+            _rebuild(*key)
+
+
+def is_wrapped(owner: object) -> bool:
+    """Whether `owner` has any layer installed."""
+    return any(layer[0] is owner for layers in _layers.values() for layer in layers)
+
+
+def original(cls: type, method: str):
+    """The function `cls` defined for `method`, whether or not it is wrapped."""
+    return _originals.get((cls, method), cls.__dict__[method])
@@ -0,0 +1,158 @@
+"""
+Action policies: how a team chooses its action each turn.
+
+A team battles with the policy given as `MonsterTeam(..., policy=...)`, or the
+speed/HP heuristic by default. A `choose_action` overridden on a subclass or
+assigned to a team still takes priority, wrapped in a `CallablePolicy`.
+`Battle` resolves both policies once when the battle starts.
+
+`decide_many` decides for many battles in one call. Each row of `states` is
+(speed, hp, enemy speed, enemy hp) of the monsters out, see the STATE_ columns.
+"""
+from __future__ import annotations
+
+import copy
+import math
+from abc import ABC, abstractmethod
+from fractions import Fraction
+from typing import Callable, Optional
+
+from battle import Battle
+from monster_base import MonsterBase
+
+STATE_SPEED = 0
+STATE_HP = 1
+STATE_ENEMY_SPEED = 2
+STATE_ENEMY_HP = 3
+
+
+class Policy(ABC):
+
+    @abstractmethod
+    def decide(self, currently_out: MonsterBase, enemy: MonsterBase) -> Battle.Action:
+        """The action to take this turn."""
+        pass
+
+    def decide_many(self, states):
+        """
+        Decides for every row of `states`, an (n, 4) NumPy array of STATE_ columns.
+        Returns an array of the `Battle.Action` values chosen.
+
+        By default this calls `decide` once per row, on stand-ins for the two monsters that only have
+        `get_speed` and `get_hp`, so it only works for policies that look at nothing else.
+        Policies that override it with a vectorised version can be batched, see `can_decide_many`.
+        """
+        # n = number of rows
+        # O(n)
+        import numpy as np
+        out = _StateMonster()
+        enemy = _StateMonster()
+        actions = np.empty(len(states), dtype=np.int64)
+        for i, row in enumerate(np.asarray(states).tolist()):
+            out.speed, out.hp, enemy.speed, enemy.hp = row
+            actions[i] = self.decide(out, enemy).value
+        return actions
+
+    def start_battle(self, battle: Battle) -> None:
+        """Called once the battle has sent out its first monsters, before the first turn."""
+        pass
+
+    def clone(self) -> Policy:
+        """
+        A policy that decides the same way as this one but shares no state with it, for `MonsterTeam.clone`.
+        By default a shallow copy. Policies that keep state between decisions or battles override it.
+        """
+        return copy.copy(self)
+
+    def can_decide_many(self) -> bool:
+        """Whether this policy overrides `decide_many`, and so can be used by `BatchBattle`."""
+        return type(self).decide_many is not Policy.decide_many
+
+    def cache_key(self):
+        """
+        A hashable key such that policies with equal keys always decide the same way,
+        or None if battles with this policy must not be cached. See `OutcomeCache`.
+        Policies are not cached unless they opt in, since a policy may keep state between
+        decisions or battles that the cache cannot see.
+        """
+        return None
+
+    def attack_horizon(self, currently_out: MonsterBase, enemy: MonsterBase, out_loss, enemy_loss) -> Optional[int]:
+        """
+        Returns how many consecutive turns, starting now, this policy is guaranteed to choose ATTACK
+        while its monster loses `out_loss` HP per turn and the enemy loses `enemy_loss` HP per turn.
+        None means every turn. Policies that cannot be predicted give 0.
+        """
+        return 0
+
+
+class _StateMonster:
+    """The monster out on one side of a `decide_many` state row. Only its speed and HP are known."""
+
+    __slots__ = ("speed", "hp")
+
+    def get_speed(self):
+        return self.speed
+
+    def get_hp(self):
+        return self.hp
+
+
+class AttackPolicy(Policy):
+    """Always attacks."""
+
+    def decide(self, currently_out: MonsterBase, enemy: MonsterBase) -> Battle.Action:
+        return Battle.Action.ATTACK
+
+    def decide_many(self, states):
+        import numpy as np
+        return np.full(len(states), Battle.Action.ATTACK.value)
+
+    def cache_key(self):
+        return AttackPolicy
+
+    def attack_horizon(self, currently_out: MonsterBase, enemy: MonsterBase, out_loss, enemy_loss) -> Optional[int]:
+        return None
+
+
+class HeuristicPolicy(Policy):
+    """Attacks while at least as fast as the enemy, or with at least as much HP. Otherwise swaps."""
+
+    def decide(self, currently_out: MonsterBase, enemy: MonsterBase) -> Battle.Action:
+        if currently_out.get_speed() >= enemy.get_speed() or currently_out.get_hp() >= enemy.get_hp():
+            return Battle.Action.ATTACK
+        return Battle.Action.SWAP
+
+    def decide_many(self, states):
+        import numpy as np
+        attack = (states[:, STATE_SPEED] >= states[:, STATE_ENEMY_SPEED]) | \
+            (states[:, STATE_HP] >= states[:, STATE_ENEMY_HP])
+        return np.where(attack, Battle.Action.ATTACK.value, Battle.Action.SWAP.value)
+
+    def cache_key(self):
+        return HeuristicPolicy
+
+    def attack_horizon(self, currently_out: MonsterBase, enemy: MonsterBase, out_loss, enemy_loss) -> Optional[int]:
+        if currently_out.get_speed() >= enemy.get_speed():
+            return None
+        lead = Fraction(currently_out.get_hp()) - Fraction(enemy.get_hp())
+        if lead < 0:
+            return 0
+        slope = Fraction(out_loss) - Fraction(enemy_loss)
+        if slope <= 0:
+            return None
+        return math.floor(lead / slope) + 1
+
+
+class CallablePolicy(Policy):
+    """Wraps a `choose_action(currently_out, enemy)` function."""
+
+    def __init__(self, choose_action: Callable[[MonsterBase, MonsterBase], Battle.Action]) -> None:
+        self.choose_action = choose_action
+
+    def decide(self, currently_out: MonsterBase, enemy: MonsterBase) -> Battle.Action:
+        return self.choose_action(currently_out, enemy)
+
+
+# Shared by every team without a policy of its own.
+DEFAULT_POLICY = HeuristicPolicy()
@@ -0,0 +1,172 @@
+"""
+Named type effectiveness rulesets, stored as memory-mapped binary tables.
+
+Each ruleset comes from a CSV in the format of `type_effectiveness.csv`. It is
+parsed once and compiled into a compact binary table in the cache directory,
+keyed by a hash of the CSV, and then memory-mapped read-only. Worker processes
+can `attach` the compiled tables (see `RulesetRegistry.paths`) instead of
+parsing the CSVs again, and the operating system shares the mapped pages
+between them.
+
+A `Battle` picks a ruleset by name with `Battle(ruleset=...)`. Registering a
+name again swaps in the new table for every battle started afterwards. The
+replaced table is not closed, since battles already running may still use it;
+its mapping is released once nothing refers to it.
+
+Usage:
+```
+rulesets.registry.register("fire_buff", "experiments/fire_buff.csv")
+Battle(ruleset="fire_buff").battle(team1, team2)
+```
+"""
+from __future__ import annotations
+
+import csv
+import hashlib
+import mmap
+import os
+import struct
+
+from elements import Element, element_id
+
+MAGIC = b"EFFT"
+VERSION = 1
+# magic, version, padding, number of elements, size of the names in bytes
+HEADER = struct.Struct("<4sHxxII")
+
+DEFAULT = "default"
+DEFAULT_CSV = "type_effectiveness.csv"
+
+
+def compile_csv(csv_path: str, binary_path: str) -> None:
+    """
+    Compiles an effectiveness CSV into a binary table:
+    the header, the element names separated by newlines, padding to 8 bytes, then n*n float64s.
+    """
+    with open(csv_path, newline="") as f:
+        rows = [row for row in csv.reader(f) if len(row) > 0]
+    names = [name.strip() for name in rows[0]]
+    values = [float(value) for row in rows[1:] for value in row]
+    n = len(names)
+    if len(rows) - 1 != n or len(values) != n * n:
+        raise ValueError(f"{csv_path} is not a {n} by {n} effectiveness table")
+    encoded = "\n".join(names).encode()
+    padding = -(HEADER.size + len(encoded)) % 8
+    temp_path = f"{binary_path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, n, len(encoded)))
+        f.write(encoded + bytes(padding))
+        f.write(struct.pack(f"<{n * n}d", *values))
+    os.replace(temp_path, binary_path)
+
+
+class Ruleset:
+    """A compiled effectiveness table, memory-mapped from `path`."""
+
+    def __init__(self, name: str, path: str) -> None:
+        self.name = name
+        self.path = path
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n, names_size = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} effectiveness table")
+        names_end = HEADER.size + names_size
+        self.element_names = bytes(self.data[HEADER.size:names_end]).decode().split("\n")
+        start = names_end + -names_end % 8
+        self.values = memoryview(self.data)[start:start + 8 * n * n].cast("d")
+        self.n = n
+        self.index = {}
+        for i in range(n):
+            self.index[self.element_names[i].upper()] = i
+        # Row (and column) in `values` of the element with each `element_id`, resolved once here.
+        # -1 for elements missing from the table. Lookups read the mapped values, so processes share them.
+        self.rows = [-1] * (max(elem.value for elem in Element) + 1)
+        for i in range(n):
+            id = element_id(self.element_names[i])
+            if id is not None:
+                self.rows[id] = i
+
+    def effectiveness(self, name1: str, name2: str) -> float:
+        """The effectiveness of the element called name1 attacking the one called name2."""
+        # O(1)
+        index = self.index
+        return self.values[index[name1.upper()] * self.n + index[name2.upper()]]
+
+    def get_effectiveness(self, type1: Element, type2: Element) -> float:
+        # O(1)
+        return self.get_effectiveness_by_id(type1.value, type2.value)
+
+    def get_monster_effectiveness(self, attacker, defender) -> float:
+        """
+        The effectiveness of the element of monster `attacker` attacking that of `defender`.
+        Elements that are Element constants are looked up by `element_id`, any others by name.
+        """
+        # O(1)
+        id1 = attacker.get_element_id()
+        id2 = defender.get_element_id()
+        if id1 is None or id2 is None:
+            return self.effectiveness(attacker.get_element(), defender.get_element())
+        return self.get_effectiveness_by_id(id1, id2)
+
+    def get_effectiveness_by_id(self, id1: int, id2: int) -> float:
+        """The effectiveness of the element with `element_id` id1 attacking the one with id2."""
+        # O(1)
+        rows = self.rows
+        if id1 < len(rows) and id2 < len(rows):
+            row = rows[id1]
+            column = rows[id2]
+            if row >= 0 and column >= 0:
+                return self.values[row * self.n + column]
+        raise KeyError(f"No effectiveness in ruleset {self.name} for element {id1} against element {id2}")
+
+    def close(self) -> None:
+        self.values.release()
+        self.data.close()
+
+
+class RulesetRegistry:
+    """
+    :cache_dir: Where compiled tables are written.
+    """
+
+    def __init__(self, cache_dir: str = ".ruleset_cache") -> None:
+        self.cache_dir = cache_dir
+        self.rulesets = {}
+
+    def register(self, name: str, csv_path: str) -> Ruleset:
+        """Compiles the CSV if it has not been compiled before, and maps it under `name`."""
+        with open(csv_path, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        binary_path = os.path.join(self.cache_dir, f"{digest}.eff")
+        if not os.path.exists(binary_path):
+            compile_csv(csv_path, binary_path)
+        return self.attach(name, binary_path)
+
+    def attach(self, name: str, binary_path: str) -> Ruleset:
+        """
+        Maps an already compiled table under `name`, without reading any CSV.
+        A ruleset already registered under `name` is left open for the battles still using it.
+        """
+        ruleset = Ruleset(name, binary_path)
+        self.rulesets[name] = ruleset
+        return ruleset
+
+    def get(self, name: str) -> Ruleset:
+        """The ruleset registered as `name`. The default ruleset is registered the first time it is asked for."""
+        if name not in self.rulesets:
+            if name != DEFAULT:
+                raise KeyError(f"No ruleset called {name}")
+            self.register(DEFAULT, DEFAULT_CSV)
+        return self.rulesets[name]
+
+    def names(self) -> list[str]:
+        return list(self.rulesets)
+
+    def paths(self) -> dict[str, str]:
+        """The compiled table of every ruleset, to `attach` in worker processes."""
+        return {name: ruleset.path for name, ruleset in self.rulesets.items()}
+
+
+registry = RulesetRegistry()
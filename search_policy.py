@@ -0,0 +1,254 @@
+"""
+Monte Carlo tree search over ATTACK, SWAP and SPECIAL.
+
+Every decision searches from the current battle state for a fixed wall-clock
+budget. Simulations run on the real battle: the state is captured with
+`Battle.snapshot` and put back with `Battle.restore`, so no monster is ever
+copied. While simulating, the enemy plays `opponent_policy` (by default the
+enemy's own policy) and, once out of the tree, our side plays `rollout_policy`.
+
+Search statistics are kept in a bounded transposition table keyed on a hash
+of `Battle.state_key`, so states reached through different move orders, or
+again on a later turn, share their statistics.
+
+Usage:
+```
+team = MonsterTeam(..., policy=MCTSPolicy(time_budget=0.01))
+```
+"""
+from __future__ import annotations
+
+import math
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from battle import Battle
+from monster_base import MonsterBase
+from policy import Policy, AttackPolicy
+from team import MonsterTeam
+
+ACTIONS = (Battle.Action.ATTACK, Battle.Action.SWAP, Battle.Action.SPECIAL)
+
+
+class FixedPolicy(Policy):
+    """Always chooses the same action."""
+
+    def __init__(self, action: Battle.Action) -> None:
+        self.action = action
+
+    def decide(self, currently_out: MonsterBase, enemy: MonsterBase) -> Battle.Action:
+        return self.action
+
+    def cache_key(self):
+        # Actions are BaseEnums, which are not hashable.
+        return FixedPolicy, self.action.value
+
+
+FIXED = tuple(FixedPolicy(action) for action in ACTIONS)
+
+
+class TranspositionTable:
+    """
+    Search statistics per state, holding at most `max_entries` states.
+    The least recently used state is evicted first.
+    Each entry is [visits, visits per action, best value per action].
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: int) -> Optional[list]:
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def add(self, key: int) -> list:
+        entry = [0, [0] * len(ACTIONS), [-1.0] * len(ACTIONS)]
+        self.entries[key] = entry
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+
+class MCTSPolicy(Policy):
+    """
+    :time_budget: Seconds to search per decision.
+    :max_iterations: Optional cap on simulations per decision, for reproducible searches.
+    :max_depth: Moves explored in the tree before switching to a rollout.
+    :rollout_turns: Turns played by a rollout before the state is evaluated.
+    :table_size: Maximum number of states in the transposition table.
+    :exploration: The UCB1 exploration constant.
+    :discount: How much a result loses per turn it takes to reach, so that wins are taken
+        as soon as possible and losses put off as long as possible.
+    :rollout_policy: Our policy in rollouts. Defaults to always attacking, so rollouts make progress.
+    :opponent_policy: The enemy's policy in simulations. Defaults to the enemy's own policy,
+        or the rollout policy if the enemy also searches.
+
+    A win scores 1, a loss 0 and a draw 0.5. A battle that is neither won nor lost
+    within a simulation is scored by the share of the remaining HP on our side.
+    Simulations are deterministic once the enemy's policy is fixed, so each action
+    keeps the best value found below it rather than the mean.
+    """
+
+    def __init__(
+        self,
+        time_budget: float = 0.01,
+        max_iterations: Optional[int] = None,
+        max_depth: int = 6,
+        rollout_turns: int = 30,
+        table_size: int = 10000,
+        exploration: float = 0.25,
+        discount: float = 0.98,
+        rollout_policy: Optional[Policy] = None,
+        opponent_policy: Optional[Policy] = None,
+    ) -> None:
+        self.time_budget = time_budget
+        self.max_iterations = max_iterations
+        self.max_depth = max_depth
+        self.rollout_turns = rollout_turns
+        self.exploration = exploration
+        self.discount = discount
+        self.rollout_policy = AttackPolicy() if rollout_policy is None else rollout_policy
+        self.opponent_policy = opponent_policy
+        self.table = TranspositionTable(table_size)
+        self.battle = None
+        self.iterations = 0
+
+    def start_battle(self, battle: Battle) -> None:
+        self.battle = battle
+        self.table.clear()
+
+    def clone(self) -> MCTSPolicy:
+        """The same search settings, with an empty transposition table and no battle."""
+        clone = super().clone()
+        clone.rollout_policy = self.rollout_policy.clone()
+        if self.opponent_policy is not None:
+            clone.opponent_policy = self.opponent_policy.clone()
+        clone.table = TranspositionTable(self.table.max_entries)
+        clone.battle = None
+        clone.iterations = 0
+        return clone
+
+    def cache_key(self):
+        # Searches depend on how much fits in the time budget.
+        return None
+
+    def decide(self, currently_out: MonsterBase, enemy: MonsterBase) -> Battle.Action:
+        battle = self.battle
+        if battle is None:
+            return self.rollout_policy.decide(currently_out, enemy)
+        side = 1 if battle.out1 is currently_out else 2
+        policies = (battle.policy1, battle.policy2)
+        opponent = self.opponent_policy or policies[2 - side]
+        if isinstance(opponent, MCTSPolicy):
+            opponent = opponent.rollout_policy
+
+        root = battle.snapshot()
+        deadline = time.perf_counter() + self.time_budget
+        iterations = 0
+        try:
+            while time.perf_counter() < deadline and (self.max_iterations is None or iterations < self.max_iterations):
+                self.simulate(side, opponent)
+                battle.restore(root)
+                iterations += 1
+        finally:
+            battle.restore(root)
+            battle.policy1, battle.policy2 = policies
+        self.iterations = iterations
+
+        entry = self.table.get(hash(battle.state_key()))
+        if entry is None or entry[0] == 0:
+            return self.rollout_policy.decide(currently_out, enemy)
+        _, visits, values = entry
+        return ACTIONS[max(range(len(ACTIONS)), key=lambda action: (values[action], visits[action]))]
+
+    def simulate(self, side: int, opponent: Policy) -> None:
+        """Plays one simulation from the current battle state and records its value in the table."""
+        battle = self.battle
+        path = []
+        value = None
+        for _ in range(self.max_depth):
+            key = hash(battle.state_key())
+            entry = self.table.get(key)
+            if entry is None:
+                self.table.add(key)
+                break
+            action = self.select(entry)
+            path.append((entry, action, battle.turn_number))
+            result = self.play_turn(side, FIXED[action], opponent)
+            battle.turn_number += 1
+            if result is not None:
+                value = self.score(result, side)
+                break
+        if value is None:
+            value = self.rollout(side, opponent)
+        end = battle.turn_number
+        for entry, action, turn in path:
+            entry[0] += 1
+            entry[1][action] += 1
+            discounted = 0.5 + (value - 0.5) * self.discount ** (end - turn)
+            if discounted > entry[2][action]:
+                entry[2][action] = discounted
+
+    def select(self, entry: list) -> int:
+        """UCB1 on the best value: tries every action once, then balances value against exploration."""
+        visits, action_visits, action_values = entry
+        best = None
+        best_score = None
+        log_visits = math.log(visits) if visits > 0 else 0
+        for action in range(len(ACTIONS)):
+            if action_visits[action] == 0:
+                return action
+            score = action_values[action] + \
+                self.exploration * math.sqrt(log_visits / action_visits[action])
+            if best is None or score > best_score:
+                best = action
+                best_score = score
+        return best
+
+    def play_turn(self, side: int, mine: Policy, opponent: Policy) -> Optional[Battle.Result]:
+        battle = self.battle
+        if side == 1:
+            battle.policy1, battle.policy2 = mine, opponent
+        else:
+            battle.policy1, battle.policy2 = opponent, mine
+        # The base rules, so subclasses that hook process_turn (to log, for example) are not triggered.
+        return Battle.process_turn(battle)
+
+    def rollout(self, side: int, opponent: Policy) -> float:
+        for _ in range(self.rollout_turns):
+            result = self.play_turn(side, self.rollout_policy, opponent)
+            self.battle.turn_number += 1
+            if result is not None:
+                return self.score(result, side)
+        return self.evaluate(side)
+
+    def score(self, result: Battle.Result, side: int) -> float:
+        if result == Battle.Result.DRAW:
+            return 0.5
+        won = result == Battle.Result.TEAM1 if side == 1 else result == Battle.Result.TEAM2
+        return 1.0 if won else 0.0
+
+    def evaluate(self, side: int) -> float:
+        """Our share of the HP remaining in the battle."""
+        battle = self.battle
+        hp1 = team_hp(battle.team1, battle.out1)
+        hp2 = team_hp(battle.team2, battle.out2)
+        if hp1 + hp2 <= 0:
+            return 0.5
+        return (hp1 if side == 1 else hp2) / (hp1 + hp2)
+
+
+def team_hp(team: MonsterTeam, out: MonsterBase) -> float:
+    """The HP left in a team, including the monster out."""
+    _, _, _, hps, _ = team.snapshot()
+    return max(out.get_hp(), 0) + sum(max(hp, 0) for hp in hps)
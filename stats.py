@@ -1,8 +1,11 @@
 import abc
+import math
+import operator
 
 from data_structures.referential_array import ArrayR
 
 class Stats(abc.ABC):
+    __slots__ = ()
 
     @abc.abstractmethod
     def get_attack(self):
@@ -22,6 +25,7 @@ class Stats(abc.ABC):
 
 
 class SimpleStats(Stats):
+    __slots__ = ("attack", "defense", "speed", "max_hp")
 
     def __init__(self, attack, defense, speed, max_hp) -> None:
         # TODO: Implement
@@ -42,7 +46,130 @@ class SimpleStats(Stats):
     def get_max_hp(self):
         return self.max_hp
 
+def _middle(a, b, c):
+    """The median of three values."""
+    return max(min(a, b), min(max(a, b), c))
+
+
+def _constant(value):
+    return lambda level: value
+
+
+def _level(level):
+    return level
+
+
+def _binary(operation, left, right):
+    return lambda level: operation(left(level), right(level))
+
+
+def _sqrt(operand):
+    return lambda level: math.sqrt(operand(level))
+
+
+def _middle_of(a, b, c):
+    return lambda level: _middle(a(level), b(level), c(level))
+
+
+class CompiledFormula:
+    """
+    A postfix stat formula compiled into a chain of closures taking the level.
+    Results are memoised per level.
+
+    Tokens are numbers, "level", the binary operators "+", "-", "*", "/" and "power",
+    "sqrt", which takes one value, and "middle", which takes the median of three.
+    """
+
+    BINARY = {"+": operator.add, "-": operator.sub, "*": operator.mul, "/": operator.truediv, "power": operator.pow}
+
+    def __init__(self, tokens: tuple[str, ...]) -> None:
+        # n = number of tokens
+        # O(n)
+        self.tokens = tokens
+        stack = []
+        self.max_depth = 0
+        for token in tokens:
+            if token in self.BINARY:
+                self._check_depth(stack, 2, token)
+                right = stack.pop()
+                left = stack.pop()
+                stack.append(_binary(self.BINARY[token], left, right))
+            elif token == "sqrt":
+                self._check_depth(stack, 1, token)
+                stack.append(_sqrt(stack.pop()))
+            elif token == "middle":
+                self._check_depth(stack, 3, token)
+                c = stack.pop()
+                b = stack.pop()
+                stack.append(_middle_of(stack.pop(), b, c))
+            elif token == "level":
+                stack.append(_level)
+            else:
+                try:
+                    value = int(token)
+                except ValueError:
+                    try:
+                        value = float(token)
+                    except ValueError:
+                        raise ValueError(f"Unknown token {token!r} in formula {' '.join(tokens)}")
+                stack.append(_constant(value))
+            self.max_depth = max(self.max_depth, len(stack))
+        if len(stack) != 1:
+            raise ValueError(f"Formula {' '.join(tokens)} leaves {len(stack)} values instead of 1")
+        self.function = stack[0]
+        self.values = {}
+
+    def _check_depth(self, stack: list, needed: int, token: str) -> None:
+        if len(stack) < needed:
+            raise ValueError(f"{token!r} needs {needed} values in formula {' '.join(self.tokens)}")
+
+    def __call__(self, level: int):
+        # O(1) once evaluated for this level
+        try:
+            return self.values[level]
+        except KeyError:
+            value = self.values[level] = self.function(level)
+            return value
+
+    def evaluate_many(self, levels):
+        """
+        Evaluates the formula at every level of a NumPy array of levels, giving the same values as calling it.
+        The array is int64 or float64 when those hold every value exactly, and of Python objects otherwise.
+        """
+        # n = number of levels, u = number of distinct levels
+        # O(n log n + u)
+        import numpy as np
+        unique, inverse = np.unique(np.asarray(levels), return_inverse=True)
+        values = [self(level) for level in unique.tolist()]
+        return _exact_array(values)[inverse.reshape(np.shape(levels))]
+
+
+def _exact_array(values: list):
+    """A NumPy array of values, int64 or float64 if that does not change any of them, or of Python objects."""
+    import numpy as np
+    ints = [value for value in values if type(value) is int]
+    if len(ints) == len(values):
+        if all(-2 ** 63 <= value < 2 ** 63 for value in ints):
+            return np.array(values, dtype=np.int64)
+    elif all(-2 ** 53 <= value <= 2 ** 53 for value in ints):
+        return np.array(values, dtype=float)
+    return np.array(values, dtype=object)
+
+
+# Identical formulas share one compiled formula, and so its memoised values.
+_compiled: dict[tuple[str, ...], CompiledFormula] = {}
+
+
+def compile_formula(formula: ArrayR[str]) -> CompiledFormula:
+    tokens = tuple(str(formula[i]) for i in range(len(formula)))
+    compiled = _compiled.get(tokens)
+    if compiled is None:
+        compiled = _compiled[tokens] = CompiledFormula(tokens)
+    return compiled
+
+
 class ComplexStats(Stats):
+    __slots__ = ("attack", "defense", "speed", "max_hp")
 
     def __init__(
         self,
@@ -51,17 +178,19 @@ class ComplexStats(Stats):
         speed_formula: ArrayR[str],
         max_hp_formula: ArrayR[str],
     ) -> None:
-        # TODO: Implement
-        pass
+        self.attack = compile_formula(attack_formula)
+        self.defense = compile_formula(defense_formula)
+        self.speed = compile_formula(speed_formula)
+        self.max_hp = compile_formula(max_hp_formula)
 
     def get_attack(self, level: int):
-        raise NotImplementedError
+        return self.attack(level)
 
     def get_defense(self, level: int):
-        raise NotImplementedError
+        return self.defense(level)
 
     def get_speed(self, level: int):
-        raise NotImplementedError
+        return self.speed(level)
 
     def get_max_hp(self, level: int):
-        raise NotImplementedError
+        return self.max_hp(level)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import copy
 import math
 from enum import auto
 from typing import Optional, TYPE_CHECKING
@@ -11,8 +12,9 @@ from data_structures.array_sorted_list import ArraySortedList
 from data_structures.queue_adt import CircularQueue
 from data_structures.referential_array import ArrayR
 from data_structures.stack_adt import ArrayStack
-from helpers import get_all_monsters
+from helpers import get_spawnable_monsters
 from monster_base import MonsterBase
+from policy import CallablePolicy, DEFAULT_POLICY, Policy
 from random_gen import RandomGen
 
 if TYPE_CHECKING:
@@ -60,6 +62,10 @@ class MonsterTeam:
             self.provided_monsters = kwargs["provided_monsters"]
         except:
             pass
+        try:
+            self.policy = kwargs["policy"]
+        except:
+            self.policy = None
 
         if self.team_mode == MonsterTeam.TeamMode.FRONT:
             self.team = ArrayStack(self.TEAM_LIMIT)
@@ -78,6 +84,9 @@ class MonsterTeam:
             self.select_provided()
         else:
             raise ValueError(f"selection_mode {selection_mode} not supported.")
+        # The starting layout at full HP, restored by `regenerate_team`.
+        container, ascen, entries, _, forms = self.snapshot()
+        self.initial = (container, ascen, entries, None, forms)
 
     def __len__(self):
         return len(self.team)
@@ -170,39 +179,125 @@ class MonsterTeam:
                 self.ascen = True
 
     def regenerate_team(self) -> None:
+        """
+        Puts the starting monsters back in their starting order at full HP.
+        The container and, in OPTIMISE mode, the ListItems of the starting layout are reused,
+        so nothing is sorted or allocated.
+        """
         # n = length of original team
         # O(n)
-        self.team.clear()
-        self.ascen = False
+        self.restore(self.initial)
+
+    def clone(self) -> MonsterTeam:
+        """
+        An independent copy of this team in its starting layout, at full HP, for example to run in parallel.
+        Every starting monster is copied, so nothing done to the clone affects this team.
+        The clone keeps the team mode and sort mode of this team, and gets a `Policy.clone` of its policy.
+        """
+        # n = length of original team
+        # O(n)
+        container, ascen, entries, hps, forms = self.initial
+        new_team = MonsterTeam.__new__(MonsterTeam)
+        new_team.__dict__.update(self.__dict__)
+        if self.policy is not None:
+            new_team.policy = self.policy.clone()
+        new_team.starting_monsters = ArrayR(len(self.starting_monsters))
+        copies = {}
         for i in range(len(self.starting_monsters)):
-            if self.starting_monsters[i] is not None:
-                self.starting_monsters[i].set_hp(self.starting_monsters[i].get_max_hp())
-                self.add_to_team(self.starting_monsters[i])
+            monster = self.starting_monsters[i]
+            if monster is not None:
+                new_team.starting_monsters[i] = copies[id(monster)] = copy.copy(monster)
+        if self.team_mode == MonsterTeam.TeamMode.OPTIMISE:
+            entries = tuple((ListItem(copies[id(item.value)], key), key) for item, key in entries)
+        else:
+            entries = tuple(copies[id(monster)] for monster in entries)
+        new_team.initial = (type(container)(self.TEAM_LIMIT), ascen, entries, hps, forms)
+        new_team.restore(new_team.initial)
+        return new_team
+
+    def state_key(self) -> tuple:
+        """
+        A hashable summary of the team: the order of the monsters in the team, their HP,
+        and in OPTIMISE mode their sort keys and the sort direction.
+        Two equal keys for the same team mean the team is in the same state.
+        """
+        # n = length of team
+        # O(n)
+        container = self.team
+        if self.team_mode == MonsterTeam.TeamMode.FRONT:
+            monsters = [container.array[i] for i in range(len(container))]
+        elif self.team_mode == MonsterTeam.TeamMode.BACK:
+            capacity = len(container.array)
+            monsters = [container.array[(container.front + i) % capacity] for i in range(len(container))]
+        else:
+            return (self.ascen, ) + tuple(
+                (id(container[i].value), container[i].value.get_hp(), container[i].key) for i in range(len(container))
+            )
+        return tuple((id(monster), monster.get_hp()) for monster in monsters)
+
+    def snapshot(self) -> tuple:
+        """
+        Captures the team container, its order, the OPTIMISE sort keys and direction,
+        and the HP and `save_form` of every monster in the team, without copying any monster. See `restore`.
+        """
+        # n = length of team
+        # O(n)
+        container = self.team
+        length = len(container)
+        if self.team_mode == MonsterTeam.TeamMode.FRONT:
+            entries = tuple(container.array[i] for i in range(length))
+            monsters = entries
+        elif self.team_mode == MonsterTeam.TeamMode.BACK:
+            capacity = len(container.array)
+            entries = tuple(container.array[(container.front + i) % capacity] for i in range(length))
+            monsters = entries
+        else:
+            entries = tuple((container[i], container[i].key) for i in range(length))
+            monsters = tuple(item.value for item, _ in entries)
+        return (
+            container, self.ascen, entries,
+            tuple(monster.get_hp() for monster in monsters), tuple(monster.save_form() for monster in monsters),
+        )
+
+    def restore(self, snapshot: tuple) -> None:
+        """
+        Puts the team back in the state captured by `snapshot`, including the species and level of every monster.
+        If the HP in the snapshot is None, every monster is put back at full HP instead.
+        """
+        # n = length of team
+        # O(n)
+        container, self.ascen, entries, hps, forms = snapshot
+        self.team = container
+        array = container.array
+        if self.team_mode == MonsterTeam.TeamMode.OPTIMISE:
+            for i in range(len(entries)):
+                item, key = entries[i]
+                item.key = key
+                array[i] = item
+                monster = item.value
+                monster.restore_form(forms[i])
+                monster.set_hp(monster.get_max_hp() if hps is None else hps[i])
+        else:
+            for i in range(len(entries)):
+                monster = entries[i]
+                array[i] = monster
+                monster.restore_form(forms[i])
+                monster.set_hp(monster.get_max_hp() if hps is None else hps[i])
+            if self.team_mode == MonsterTeam.TeamMode.BACK:
+                container.front = 0
+                container.rear = len(entries) % len(array)
+        container.length = len(entries)
 
     def select_randomly(self, **kwargs):
-        # n = total number of monster in the game
         # m = size of team
-        # O(n + n*m)
+        # O(m)
         team_size = RandomGen.randint(1, self.TEAM_LIMIT)
-        monsters = get_all_monsters()
-        n_spawnable = 0
-        for x in range(len(monsters)):
-            if monsters[x].can_be_spawned():
-                n_spawnable += 1
-
-        for _ in range(team_size):
-            spawner_index = RandomGen.randint(0, n_spawnable - 1)
-            cur_index = -1
-            for x in range(len(monsters)):
-                if monsters[x].can_be_spawned():
-                    cur_index += 1
-                    if cur_index == spawner_index:
-                        # Spawn this monster
-                        self.add_to_team(monsters[x]())
-                        self.starting_monsters[_] = monsters[x]()
-                        break
-            else:
-                raise ValueError("Spawning logic failed.")
+        # Indexing the spawnable species uses the same draws as counting through the catalog.
+        spawnable = get_spawnable_monsters()
+        for i in range(team_size):
+            monster = spawnable[RandomGen.randint(0, len(spawnable) - 1)]()
+            self.add_to_team(monster)
+            self.starting_monsters[i] = monster
 
     def select_manually(self):
         """
@@ -341,8 +436,9 @@ class MonsterTeam:
                 if not monster_list[new_mon].can_be_spawned():
                     print("Selected monster can't be spawned, please select another")
                     new_mon = None
-            self.add_to_team(monster_list[new_mon]())
-            self.starting_monsters[i] = monster_list[new_mon]()
+            monster = monster_list[new_mon]()
+            self.add_to_team(monster)
+            self.starting_monsters[i] = monster
 
     def select_provided(self, provided_monsters: Optional[ArrayR[type[MonsterBase]]] = None):
         """
@@ -372,15 +468,21 @@ class MonsterTeam:
 
     def choose_action(self, currently_out: MonsterBase, enemy: MonsterBase) -> Battle.Action:
         # This is just a placeholder function that doesn't matter much for testing.
+        # Battles use `resolve_policy` instead, so this is only called if overridden or called directly.
 
-        # n = complexity of import function
-        # O(n)
-
-        from battle import Battle
-        if currently_out.get_speed() >= enemy.get_speed() or currently_out.get_hp() >= enemy.get_hp():
-            return Battle.Action.ATTACK
-        return Battle.Action.SWAP
+        # O(1)
+        policy = DEFAULT_POLICY if self.policy is None else self.policy
+        return policy.decide(currently_out, enemy)
 
+    def resolve_policy(self) -> Policy:
+        """
+        The policy this team battles with. A choose_action overridden in a subclass or assigned
+        to the team takes priority over the `policy` the team was given.
+        """
+        # O(1)
+        if "choose_action" in vars(self) or type(self).choose_action is not MonsterTeam.choose_action:
+            return CallablePolicy(self.choose_action)
+        return DEFAULT_POLICY if self.policy is None else self.policy
 
 if __name__ == "__main__":
     team = MonsterTeam(
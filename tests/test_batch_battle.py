@@ -0,0 +1,87 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+from random_gen import RandomGen
+
+from battle import Battle
+from batch_battle import BatchBattle
+from helpers import Flamikin
+from team import MonsterTeam
+
+
+def random_team() -> MonsterTeam:
+    return MonsterTeam(
+        team_mode=RandomGen.random_choice(list(MonsterTeam.TeamMode)),
+        selection_mode=MonsterTeam.SelectionMode.RANDOM,
+        sort_key=RandomGen.random_choice(list(MonsterTeam.SortMode)),
+    )
+
+
+class TestBatchBattle(TestCase):
+
+    @number("6.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_matches_scalar_always_attack(self):
+        RandomGen.set_seed(123456789)
+        pairs = [(random_team(), random_team()) for _ in range(300)]
+        for team1, team2 in pairs:
+            team1.choose_action = lambda out, team: Battle.Action.ATTACK
+            team2.choose_action = lambda out, team: Battle.Action.ATTACK
+        results = BatchBattle(always_attack=True).battle_many(pairs)
+        for (team1, team2), result in zip(pairs, results):
+            self.assertEqual(result, Battle(verbosity=0).battle(team1, team2))
+
+    @number("6.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_matches_scalar_default_policy(self):
+        RandomGen.set_seed(987654321)
+        pairs = [(random_team(), random_team()) for _ in range(300)]
+        results = BatchBattle(max_turns=500).battle_many(pairs)
+        decided = 0
+        for (team1, team2), result in zip(pairs, results):
+            # Undecided battles are the ones where the scalar engine never finishes.
+            if result is not None:
+                decided += 1
+                self.assertEqual(result, Battle(verbosity=0).battle(team1, team2))
+        self.assertGreater(decided, 0)
+
+    @number("6.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_teams_untouched(self):
+        RandomGen.set_seed(42)
+        team1 = random_team()
+        team2 = random_team()
+        sizes = (len(team1), len(team2))
+        BatchBattle(max_turns=100).battle_many([(team1, team2)])
+        self.assertEqual((len(team1), len(team2)), sizes)
+        team2.choose_action = lambda out, team: Battle.Action.ATTACK
+        self.assertRaises(ValueError, lambda: BatchBattle().battle_many([(team1, team2)]))
+
+    @number("6.4")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_monsters_outside_species_columns(self):
+        class StrongFlamikin(Flamikin):
+            __slots__ = ()
+
+            def get_attack(self):
+                return 20
+
+        RandomGen.set_seed(2468)
+        pairs = [(random_team(), random_team()) for _ in range(100)]
+        for i, (team1, team2) in enumerate(pairs):
+            # Complex stats depend on the level, and StrongFlamikin is not a catalog species.
+            monster = team1.starting_monsters[0]
+            monster.level = 3
+            monster.simple_mode = False
+            if team2.team_mode != MonsterTeam.TeamMode.OPTIMISE:
+                team2.team.array[0] = team2.starting_monsters[0] = StrongFlamikin()
+        results = BatchBattle(always_attack=True).battle_many(pairs)
+        for (team1, team2), result in zip(pairs, results):
+            team1.choose_action = lambda out, team: Battle.Action.ATTACK
+            team2.choose_action = lambda out, team: Battle.Action.ATTACK
+            self.assertEqual(result, Battle(verbosity=0).battle(team1, team2))
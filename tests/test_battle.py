@@ -2,8 +2,10 @@ from unittest import TestCase
 
 from ed_utils.decorators import number, visibility
 from ed_utils.timeout import timeout
+from random_gen import RandomGen
 
 from battle import Battle
+from batch_battle import BatchBattle
 from team import MonsterTeam
 from helpers import Flamikin, Aquariuma, Vineon, Strikeon, Normake, Marititan, Leviatitan, Treetower, Infernoth
 
@@ -38,6 +40,30 @@ class BattleMock(Battle):
             self.cur_index += 1
         return super().process_turn()
 
+class TankFlamikin(Flamikin):
+
+    def get_speed(self):
+        return 5
+
+    def get_max_hp(self):
+        return 10001
+
+
+class TankAquariuma(Aquariuma):
+
+    def get_speed(self):
+        return 5
+
+    def get_max_hp(self):
+        return 7777
+
+
+class HarmlessFlamikin(Flamikin):
+
+    def get_attack(self):
+        return 0
+
+
 class TestBattle(TestCase):
 
     @number("4.1")
@@ -113,3 +139,144 @@ class TestBattle(TestCase):
         ]
         res = b.battle(team1, team2)
         self.assertEqual(res, Battle.Result.DRAW)
+
+    @number("4.4")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_fast_forward_long_exchange(self):
+        logs = []
+        for fast_forward in (False, True):
+            team1 = MonsterTeam(
+                team_mode=MonsterTeam.TeamMode.BACK,
+                selection_mode=MonsterTeam.SelectionMode.PROVIDED,
+                provided_monsters=ArrayR.from_list([TankFlamikin, TankAquariuma]),
+            )
+            team2 = MonsterTeam(
+                team_mode=MonsterTeam.TeamMode.FRONT,
+                selection_mode=MonsterTeam.SelectionMode.PROVIDED,
+                provided_monsters=ArrayR.from_list([TankAquariuma, TankFlamikin]),
+            )
+            b = Battle(verbosity=0, fast_forward=fast_forward)
+            res = b.battle(team1, team2)
+            logs.append((res, b.turn_number, str(b.out1), str(b.out2)))
+        self.assertEqual(logs[0], logs[1])
+        self.assertEqual(logs[1][0], Battle.Result.DRAW)
+
+    @number("4.5")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_fast_forward_random_teams(self):
+        RandomGen.set_seed(11)
+        pairs = []
+        for _ in range(200):
+            pairs.append(tuple(MonsterTeam(
+                team_mode=RandomGen.random_choice(list(MonsterTeam.TeamMode)),
+                selection_mode=MonsterTeam.SelectionMode.RANDOM,
+                sort_key=RandomGen.random_choice(list(MonsterTeam.SortMode)),
+            ) for _ in range(2)))
+        # Only battle the matchups that finish; the others swap forever.
+        results = BatchBattle(max_turns=300).battle_many(pairs)
+        for (team1, team2), result in zip(pairs, results):
+            if result is None:
+                continue
+            plain = Battle(verbosity=0)
+            self.assertEqual(plain.battle(team1, team2), result)
+            team1.regenerate_team()
+            team2.regenerate_team()
+            fast = Battle(verbosity=0, fast_forward=True)
+            self.assertEqual(fast.battle(team1, team2), result)
+            self.assertEqual(fast.turn_number, plain.turn_number)
+
+    @number("4.6")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_cycle_detection(self):
+        RandomGen.set_seed(11)
+        pairs = []
+        for _ in range(200):
+            pairs.append(tuple(MonsterTeam(
+                team_mode=RandomGen.random_choice(list(MonsterTeam.TeamMode)),
+                selection_mode=MonsterTeam.SelectionMode.RANDOM,
+                sort_key=RandomGen.random_choice(list(MonsterTeam.SortMode)),
+            ) for _ in range(2)))
+        results = BatchBattle(max_turns=300).battle_many(pairs)
+        for (team1, team2), result in zip(pairs, results):
+            b = Battle(verbosity=0, detect_cycles=True)
+            got = b.battle(team1, team2)
+            if result is None:
+                # These teams swap forever without the cycle check.
+                self.assertEqual(got, Battle.Result.DRAW)
+                self.assertEqual(b.stop_reason, "cycle")
+            else:
+                self.assertEqual(got, result)
+                self.assertIsNone(b.stop_reason)
+
+    @number("4.7")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_turn_and_time_budgets(self):
+        def harmless_team():
+            team = MonsterTeam(
+                team_mode=MonsterTeam.TeamMode.FRONT,
+                selection_mode=MonsterTeam.SelectionMode.PROVIDED,
+                provided_monsters=ArrayR.from_list([HarmlessFlamikin]),
+            )
+            team.choose_action = lambda out, team: Battle.Action.ATTACK
+            return team
+
+        b = Battle(verbosity=0, max_turns=50)
+        self.assertEqual(b.battle(harmless_team(), harmless_team()), Battle.Result.DRAW)
+        self.assertEqual(b.stop_reason, "max_turns")
+        self.assertEqual(b.turn_number, 50)
+
+        b = Battle(verbosity=0, time_limit=0.05)
+        self.assertEqual(b.battle(harmless_team(), harmless_team()), Battle.Result.DRAW)
+        self.assertEqual(b.stop_reason, "time_limit")
+
+        b = Battle(verbosity=0, detect_cycles=True)
+        self.assertEqual(b.battle(harmless_team(), harmless_team()), Battle.Result.DRAW)
+        self.assertEqual(b.stop_reason, "cycle")
+        self.assertEqual(b.turn_number, 1)
+
+    @number("4.8")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_iter_turns(self):
+        def make_teams():
+            team1 = MonsterTeam(
+                team_mode=MonsterTeam.TeamMode.BACK,
+                selection_mode=MonsterTeam.SelectionMode.PROVIDED,
+                provided_monsters=ArrayR.from_list([Flamikin, Aquariuma]),
+            )
+            team2 = MonsterTeam(
+                team_mode=MonsterTeam.TeamMode.FRONT,
+                selection_mode=MonsterTeam.SelectionMode.PROVIDED,
+                provided_monsters=ArrayR.from_list([Strikeon, Vineon]),
+            )
+            team1.choose_action = lambda out, team: Battle.Action.ATTACK
+            return team1, team2
+
+        b = Battle(verbosity=0)
+        expected = b.battle(*make_teams())
+        b = Battle(verbosity=0)
+        records = [record.as_tuple() for record in b.iter_turns(*make_teams())]
+        self.assertEqual(b.result, expected)
+        self.assertEqual(len(records), b.turn_number)
+        # Vineon outspeeds Flamikin, hitting it for 1 each turn until it faints on turn 6.
+        self.assertEqual(records[0], (
+            1, Battle.Action.ATTACK, Battle.Action.ATTACK, 2, 0, 1.0, 5.0, 6,
+            False, False, False, False, None,
+        ))
+        self.assertTrue(records[5][8])
+        self.assertEqual(records[6][6], 7.0)
+        self.assertEqual(records[-1][-1], expected)
+        self.assertEqual(sum(record[5] for record in records), 6 + 8)
+
+        # Teams that only swap: turns are reported until the cycle check ends the battle.
+        team1, team2 = make_teams()
+        team1.choose_action = lambda out, team: Battle.Action.SWAP
+        b = Battle(verbosity=0, detect_cycles=True)
+        records = [record.as_tuple() for record in b.iter_turns(team1, team2)]
+        self.assertEqual(b.result, Battle.Result.DRAW)
+        self.assertEqual(b.stop_reason, "cycle")
+        self.assertTrue(all(record[10] and not record[11] for record in records))
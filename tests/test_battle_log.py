@@ -0,0 +1,92 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from battle import Battle
+from battle_log import BattleRecorder, BattleLogReader
+from team import MonsterTeam
+from helpers import Flamikin, Aquariuma, Vineon, Strikeon, Gustwing
+
+from data_structures.referential_array import ArrayR
+
+
+def make_teams(first, second):
+    team1 = MonsterTeam(
+        team_mode=MonsterTeam.TeamMode.BACK,
+        selection_mode=MonsterTeam.SelectionMode.PROVIDED,
+        provided_monsters=ArrayR.from_list(first),
+    )
+    team2 = MonsterTeam(
+        team_mode=MonsterTeam.TeamMode.FRONT,
+        selection_mode=MonsterTeam.SelectionMode.PROVIDED,
+        provided_monsters=ArrayR.from_list(second),
+    )
+    team1.choose_action = lambda out, team: Battle.Action.ATTACK
+    team2.choose_action = lambda out, team: Battle.Action.ATTACK
+    return team1, team2
+
+
+MATCHUPS = [
+    ([Flamikin, Aquariuma], [Strikeon, Vineon]),
+    ([Gustwing], [Vineon, Flamikin]),
+    ([Strikeon, Gustwing, Aquariuma], [Aquariuma]),
+]
+
+
+class TestBattleLog(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "battles.log")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    @number("7.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_round_trip(self):
+        live = []
+        for first, second in MATCHUPS:
+            b = Battle(verbosity=0)
+            records = [record.as_tuple() for record in b.iter_turns(*make_teams(first, second))]
+            live.append((b.result, records))
+
+        # Battles can be appended over several sessions.
+        with BattleRecorder(self.path) as recorder:
+            recorder.record(Battle(verbosity=0), *make_teams(*MATCHUPS[0]))
+        with BattleRecorder(self.path) as recorder:
+            for first, second in MATCHUPS[1:]:
+                recorder.record(Battle(verbosity=0), *make_teams(first, second))
+
+        with BattleLogReader(self.path) as log:
+            self.assertEqual(len(log), len(MATCHUPS))
+            for battle, (result, records) in enumerate(live):
+                self.assertEqual(log.result(battle), result)
+                self.assertEqual(log.turn_count(battle), len(records))
+                self.assertEqual(log.hp_sequence(battle), [(record[6], record[7]) for record in records])
+                self.assertEqual([record.as_tuple() for record in log.turns(battle)], records)
+
+    @number("7.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_random_access(self):
+        b = Battle(verbosity=0)
+        records = [record.as_tuple() for record in b.iter_turns(*make_teams(*MATCHUPS[0]))]
+        with BattleRecorder(self.path) as recorder:
+            for first, second in MATCHUPS:
+                recorder.record(Battle(verbosity=0), *make_teams(first, second))
+
+        with BattleLogReader(self.path) as log:
+            self.assertEqual(log.turn(0, 5).as_tuple(), records[5])
+            self.assertEqual(log.turn(0, len(records) - 1).result, b.result)
+            self.assertIsNone(log.turn(0, 0).result)
+            self.assertRaises(IndexError, lambda: log.turn(0, len(records)))
+            self.assertRaises(IndexError, lambda: log.result(len(MATCHUPS)))
+
+        with open(self.path, "r+b") as file:
+            file.write(b"NOPE")
+        self.assertRaises(ValueError, lambda: BattleLogReader(self.path))
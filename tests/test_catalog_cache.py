@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase, mock
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+import helpers
+
+
+class TestCatalogCache(TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        shutil.copy("monsters.yaml", self.directory.name)
+        os.chdir(self.directory.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def cache_files(self):
+        return sorted(os.listdir(helpers.CACHE_DIR))
+
+    @number("17.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_warm_load(self):
+        with open("monsters.yaml", "rb") as f:
+            parsed = helpers._parse_catalog(f.read())
+        self.assertEqual(len(parsed), len(helpers.get_all_monsters()))
+        self.assertEqual(helpers._load_catalog_records(), parsed)
+        self.assertEqual(len(self.cache_files()), 1)
+        with mock.patch.object(helpers, "_parse_catalog", side_effect=AssertionError("parsed the YAML")):
+            self.assertEqual(helpers._load_catalog_records(), parsed)
+
+        name, description, evolution, element, simple, complex, can_be_spawned = parsed[0]
+        flamikin = helpers.Flamikin
+        self.assertEqual(name, flamikin.get_name())
+        self.assertEqual(simple, (
+            flamikin.get_simple_stats().get_attack(), flamikin.get_simple_stats().get_defense(),
+            flamikin.get_simple_stats().get_speed(), flamikin.get_simple_stats().get_max_hp(),
+        ))
+        self.assertEqual(complex[0], flamikin.get_complex_stats().attack.tokens)
+        self.assertEqual(evolution, flamikin.get_evolution().get_name())
+
+    @number("17.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_rebuild(self):
+        helpers._load_catalog_records()
+        with open("monsters.yaml") as f:
+            source = f.read()
+        with open("monsters.yaml", "w") as f:
+            f.write(source.replace("name: Flamikin", "name: Flamekin", 1))
+        records = helpers._load_catalog_records()
+        self.assertEqual(records[0][0], "Flamekin")
+        self.assertEqual(len(self.cache_files()), 2)
+
+        for file in self.cache_files():
+            with open(os.path.join(helpers.CACHE_DIR, file), "wb") as f:
+                f.write(b"not a catalog")
+        self.assertEqual(helpers._load_catalog_records(), records)
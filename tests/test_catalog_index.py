@@ -0,0 +1,41 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from elements import Element
+from helpers import get_all_monsters, get_catalog_index, get_evolution_table, get_spawnable_monsters, CURVE_STATS
+
+
+class TestCatalogIndex(TestCase):
+
+    @number("19.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_indexes(self):
+        catalog = [get_all_monsters()[i] for i in range(len(get_all_monsters()))]
+        index = get_catalog_index()
+        as_list = lambda array: [array[i] for i in range(len(array))]
+
+        spawnable = as_list(get_spawnable_monsters())
+        self.assertEqual(spawnable, [monster for monster in catalog if monster.can_be_spawned()])
+
+        for element in Element:
+            self.assertEqual(
+                as_list(index.of_element(element.name)),
+                [monster for monster in catalog if monster.get_element().upper() == element.name],
+            )
+        self.assertEqual(len(index.of_element("Sound")), len(index.of_element("SOUND")))
+        self.assertEqual(len(index.of_element("Plasma")), 0)
+
+        table = get_evolution_table()
+        self.assertEqual(sum(len(group) for group in index.by_stage.values()), len(catalog))
+        for depth in index.by_stage:
+            self.assertTrue(all(table[monster].depth == depth for monster in as_list(index.at_stage(depth))))
+        self.assertEqual(len(index.at_stage(10)), 0)
+
+        for stat in CURVE_STATS:
+            ordered = as_list(index.sorted_by(stat))
+            values = [getattr(monster.get_simple_stats(), f"get_{stat}")() for monster in ordered]
+            self.assertEqual(values, sorted(values))
+            self.assertEqual(set(ordered), set(catalog))
@@ -0,0 +1,216 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase, mock
+
+import numpy as np
+import yaml
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+import helpers
+from monster_pool import MonsterPool
+
+
+class TestCatalogReload(TestCase):
+
+    def setUp(self):
+        catalog = helpers.get_all_monsters()
+        self.saved = {
+            name: getattr(helpers, name)
+            for name in ("_monsters", "_records", "_evolutions", "_index", "_catalog_hash", "_reload_listeners")
+        }
+        self.saved_links = {catalog[i]: catalog[i].evolution_class for i in range(len(catalog))}
+        helpers._reload_listeners = []
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        shutil.copy("monsters.yaml", self.directory.name)
+        os.chdir(self.directory.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+        for name in list(helpers._records):
+            del helpers.__dict__[name]
+        for name, value in self.saved.items():
+            setattr(helpers, name, value)
+        for species, evolution in self.saved_links.items():
+            species.evolution_class = evolution
+            setattr(helpers, species.get_name(), species)
+
+    def edit_catalog(self, edit):
+        with open("monsters.yaml") as f:
+            monsters = {monster["name"]: monster for monster in yaml.safe_load(f)}
+        edit(monsters)
+        with open("monsters.yaml", "w") as f:
+            yaml.safe_dump([monster for monster in monsters.values() if not monster.get("removed")], f)
+
+    @number("20.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_reload_changed_species(self):
+        diffs = []
+        helpers.add_reload_listener(diffs.append)
+        old_flamikin = helpers.Flamikin
+        old_infernoth = helpers.Infernoth
+        live = old_flamikin()
+
+        self.assertFalse(helpers.reload_catalog())
+        self.assertIs(helpers.Flamikin, old_flamikin)
+        self.assertEqual(diffs, [])
+
+        def edit(monsters):
+            monsters["Flamikin"]["simple"]["attack"] = 9
+            monsters["Vineon"]["removed"] = True
+        self.edit_catalog(edit)
+        diff = helpers.reload_catalog()
+        self.assertEqual((diff.added, diff.changed, diff.removed, diff.relinked), ((), ("Flamikin",), ("Vineon",), ()))
+        self.assertEqual(diffs, [diff])
+        self.assertIsNot(helpers.Flamikin, old_flamikin)
+        self.assertIs(helpers.Infernoth, old_infernoth)
+        self.assertIs(helpers.Flamikin.get_evolution(), old_infernoth)
+        self.assertEqual(helpers.Flamikin().get_attack(), 9)
+        self.assertFalse(hasattr(helpers, "Vineon"))
+        self.assertEqual(live.get_attack(), 3)
+        self.assertEqual(type(live), old_flamikin)
+
+    @number("20.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_relink_evolutions(self):
+        old_flamikin = helpers.Flamikin
+        pool = MonsterPool(capacity=2)
+        old_handles = (type(pool.spawn(helpers.Flamikin)), type(pool.spawn(helpers.Infernoth)))
+
+        def edit(monsters):
+            monsters["Infernoth"]["simple"]["max_hp"] = 50
+            monsters["Aquariuma"]["evolution"] = "Leviatitan"
+            monsters["Sparkit"] = dict(monsters["Flamikin"], name="Sparkit", evolution=None)
+        self.edit_catalog(edit)
+
+        diff = helpers.reload_catalog()
+        self.assertEqual(diff.added, ("Sparkit",))
+        self.assertEqual(diff.changed, ("Infernoth",))
+        self.assertEqual(sorted(diff.relinked), ["Aquariuma", "Flamikin"])
+        self.assertIs(helpers.Flamikin, old_flamikin)
+        self.assertIs(old_flamikin.get_evolution(), helpers.Infernoth)
+        self.assertEqual(helpers.get_evolution_table()[helpers.Infernoth].deltas[3], helpers.Infernox.get_simple_stats().get_max_hp() - 50)
+        self.assertIs(helpers.Aquariuma.get_evolution(), helpers.Leviatitan)
+        self.assertIsNone(helpers.Sparkit.get_evolution())
+
+        # Only the replaced species get new handle classes.
+        pool = MonsterPool(capacity=2)
+        self.assertIs(type(pool.spawn(helpers.Flamikin)), old_handles[0])
+        self.assertIsNot(type(pool.spawn(helpers.Infernoth)), old_handles[1])
+        self.assertIs(type(pool.spawn(helpers.Infernoth)).species, helpers.Infernoth)
+
+    @number("20.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_curves_follow_loaded_catalog(self):
+        helpers._curves.clear()
+        try:
+            loaded = helpers.catalog_hash()
+            curves = helpers.get_level_curves(5, simple_mode=True)
+
+            def edit(monsters):
+                monsters["Flamikin"]["simple"]["attack"] = 9
+            self.edit_catalog(edit)
+            # Until the reload the curves are still those of the loaded classes, in memory and on disk.
+            self.assertEqual(helpers.catalog_hash(), loaded)
+            self.assertIs(helpers.get_level_curves(5, simple_mode=True), curves)
+            helpers._curves.clear()
+            self.assertEqual(helpers.get_level_curves(5, simple_mode=True).tolist(), curves.tolist())
+
+            helpers.reload_catalog()
+            self.assertNotEqual(helpers.catalog_hash(), loaded)
+            catalog = helpers.get_all_monsters()
+            i = [catalog[j] for j in range(len(catalog))].index(helpers.Flamikin)
+            self.assertEqual(helpers.get_level_curves(5, simple_mode=True)[i, 0].tolist(), [9] * 5)
+        finally:
+            helpers._curves.clear()
+
+    @number("20.4")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_dangling_evolution(self):
+        catalog = helpers.get_all_monsters()
+        links = {catalog[i]: catalog[i].evolution_class for i in range(len(catalog))}
+        old_flamikin = helpers.Flamikin
+        loaded = helpers.catalog_hash()
+
+        def edit(monsters):
+            monsters["Aquariuma"]["evolution"] = "Leviatitan"
+            monsters["Flamikin"]["simple"]["attack"] = 9
+            monsters["Vineon"]["evolution"] = "Nowhere"
+        self.edit_catalog(edit)
+        self.assertRaises(ValueError, helpers.reload_catalog)
+
+        # Nothing was applied, not even the links of the species before Vineon.
+        self.assertIs(helpers.get_all_monsters(), catalog)
+        self.assertEqual({species: species.evolution_class for species in links}, links)
+        self.assertIs(helpers.Flamikin, old_flamikin)
+        self.assertEqual(helpers.Flamikin().get_attack(), 3)
+        self.assertEqual(helpers.catalog_hash(), loaded)
+
+    @number("20.5")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_reload_carries_curves(self):
+        helpers._curves.clear()
+        try:
+            before = {simple_mode: helpers.get_level_curves(8, simple_mode) for simple_mode in (True, False)}
+            old_catalog = helpers.get_all_monsters()
+
+            def edit(monsters):
+                monsters["Flamikin"]["simple"]["attack"] = 9
+                monsters["Vineon"]["removed"] = True
+            self.edit_catalog(edit)
+            with mock.patch.object(helpers, "_fill_curves", wraps=helpers._fill_curves) as fill:
+                helpers.reload_catalog()
+                catalog = helpers.get_all_monsters()
+                flamikin = [catalog[i] for i in range(len(catalog))].index(helpers.Flamikin)
+                self.assertEqual([list(call.args[2]) for call in fill.call_args_list], [[flamikin], [flamikin]])
+                after = {simple_mode: helpers.get_level_curves(8, simple_mode) for simple_mode in (True, False)}
+                self.assertEqual(fill.call_count, 2)
+
+            old_rows = {old_catalog[i]: i for i in range(len(old_catalog))}
+            for simple_mode in (True, False):
+                fresh = np.empty_like(after[simple_mode])
+                helpers._fill_curves(fresh, catalog, range(len(catalog)), simple_mode)
+                self.assertEqual(after[simple_mode].tolist(), fresh.tolist())
+                for i in range(len(catalog)):
+                    if catalog[i] in old_rows:
+                        self.assertEqual(after[simple_mode][i].tolist(), before[simple_mode][old_rows[catalog[i]]].tolist())
+        finally:
+            helpers._curves.clear()
+
+    @number("20.6")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_evolution_cycle(self):
+        catalog = helpers.get_all_monsters()
+        links = {catalog[i]: catalog[i].evolution_class for i in range(len(catalog))}
+        table = helpers.get_evolution_table()
+        index = helpers.get_catalog_index()
+        loaded = helpers.catalog_hash()
+        old_flamikin = helpers.Flamikin
+
+        def edit(monsters):
+            monsters["Flamikin"]["simple"]["attack"] = 9
+            monsters["Infernox"]["evolution"] = "Flamikin"
+        self.edit_catalog(edit)
+        self.assertRaises(ValueError, helpers.reload_catalog)
+
+        self.assertIs(helpers.get_all_monsters(), catalog)
+        self.assertEqual({species: species.evolution_class for species in links}, links)
+        self.assertIsNone(helpers.Infernox.get_evolution())
+        self.assertIs(helpers.get_evolution_table(), table)
+        self.assertIs(helpers.get_catalog_index(), index)
+        self.assertEqual(helpers.catalog_hash(), loaded)
+        self.assertIs(helpers.Flamikin, old_flamikin)
+        flamikin = helpers.Flamikin()
+        flamikin.level_up()
+        flamikin.evolve(in_place=True)
+        self.assertIs(type(flamikin), helpers.Infernoth)
@@ -5,6 +5,8 @@ from ed_utils.timeout import timeout
 
 from elements import EffectivenessCalculator, Element
 
+from data_structures.referential_array import ArrayR
+
 class TestElementEffectiveness(TestCase):
 
     @number("2.1")
@@ -16,3 +18,54 @@ class TestElementEffectiveness(TestCase):
         self.assertEqual(EffectivenessCalculator.get_effectiveness(Element.NORMAL, Element.GHOST), 0)
         self.assertEqual(EffectivenessCalculator.get_effectiveness(Element.DRAGON, Element.DRAGON), 2)
         self.assertEqual(EffectivenessCalculator.get_effectiveness(Element.WATER, Element.GRASS), 0.5)
+
+    @number("2.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_dense_matrix(self):
+        with open("type_effectiveness.csv") as f:
+            rows = [line.split(",") for line in f.read().strip().split("\n")]
+        header = [name.upper() for name in rows[0]]
+        for type1 in Element:
+            for type2 in Element:
+                expected = float(rows[1 + header.index(type1.name)][header.index(type2.name)])
+                self.assertEqual(EffectivenessCalculator.get_effectiveness(type1, type2), expected)
+                self.assertEqual(EffectivenessCalculator.get_effectiveness_by_name(type1.name, type2.name), expected)
+
+        types1 = [elem.value for elem in Element] * 3
+        types2 = [elem.value for elem in reversed(list(Element))] * 3
+        self.assertEqual(
+            EffectivenessCalculator.get_effectiveness_many(types1, types2).tolist(),
+            [EffectivenessCalculator.get_effectiveness(Element(t1), Element(t2)) for t1, t2 in zip(types1, types2)],
+        )
+
+    @number("2.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_other_element_counts(self):
+        original = EffectivenessCalculator.instance
+        try:
+            EffectivenessCalculator.instance = EffectivenessCalculator(
+                ArrayR.from_list(["Fire", "Water", "Grass"]),
+                ArrayR.from_list([0.5, 0.5, 2, 2, 0.5, 0.5, 0.5, 2, 0.5]),
+            )
+            self.assertEqual(EffectivenessCalculator.get_effectiveness(Element.WATER, Element.FIRE), 2)
+            self.assertEqual(EffectivenessCalculator.get_effectiveness(Element.GRASS, Element.WATER), 2)
+            self.assertRaises(ValueError, lambda: EffectivenessCalculator.get_effectiveness(Element.ICE, Element.FIRE))
+
+            names = ["Fire", "Water", "Sound"] + [elem.name.title() for elem in Element if elem.value > 2]
+            values = [1.0] * (len(names) ** 2)
+            values[2 * len(names) + 1] = 4.0
+            EffectivenessCalculator.instance = EffectivenessCalculator(ArrayR.from_list(names), ArrayR.from_list(values))
+            self.assertEqual(EffectivenessCalculator.get_effectiveness_by_name("sound", "water"), 4.0)
+            sound = EffectivenessCalculator.index_of("Sound")
+            self.assertGreater(sound, max(elem.value for elem in Element))
+            self.assertEqual(EffectivenessCalculator.index_of("Water"), Element.WATER.value)
+            self.assertEqual(
+                EffectivenessCalculator.get_effectiveness_many([sound, Element.WATER.value, sound], [Element.WATER.value, sound, sound]).tolist(),
+                [4.0, 1.0, 1.0],
+            )
+            self.assertEqual(EffectivenessCalculator.get_effectiveness(Element.STEEL, Element.FIRE), 1.0)
+            self.assertRaises(ValueError, lambda: EffectivenessCalculator(ArrayR.from_list(names), ArrayR.from_list([1.0])))
+        finally:
+            EffectivenessCalculator.instance = original
@@ -0,0 +1,83 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+from random_gen import RandomGen
+
+import instrumentation
+import patches
+from battle import Battle
+from data_structures.stack_adt import ArrayStack
+from policy import AttackPolicy
+from team import MonsterTeam
+
+
+class TestInstrumentation(TestCase):
+
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.reset()
+
+    @number("12.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_counts(self):
+        original = Battle.process_turn
+        RandomGen.set_seed(4)
+        team1 = MonsterTeam(MonsterTeam.TeamMode.FRONT, MonsterTeam.SelectionMode.RANDOM, policy=AttackPolicy())
+        team2 = MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM, policy=AttackPolicy())
+
+        instrumentation.enable()
+        self.assertTrue(instrumentation.is_enabled())
+        b = Battle(verbosity=0)
+        b.battle(team1, team2)
+        team1.regenerate_team()
+        counts = instrumentation.snapshot()
+        self.assertEqual(counts["Battle.process_turn"][0], b.turn_number)
+        self.assertEqual(counts["MonsterTeam.regenerate_team"][0], 1)
+        self.assertGreater(counts["ArrayStack.pop"][0], 0)
+        self.assertGreater(counts["CircularQueue.serve"][0], 0)
+        self.assertGreaterEqual(counts["Battle.process_turn"][1], 0)
+        self.assertIn("Battle.process_turn", instrumentation.report())
+
+        instrumentation.disable()
+        self.assertIs(Battle.process_turn, original)
+        self.assertFalse(hasattr(ArrayStack.push, "__wrapped__"))
+        team1.regenerate_team()
+        self.assertEqual(instrumentation.snapshot()["MonsterTeam.regenerate_team"][0], 1)
+        instrumentation.reset()
+        self.assertEqual(instrumentation.snapshot(), {})
+
+    @number("12.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_interleaved_wrappers(self):
+        original = Battle.process_turn
+        owner = object()
+        calls = []
+
+        def make_wrapper(function):
+            def logged(*args, **kwargs):
+                calls.append(function)
+                return function(*args, **kwargs)
+            return logged
+
+        instrumentation.enable()
+        patches.wrap(owner, Battle, "process_turn", make_wrapper)
+        instrumentation.disable()
+        self.assertFalse(instrumentation.is_enabled())
+        self.assertTrue(patches.is_wrapped(owner))
+        self.assertIs(patches.original(Battle, "process_turn"), original)
+
+        # Only the other owner's wrapper is left, directly around the original.
+        RandomGen.set_seed(4)
+        team1 = MonsterTeam(MonsterTeam.TeamMode.FRONT, MonsterTeam.SelectionMode.RANDOM, policy=AttackPolicy())
+        team2 = MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM, policy=AttackPolicy())
+        Battle(verbosity=0).battle(team1, team2)
+        self.assertEqual(set(calls), {original})
+        self.assertEqual(instrumentation.snapshot(), {})
+
+        patches.unwrap(owner)
+        self.assertIs(Battle.__dict__["process_turn"], original)
+        self.assertIs(ArrayStack.__dict__["push"], patches.original(ArrayStack, "push"))
+        self.assertFalse(hasattr(ArrayStack.push, "__wrapped__"))
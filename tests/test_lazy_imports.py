@@ -0,0 +1,28 @@
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from benchmarks.bench_import_time import CHECK, MODULES
+
+
+class TestLazyImports(TestCase):
+
+    @number("18.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_imports_load_nothing(self):
+        env = dict(os.environ, PYTHONPATH=os.getcwd())
+        code = "".join(f"import {module}\n" for module in MODULES) + CHECK.format(module=", ".join(MODULES))
+        # Both load on first use.
+        code += (
+            "from helpers import Flamikin\n"
+            "from elements import Element\n"
+            "assert Flamikin.get_name() == 'Flamikin'\n"
+            "assert EffectivenessCalculator.get_effectiveness(Element.FIRE, Element.WATER) == 0.5\n"
+        )
+        result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
@@ -0,0 +1,89 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+import numpy as np
+
+import helpers
+from stats import ComplexStats
+
+from data_structures.referential_array import ArrayR
+
+
+class TestLevelCurves(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_dir = helpers.CACHE_DIR
+        helpers.CACHE_DIR = self.directory.name
+        helpers._curves.clear()
+
+    def tearDown(self):
+        helpers.CACHE_DIR = self.cache_dir
+        helpers._curves.clear()
+        self.directory.cleanup()
+
+    @number("15.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_curves_match_monsters(self):
+        monsters = helpers.get_all_monsters()
+        for simple_mode in (True, False):
+            curves = helpers.get_level_curves(20, simple_mode=simple_mode)
+            self.assertEqual(curves.shape, (len(monsters), 4, 20))
+            for i in range(len(monsters)):
+                for level in (1, 7, 20):
+                    monster = monsters[i](simple_mode=simple_mode, level=level)
+                    self.assertEqual(
+                        curves[i, :, level - 1].tolist(),
+                        [monster.get_attack(), monster.get_defense(), monster.get_speed(), monster.get_max_hp()],
+                    )
+
+    @number("15.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_disk_cache(self):
+        curves = helpers.get_level_curves(10)
+        self.assertIs(helpers.get_level_curves(10), curves)
+        files = os.listdir(self.directory.name)
+        self.assertEqual(files, [f"curves-{helpers.catalog_hash()}-complex-10.npy"])
+        helpers._curves.clear()
+        reloaded = helpers.get_level_curves(10)
+        self.assertIsNot(reloaded, curves)
+        self.assertEqual(reloaded.tolist(), curves.tolist())
+
+    @number("15.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_vectorised_formulas(self):
+        cs = ComplexStats(
+            ArrayR.from_list(["level", "3", "power", "1", "2", "3", "middle", "*"]),
+            ArrayR.from_list(["level", "5", "-", "sqrt", "1", "10", "middle"]),
+            ArrayR.from_list(["7"]),
+            ArrayR.from_list(["level", "2", "/"]),
+        )
+        levels = list(range(5, 60))
+        for formula in (cs.attack, cs.defense, cs.speed, cs.max_hp):
+            self.assertEqual(formula.evaluate_many(levels).tolist(), [formula(level) for level in levels])
+
+        # Past the range of int64 the values stay exact Python ints.
+        huge = ComplexStats(*[ArrayR.from_list(["level", "20", "power"])] * 4).attack
+        levels = [[1, 10], [20, 10]]
+        self.assertEqual(huge.evaluate_many(levels).tolist(), [[huge(level) for level in row] for row in levels])
+        self.assertEqual(huge.evaluate_many([1, 2]).dtype, np.int64)
+
+    @number("15.4")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_unwritable_cache(self):
+        # A cache directory that cannot be created, because its parent is a file.
+        blocker = os.path.join(self.directory.name, "blocker")
+        with open(blocker, "w") as f:
+            f.write("")
+        helpers.CACHE_DIR = os.path.join(blocker, "cache")
+        curves = helpers.get_level_curves(6, simple_mode=True)
+        self.assertEqual(curves.shape[2], 6)
+        self.assertIs(helpers.get_level_curves(6, simple_mode=True), curves)
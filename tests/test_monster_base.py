@@ -4,9 +4,12 @@ from ed_utils.decorators import number, visibility
 from ed_utils.timeout import timeout
 
 from monster_base import MonsterBase
+from data_structures.referential_array import ArrayR
+from helpers import get_evolution_table
+from team import MonsterTeam
 # These classes inherit from MonsterBase,
 # but you don't need to implement them explicitly.
-from helpers import Infernox, Ironclad, Metalhorn
+from helpers import Flamikin, Infernoth, Infernox, Ironclad, Metalhorn
 
 class TestMonsters(TestCase):
 
@@ -72,3 +75,65 @@ class TestMonsters(TestCase):
         self.assertEqual(t.get_max_hp(), 14)
         self.assertEqual(t.get_hp(), 12)
 
+
+    @number("1.6")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_cached_stats(self):
+        t:MonsterBase = Metalhorn(simple_mode=False, level=2)
+        complex_stats = Metalhorn.get_complex_stats()
+        self.assertEqual(t.cached_stats, (
+            complex_stats.get_attack(2), complex_stats.get_defense(2), complex_stats.get_speed(2), complex_stats.get_max_hp(2),
+        ))
+        t.level_up()
+        self.assertEqual(t.get_speed(), complex_stats.get_speed(3))
+        self.assertEqual(t.get_hp(), complex_stats.get_max_hp(3))
+        t.simple_mode = True
+        self.assertEqual(t.get_attack(), Metalhorn.get_simple_stats().get_attack())
+        self.assertEqual(t.get_max_hp(), Metalhorn.get_simple_stats().get_max_hp())
+
+        t:MonsterBase = Metalhorn(simple_mode=False, level=1)
+        t.level_up()
+        evolved = t.evolve()
+        self.assertEqual(evolved.get_defense(), evolved.get_complex_stats().get_defense(2))
+
+    @number("1.7")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_evolution_table(self):
+        table = get_evolution_table()
+        self.assertIs(table[Flamikin].next, Infernoth)
+        self.assertEqual([table[species].depth for species in (Flamikin, Infernoth, Infernox)], [0, 1, 2])
+        self.assertIs(table[Flamikin].final, Infernox)
+        self.assertIs(table[Infernox].final, Infernox)
+        self.assertIsNone(table[Infernox].deltas)
+        before, after = Metalhorn.get_simple_stats(), Ironclad.get_simple_stats()
+        self.assertEqual(table[Metalhorn].deltas[3], after.get_max_hp() - before.get_max_hp())
+
+    @number("1.8")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_evolve_in_place(self):
+        for simple_mode in (True, False):
+            team = MonsterTeam(
+                team_mode=MonsterTeam.TeamMode.BACK,
+                selection_mode=MonsterTeam.SelectionMode.PROVIDED,
+                provided_monsters=ArrayR.from_list([Metalhorn, Flamikin]),
+            )
+            t:MonsterBase = team.team.array[0]
+            t.simple_mode = simple_mode
+            t.level_up()
+            t.set_hp(t.get_hp() - 3)
+            expected = t.evolve()
+            self.assertIs(t.evolve(in_place=True), t)
+            self.assertIsInstance(t, Ironclad)
+            self.assertEqual(str(t), str(expected))
+            self.assertEqual(t.get_attack(), expected.get_attack())
+            self.assertFalse(t.ready_to_evolve())
+            self.assertIs(team.retrieve_from_team(), t)
+
+        class MockedMetalhorn(Metalhorn):
+            pass
+        t = MockedMetalhorn(simple_mode=True, level=2)
+        t.level_up()
+        self.assertRaises(ValueError, lambda: t.evolve(in_place=True))
@@ -0,0 +1,138 @@
+import copy
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from battle import Battle
+from monster_base import MonsterBase
+from monster_pool import MonsterPool
+from team import MonsterTeam
+from helpers import Flamikin, Aquariuma, Vineon, Strikeon, Gustwing
+
+from data_structures.referential_array import ArrayR
+
+
+class TestMonsterPool(TestCase):
+
+    @number("16.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_handles_match_monsters(self):
+        pool = MonsterPool(capacity=2)
+        spawned = []
+        for simple_mode in (True, False):
+            for level in (1, 4):
+                pooled = pool.spawn(Flamikin, simple_mode, level)
+                monster = Flamikin(simple_mode, level)
+                self.assertIsInstance(pooled, MonsterBase)
+                self.assertEqual(type(pooled).__name__, "Flamikin")
+                for getter in ("get_attack", "get_defense", "get_speed", "get_max_hp", "get_hp", "get_level", "get_element"):
+                    self.assertEqual(getattr(pooled, getter)(), getattr(monster, getter)(), getter)
+                pooled.set_hp(pooled.get_hp() - 2)
+                monster.set_hp(monster.get_hp() - 2)
+                pooled.level_up()
+                monster.level_up()
+                self.assertEqual(pooled.get_hp(), monster.get_hp())
+                self.assertTrue(pooled.ready_to_evolve())
+                evolved = pooled.evolve()
+                spawned += [pooled, evolved]
+                self.assertEqual(evolved.get_name(), Flamikin.get_evolution().get_name())
+                self.assertEqual(evolved.get_hp(), monster.evolve().get_hp())
+        self.assertEqual(len(pool), 8)
+        self.assertEqual(pool.capacity, 8)
+
+        pooled = pool.spawn(Flamikin, level=2)
+        pooled.level_up()
+        expected = pooled.evolve()
+        self.assertIs(pooled.evolve(in_place=True), pooled)
+        self.assertEqual((str(pooled), pooled.index), (str(expected), 8))
+        self.assertFalse(pooled.ready_to_evolve())
+
+    @number("16.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_free_list(self):
+        pool = MonsterPool(capacity=4)
+        monsters = [pool.spawn(Vineon) for _ in range(4)]
+        pool.free(monsters[1])
+        pool.free(monsters[3])
+        self.assertEqual(len(pool), 2)
+        self.assertRaises(ValueError, lambda: pool.free(monsters[3]))
+        self.assertRaises(IndexError, lambda: pool.handle(3))
+        monsters[3] = pool.spawn(Gustwing, level=2)
+        self.assertEqual(monsters[3].index, 3)
+        self.assertEqual(pool.handle(3).get_name(), Gustwing.get_name())
+        monsters[1] = pool.spawn(Aquariuma)
+        self.assertEqual(monsters[1].index, 1)
+        monsters.append(pool.spawn(Strikeon))
+        self.assertEqual(pool.capacity, 8)
+        self.assertEqual(pool.handle(0).get_name(), Vineon.get_name())
+
+        monsters[0].set_hp(3)
+        copied = copy.copy(monsters[0])
+        self.assertNotEqual(copied, monsters[0])
+        self.assertEqual((copied.get_name(), copied.get_hp()), (Vineon.get_name(), 3))
+        copied.set_hp(1)
+        self.assertEqual(monsters[0].get_hp(), 3)
+
+    @number("16.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_pooled_battle(self):
+        pool = MonsterPool()
+        matchups = [
+            ([Flamikin, Aquariuma], [Strikeon, Vineon]),
+            ([Strikeon, Gustwing, Aquariuma], [Aquariuma]),
+        ]
+        for first, second in matchups:
+            results = []
+            for spawn in (lambda species: species, lambda species: lambda: pool.spawn(species)):
+                team1 = MonsterTeam(
+                    team_mode=MonsterTeam.TeamMode.BACK,
+                    selection_mode=MonsterTeam.SelectionMode.PROVIDED,
+                    provided_monsters=ArrayR.from_list([spawn(species) for species in first]),
+                )
+                team2 = MonsterTeam(
+                    team_mode=MonsterTeam.TeamMode.OPTIMISE,
+                    selection_mode=MonsterTeam.SelectionMode.PROVIDED,
+                    provided_monsters=ArrayR.from_list([spawn(species) for species in second]),
+                )
+                team1.choose_action = lambda out, team: Battle.Action.ATTACK
+                team2.choose_action = lambda out, team: Battle.Action.ATTACK
+                b = Battle(verbosity=0)
+                results.append((b.battle(team1, team2), b.turn_number))
+            self.assertEqual(results[0], results[1])
+
+    @number("16.4")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_dropped_handles(self):
+        pool = MonsterPool(capacity=4)
+        self.assertIs(type(pool.spawn(Flamikin)), type(MonsterPool(capacity=1).spawn(Flamikin)))
+        self.assertEqual(len(pool), 0)
+
+        monster = pool.spawn(Vineon)
+        other = pool.handle(monster.index)
+        copied = copy.copy(monster)
+        self.assertEqual(len(pool), 2)
+        del copied
+        self.assertEqual(len(pool), 1)
+        del monster
+        self.assertEqual(other.get_name(), Vineon.get_name())
+        del other
+        self.assertEqual(len(pool), 0)
+
+        team = MonsterTeam(
+            team_mode=MonsterTeam.TeamMode.FRONT,
+            selection_mode=MonsterTeam.SelectionMode.PROVIDED,
+            provided_monsters=ArrayR.from_list([lambda: pool.spawn(Strikeon), lambda: pool.spawn(Gustwing)]),
+        )
+        for _ in range(5):
+            clone = team.clone()
+            clone.regenerate_team()
+        self.assertEqual(len(pool), 4)
+        del clone
+        self.assertEqual(len(pool), 2)
+        # At most two clones are alive at once, so the slots of the others were reused.
+        self.assertEqual(pool.capacity, 8)
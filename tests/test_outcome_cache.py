@@ -0,0 +1,94 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+from random_gen import RandomGen
+
+from battle import Battle
+from outcome_cache import OutcomeCache
+from policy import AttackPolicy, Policy
+from search_policy import MCTSPolicy
+from team import MonsterTeam
+
+
+def random_team(**kwargs) -> MonsterTeam:
+    return MonsterTeam(
+        team_mode=RandomGen.random_choice(list(MonsterTeam.TeamMode)),
+        selection_mode=MonsterTeam.SelectionMode.RANDOM,
+        sort_key=RandomGen.random_choice(list(MonsterTeam.SortMode)),
+        policy=AttackPolicy(),
+        **kwargs,
+    )
+
+
+class CountingPolicy(Policy):
+
+    def __init__(self) -> None:
+        self.decisions = 0
+
+    def decide(self, currently_out, enemy):
+        self.decisions += 1
+        return Battle.Action.ATTACK
+
+
+class TestOutcomeCache(TestCase):
+
+    @number("11.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_replayed_matchups(self):
+        RandomGen.set_seed(99)
+        pairs = [(random_team(), random_team()) for _ in range(5)]
+        cache = OutcomeCache(max_size=3)
+        b = Battle(verbosity=0, outcome_cache=cache)
+        plain = Battle(verbosity=0)
+        for round in range(2):
+            for team1, team2 in pairs:
+                team1.regenerate_team()
+                team2.regenerate_team()
+                result = b.battle(team1, team2)
+                turns = b.turn_number
+                team1.regenerate_team()
+                team2.regenerate_team()
+                self.assertEqual((result, turns), (plain.battle(team1, team2), plain.turn_number))
+        # Five matchups do not fit in three entries, so every lookup missed.
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (0, 10, 3))
+
+        cache.clear()
+        for round in range(3):
+            team1, team2 = pairs[0]
+            team1.regenerate_team()
+            team2.regenerate_team()
+            b.battle(team1, team2)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+        self.assertIsNone(b.out1)
+        self.assertIsNone(b.out2)
+
+    @number("11.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_bypass(self):
+        RandomGen.set_seed(3)
+        team1 = random_team()
+        team2 = random_team()
+        cache = OutcomeCache()
+        team1.choose_action = lambda out, enemy: Battle.Action.ATTACK
+        Battle(verbosity=0, outcome_cache=cache).battle(team1, team2)
+        del team1.choose_action
+
+        team1.regenerate_team()
+        team2.regenerate_team()
+        Battle(verbosity=0, time_limit=10, outcome_cache=cache).battle(team1, team2)
+
+        team1.regenerate_team()
+        team2.regenerate_team()
+        team2.policy = MCTSPolicy(time_budget=0.001)
+        Battle(verbosity=0, max_turns=20, outcome_cache=cache).battle(team1, team2)
+
+        # Policies are only cached if they opt in.
+        team1.regenerate_team()
+        team2.regenerate_team()
+        team2.policy = CountingPolicy()
+        Battle(verbosity=0, outcome_cache=cache).battle(team1, team2)
+        self.assertGreater(team2.policy.decisions, 0)
+        self.assertEqual((cache.bypasses, cache.hits, cache.misses, len(cache)), (4, 0, 0, 0))
@@ -0,0 +1,117 @@
+from unittest import TestCase
+
+import numpy as np
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+from random_gen import RandomGen
+
+from battle import Battle
+from batch_battle import BatchBattle
+from policy import AttackPolicy, CallablePolicy, HeuristicPolicy, DEFAULT_POLICY
+from team import MonsterTeam
+from helpers import Flamikin, Aquariuma, Vineon, Strikeon, get_all_monsters
+
+from data_structures.referential_array import ArrayR
+
+
+def random_team(**kwargs) -> MonsterTeam:
+    return MonsterTeam(
+        team_mode=RandomGen.random_choice(list(MonsterTeam.TeamMode)),
+        selection_mode=MonsterTeam.SelectionMode.RANDOM,
+        sort_key=RandomGen.random_choice(list(MonsterTeam.SortMode)),
+        **kwargs,
+    )
+
+
+class TestPolicy(TestCase):
+
+    @number("8.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_resolve_policy(self):
+        team = MonsterTeam(
+            team_mode=MonsterTeam.TeamMode.BACK,
+            selection_mode=MonsterTeam.SelectionMode.PROVIDED,
+            provided_monsters=ArrayR.from_list([Flamikin, Aquariuma]),
+        )
+        self.assertIs(team.resolve_policy(), DEFAULT_POLICY)
+        attack = AttackPolicy()
+        team.policy = attack
+        self.assertIs(team.resolve_policy(), attack)
+        self.assertEqual(team.choose_action(Flamikin(), Vineon()), Battle.Action.ATTACK)
+        # A choose_action assigned to the team still takes priority.
+        team.choose_action = lambda out, enemy: Battle.Action.SWAP
+        self.assertIsInstance(team.resolve_policy(), CallablePolicy)
+        self.assertEqual(team.resolve_policy().decide(Flamikin(), Vineon()), Battle.Action.SWAP)
+
+    @number("8.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_policy_battle(self):
+        def make_teams(**kwargs):
+            team1 = MonsterTeam(
+                team_mode=MonsterTeam.TeamMode.BACK,
+                selection_mode=MonsterTeam.SelectionMode.PROVIDED,
+                provided_monsters=ArrayR.from_list([Flamikin, Aquariuma]),
+                **kwargs,
+            )
+            team2 = MonsterTeam(
+                team_mode=MonsterTeam.TeamMode.FRONT,
+                selection_mode=MonsterTeam.SelectionMode.PROVIDED,
+                provided_monsters=ArrayR.from_list([Strikeon, Vineon]),
+                **kwargs,
+            )
+            return team1, team2
+
+        team1, team2 = make_teams()
+        team1.choose_action = lambda out, enemy: Battle.Action.ATTACK
+        team2.choose_action = lambda out, enemy: Battle.Action.ATTACK
+        b = Battle(verbosity=0)
+        expected = b.battle(team1, team2)
+        expected_turns = b.turn_number
+        b = Battle(verbosity=0)
+        self.assertEqual(b.battle(*make_teams(policy=AttackPolicy())), expected)
+        self.assertEqual(b.turn_number, expected_turns)
+
+    @number("8.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_decide_many(self):
+        RandomGen.set_seed(7)
+        monsters = [monster() for monster in get_all_monsters()]
+        pairs = [(RandomGen.random_choice(monsters), RandomGen.random_choice(monsters)) for _ in range(200)]
+        for out, enemy in pairs[::3]:
+            out.set_hp(RandomGen.randint(1, out.get_max_hp()))
+        states = np.array([
+            (out.get_speed(), out.get_hp(), enemy.get_speed(), enemy.get_hp()) for out, enemy in pairs
+        ])
+        for policy in (AttackPolicy(), HeuristicPolicy()):
+            self.assertEqual(
+                policy.decide_many(states).tolist(),
+                [policy.decide(out, enemy).value for out, enemy in pairs],
+            )
+        self.assertFalse(CallablePolicy(lambda out, enemy: Battle.Action.ATTACK).can_decide_many())
+        # Policies without a vectorised decide_many decide row by row.
+        heuristic = CallablePolicy(DEFAULT_POLICY.decide)
+        self.assertEqual(heuristic.decide_many(states).tolist(), DEFAULT_POLICY.decide_many(states).tolist())
+
+    @number("8.4")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_batch_mixed_policies(self):
+        attack = AttackPolicy()
+
+        def make_pairs():
+            RandomGen.set_seed(11)
+            return [
+                (random_team(policy=attack if i % 2 else None), random_team(policy=attack if i % 3 else None))
+                for i in range(30)
+            ]
+
+        results = BatchBattle(max_turns=100).battle_many(make_pairs())
+        expected = [Battle(verbosity=0, max_turns=100).battle(team1, team2) for team1, team2 in make_pairs()]
+        for result, scalar in zip(results, expected):
+            if result is not None:
+                self.assertEqual(result, scalar)
+        self.assertGreater(sum(result is not None for result in results), 15)
@@ -0,0 +1,95 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+import rulesets
+from battle import Battle
+from elements import EffectivenessCalculator, Element, element_id
+from helpers import Flamikin, Vineon
+from rulesets import RulesetRegistry
+from team import MonsterTeam
+
+from data_structures.referential_array import ArrayR
+
+
+class TestRulesets(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.registry = RulesetRegistry(cache_dir=os.path.join(self.directory.name, "cache"))
+        self.original = rulesets.registry
+        rulesets.registry = self.registry
+
+    def tearDown(self):
+        rulesets.registry = self.original
+        for ruleset in self.registry.rulesets.values():
+            ruleset.close()
+        self.directory.cleanup()
+
+    def write_variant(self, name, fire_vs_grass):
+        with open("type_effectiveness.csv") as f:
+            rows = [line.split(",") for line in f.read().strip().split("\n")]
+        header = [column.upper() for column in rows[0]]
+        rows[1 + header.index("FIRE")][header.index("GRASS")] = str(fire_vs_grass)
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w") as f:
+            f.write("\n".join(",".join(row) for row in rows))
+        return path
+
+    @number("14.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_default_ruleset(self):
+        ruleset = self.registry.get(rulesets.DEFAULT)
+        for type1 in Element:
+            for type2 in Element:
+                self.assertEqual(
+                    ruleset.get_effectiveness(type1, type2), EffectivenessCalculator.get_effectiveness(type1, type2)
+                )
+        self.assertEqual(ruleset.effectiveness("Fire", "grass"), 2)
+        self.assertEqual(ruleset.get_effectiveness_by_id(Flamikin.get_element_id(), Vineon.get_element_id()), 2)
+        # Lookups read the mapped table itself.
+        self.assertIsInstance(ruleset.values, memoryview)
+        self.assertRaises(KeyError, lambda: ruleset.get_effectiveness_by_id(Element.FIRE.value, len(ruleset.rows)))
+        self.assertEqual(Flamikin.get_element_id(), Element.FIRE.value)
+        self.assertRaises(KeyError, lambda: ruleset.effectiveness("Fire", "Sound"))
+        self.assertIsNone(element_id("Sound"))
+        self.assertRaises(KeyError, lambda: self.registry.get("missing"))
+
+        # Another process only needs the compiled table.
+        workers = RulesetRegistry(cache_dir=self.registry.cache_dir)
+        for name, path in self.registry.paths().items():
+            workers.attach(name, path)
+        self.assertEqual(workers.get(rulesets.DEFAULT).effectiveness("Water", "Fire"), 2)
+        workers.get(rulesets.DEFAULT).close()
+
+    @number("14.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_battle_ruleset(self):
+        self.registry.register("weak_fire", self.write_variant("weak_fire.csv", 0.25))
+        self.registry.register("strong_fire", self.write_variant("strong_fire.csv", 4))
+        self.assertEqual(sorted(self.registry.names()), ["strong_fire", "weak_fire"])
+
+        plain = Battle(verbosity=0)
+        b = Battle(verbosity=0, ruleset="weak_fire")
+        for battle in (plain, b):
+            battle.out1 = Flamikin()
+            battle.out2 = Vineon()
+        base = plain.calc_damage(plain.out1, plain.out2)
+        self.assertEqual(b.calc_damage(b.out1, b.out2), base * 0.25)
+
+        # Registering the name again swaps the table in from the next battle.
+        self.registry.register("weak_fire", self.write_variant("weak_fire2.csv", 3))
+        self.assertEqual(b.calc_damage(b.out1, b.out2), base * 0.25)
+        b.start_battle(
+            MonsterTeam(MonsterTeam.TeamMode.FRONT, MonsterTeam.SelectionMode.PROVIDED,
+                        provided_monsters=ArrayR.from_list([Flamikin])),
+            MonsterTeam(MonsterTeam.TeamMode.FRONT, MonsterTeam.SelectionMode.PROVIDED,
+                        provided_monsters=ArrayR.from_list([Vineon])),
+        )
+        self.assertEqual(b.calc_damage(b.out1, b.out2), base * 3)
+        self.assertEqual(len(os.listdir(self.registry.cache_dir)), 3)
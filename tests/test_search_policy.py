@@ -0,0 +1,89 @@
+import time
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+from random_gen import RandomGen
+
+from battle import Battle
+from policy import AttackPolicy
+from search_policy import FixedPolicy, MCTSPolicy
+from team import MonsterTeam
+
+
+def random_team(mode, **kwargs) -> MonsterTeam:
+    return MonsterTeam(
+        team_mode=mode,
+        selection_mode=MonsterTeam.SelectionMode.RANDOM,
+        sort_key=RandomGen.random_choice(list(MonsterTeam.SortMode)),
+        **kwargs,
+    )
+
+
+class TestSearchPolicy(TestCase):
+
+    @number("9.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_snapshot_restore(self):
+        RandomGen.set_seed(5)
+        actions = [Battle.Action.SPECIAL, Battle.Action.SWAP, Battle.Action.ATTACK]
+        for mode1 in MonsterTeam.TeamMode:
+            for mode2 in MonsterTeam.TeamMode:
+                team1 = random_team(mode1, policy=AttackPolicy())
+                team2 = random_team(mode2, policy=AttackPolicy())
+                b = Battle(verbosity=0)
+                b.start_battle(team1, team2)
+                key = b.state_key()
+                snapshot = b.snapshot()
+                for turn in range(6):
+                    b.policy1 = FixedPolicy(actions[turn % 3])
+                    b.policy2 = FixedPolicy(actions[(turn + 1) % 3])
+                    if b.process_turn() is not None:
+                        break
+                b.restore(snapshot)
+                self.assertEqual(b.state_key(), key)
+                self.assertEqual(b.turn_number, 0)
+
+                # The restored battle plays out exactly like a fresh copy of it.
+                b.policy1 = b.policy2 = AttackPolicy()
+                results = []
+                for _ in range(2):
+                    b.restore(snapshot)
+                    result = None
+                    while result is None:
+                        result = b.process_turn()
+                    results.append((result, b.state_key()))
+                self.assertEqual(results[0], results[1])
+
+    @number("9.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_time_budget(self):
+        RandomGen.set_seed(10)
+        policy = MCTSPolicy(time_budget=0.02, table_size=50)
+        team1 = random_team(MonsterTeam.TeamMode.BACK, policy=policy)
+        team2 = random_team(MonsterTeam.TeamMode.FRONT, policy=AttackPolicy())
+        b = Battle(verbosity=0)
+        b.start_battle(team1, team2)
+        key = b.state_key()
+        start = time.perf_counter()
+        action = policy.decide(b.out1, b.out2)
+        self.assertLess(time.perf_counter() - start, 0.2)
+        self.assertIn(action, list(Battle.Action))
+        self.assertGreater(policy.iterations, 0)
+        self.assertLessEqual(len(policy.table), 50)
+        # Searching leaves the battle as it was.
+        self.assertEqual(b.state_key(), key)
+        self.assertIs(b.policy1, policy)
+
+    @number("9.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_finds_wins(self):
+        # Always attacking wins these battles, so the search must win them too.
+        for seed in (0, 12):
+            RandomGen.set_seed(seed)
+            team1 = random_team(MonsterTeam.TeamMode.BACK, policy=MCTSPolicy(time_budget=1, max_iterations=10))
+            team2 = random_team(MonsterTeam.TeamMode.FRONT, policy=AttackPolicy())
+            self.assertEqual(Battle(verbosity=0, max_turns=100).battle(team1, team2), Battle.Result.TEAM1)
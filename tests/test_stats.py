@@ -1,9 +1,11 @@
+import math
 from unittest import TestCase
 
 from ed_utils.decorators import number, visibility
 from ed_utils.timeout import timeout
 
-from stats import SimpleStats, ComplexStats
+from helpers import Flamikin
+from stats import SimpleStats, ComplexStats, compile_formula
 
 from data_structures.referential_array import ArrayR
 
@@ -59,3 +61,35 @@ class TestStats(TestCase):
         self.assertEqual(cs.get_defense(1), 8)
         self.assertEqual(cs.get_speed(5), 250)
         self.assertEqual(cs.get_max_hp(41), 6)
+
+    @number("1.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_compiled_formulas(self):
+        formula = ArrayR.from_list(["level", "2", "/", "1", "+", "sqrt"])
+        first = compile_formula(formula)
+        self.assertIs(compile_formula(ArrayR.from_list(["level", "2", "/", "1", "+", "sqrt"])), first)
+        self.assertEqual(first.max_depth, 2)
+        self.assertEqual(first(16), 3)
+        self.assertEqual(first.values, {16: 3})
+        cs = ComplexStats(formula, formula, formula, formula)
+        self.assertIs(cs.attack, cs.max_hp)
+        self.assertEqual(cs.get_speed(6), 2)
+        self.assertEqual(sorted(first.values), [6, 16])
+
+        self.assertEqual(compile_formula(ArrayR.from_list(["level", "inf", "*"]))(3), float("inf"))
+        self.assertTrue(math.isnan(compile_formula(ArrayR.from_list(["level", "nan", "+"]))(3)))
+
+        for bad in (["1", "+"], ["1", "2"], ["level", "middle"], ["level", "cube"], []):
+            self.assertRaises(ValueError, lambda: compile_formula(ArrayR.from_list(bad) if bad else ArrayR(0)))
+
+    @number("1.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_complex_mode_monster(self):
+        monster = Flamikin(simple_mode=False, level=3)
+        stats = Flamikin.get_complex_stats()
+        self.assertEqual(monster.get_attack(), stats.get_attack(3))
+        self.assertEqual(monster.get_hp(), stats.get_max_hp(3))
+        monster.level_up()
+        self.assertEqual(monster.get_speed(), stats.get_speed(4))
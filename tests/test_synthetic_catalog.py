@@ -0,0 +1,62 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+import elements
+import helpers
+import rulesets
+from benchmarks.synthetic_catalog import element_names, write_catalog
+from elements import EffectivenessCalculator
+from stats import CompiledFormula, SimpleStats
+
+
+class TestSyntheticCatalog(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    @number("21.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_synthetic_catalog(self):
+        monsters_path, csv_path = write_catalog(self.directory.name, 30, 25)
+        with open(monsters_path, "rb") as f:
+            records = helpers._parse_catalog(f.read())
+        self.assertEqual(len(records), 30)
+        names = {record[0] for record in records}
+        self.assertTrue(records[0][6])
+        for name, description, evolution, element, simple, complex, can_be_spawned in records:
+            self.assertTrue(evolution is None or evolution in names)
+            self.assertTrue(all(stat > 0 for stat in simple))
+            for tokens in complex:
+                formula = CompiledFormula(tokens)
+                self.assertTrue(all(formula(level) > 0 for level in range(1, 20)))
+
+        calculator = EffectivenessCalculator.from_csv(csv_path)
+        binary_path = os.path.join(self.directory.name, "synthetic.bin")
+        rulesets.compile_csv(csv_path, binary_path)
+        ruleset = rulesets.Ruleset("synthetic", binary_path)
+        try:
+            for name in element_names(25):
+                self.assertIn(ruleset.effectiveness(name, "Element25"), (0, 0.5, 1, 2))
+            # Elements that are not Element constants get no id, and are looked up by name.
+            ids = dict(elements._element_ids)
+            attacker, defender = (
+                helpers.MonsterBaseFactory(element, "", None, element, SimpleStats(1, 1, 1, 1), None, True)
+                for element in (element_names(25)[0], "Element25")
+            )
+            self.assertIsNone(defender.get_element_id())
+            self.assertEqual(
+                ruleset.get_monster_effectiveness(attacker, defender),
+                ruleset.effectiveness(attacker.get_element(), "Element25"),
+            )
+            self.assertEqual(elements._element_ids, ids)
+        finally:
+            ruleset.close()
+        self.assertEqual(len(calculator.element_names), 25)
@@ -7,7 +7,10 @@ from ed_utils.decorators import number, visibility
 from ed_utils.timeout import timeout
 from random_gen import RandomGen
 
+from policy import AttackPolicy, HeuristicPolicy
+from search_policy import MCTSPolicy
 from team import MonsterTeam
+from helpers import get_all_monsters
 from helpers import Flamikin, Aquariuma, Vineon, Normake, Thundrake, Rockodile, Mystifly, Strikeon, Faeboa, Soundcobra
 
 from data_structures.referential_array import ArrayR
@@ -259,3 +262,110 @@ class TestTeam(TestCase):
 
         self.assertEqual(len(team), 1)
         self.assertIsInstance(team.retrieve_from_team(), Flamikin)
+
+    @number("3.8")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_regenerate_and_clone(self):
+        def order(team):
+            out = []
+            while len(team) > 0:
+                monster = team.retrieve_from_team()
+                out.append((monster, monster.get_hp()))
+            return out
+
+        provided = ArrayR.from_list([Flamikin, Aquariuma, Vineon, Thundrake, Rockodile])
+        for mode in MonsterTeam.TeamMode:
+            team = MonsterTeam(
+                team_mode=mode,
+                selection_mode=MonsterTeam.SelectionMode.PROVIDED,
+                provided_monsters=provided,
+                sort_key=MonsterTeam.SortMode.SPEED,
+            )
+            clone = team.clone()
+            starting = order(team)
+            for monster, _ in starting:
+                self.assertIn(monster, [team.starting_monsters[i] for i in range(len(provided))])
+            team.regenerate_team()
+            items = [team.team.array[i] for i in range(len(team))]
+            team.special()
+            first = team.retrieve_from_team()
+            first.set_hp(1)
+            team.add_to_team(first)
+            team.regenerate_team()
+            self.assertEqual([team.team.array[i] for i in range(len(team))], items)
+            self.assertEqual(order(team), starting)
+
+            cloned = order(clone)
+            self.assertEqual([type(monster) for monster, _ in cloned], [type(monster) for monster, _ in starting])
+            self.assertEqual([hp for _, hp in cloned], [hp for _, hp in starting])
+            for monster, _ in cloned:
+                self.assertNotIn(monster, [monster for monster, _ in starting])
+            clone.regenerate_team()
+            self.assertEqual(clone.clone().sort_mode, MonsterTeam.SortMode.SPEED)
+
+    @number("3.9")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_random_mode_draws(self):
+        # The team a full scan over the catalog picks for each draw.
+        monsters = get_all_monsters()
+        spawnable = [monsters[i] for i in range(len(monsters)) if monsters[i].can_be_spawned()]
+        for seed in range(20):
+            RandomGen.set_seed(seed)
+            expected = []
+            for _ in range(3):
+                team_size = RandomGen.randint(1, MonsterTeam.TEAM_LIMIT)
+                expected.append([spawnable[RandomGen.randint(0, len(spawnable) - 1)] for _ in range(team_size)])
+            RandomGen.set_seed(seed)
+            for team_classes in expected:
+                team = MonsterTeam(team_mode=MonsterTeam.TeamMode.BACK, selection_mode=MonsterTeam.SelectionMode.RANDOM)
+                self.assertEqual([type(team.retrieve_from_team()) for _ in range(len(team))], team_classes)
+
+    @number("3.10")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_clone_policy(self):
+        provided = ArrayR.from_list([Flamikin, Aquariuma])
+        for policy in (HeuristicPolicy(), MCTSPolicy(time_budget=0.001, opponent_policy=AttackPolicy())):
+            team = MonsterTeam(
+                team_mode=MonsterTeam.TeamMode.FRONT,
+                selection_mode=MonsterTeam.SelectionMode.PROVIDED,
+                provided_monsters=provided,
+                policy=policy,
+            )
+            clone = team.clone()
+            self.assertIsNot(clone.policy, team.policy)
+            self.assertIs(type(clone.policy), type(policy))
+            self.assertIs(clone.resolve_policy(), clone.policy)
+        self.assertIsNot(clone.policy.table, policy.table)
+        self.assertIsNot(clone.policy.opponent_policy, policy.opponent_policy)
+        self.assertEqual(clone.policy.time_budget, policy.time_budget)
+
+    @number("3.11")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_regenerate_after_evolving(self):
+        for mode in MonsterTeam.TeamMode:
+            team = MonsterTeam(
+                team_mode=mode,
+                selection_mode=MonsterTeam.SelectionMode.PROVIDED,
+                provided_monsters=ArrayR.from_list([Flamikin, Aquariuma, Vineon]),
+                sort_key=MonsterTeam.SortMode.LEVEL,
+            )
+            starting = [team.starting_monsters[i] for i in range(3)]
+            for monster in starting:
+                monster.level_up()
+            starting[0].evolve(in_place=True)
+            starting[1].level_up()
+            self.assertIsNot(type(starting[0]), Flamikin)
+
+            clone = team.clone()
+            team.regenerate_team()
+            for regenerated in (team, clone):
+                monsters = [regenerated.starting_monsters[i] for i in range(3)]
+                self.assertEqual([type(monster) for monster in monsters], [Flamikin, Aquariuma, Vineon])
+                for monster in monsters:
+                    self.assertEqual((monster.get_level(), monster.get_original_level()), (1, 1))
+                    self.assertEqual(monster.get_hp(), type(monster)().get_hp())
+                    self.assertEqual(monster.get_attack(), type(monster)().get_attack())
@@ -0,0 +1,96 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+from random_gen import RandomGen
+
+import instrumentation
+from battle import Battle
+from policy import AttackPolicy
+from team import MonsterTeam
+import tracing
+from tracing import Tracer
+
+
+class TestTracing(TestCase):
+
+    @number("13.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_trace(self):
+        original = Battle.process_turn
+        tracer = Tracer(capacity=1000)
+        tracer.start()
+        try:
+            RandomGen.set_seed(4)
+            team1 = MonsterTeam(MonsterTeam.TeamMode.FRONT, MonsterTeam.SelectionMode.RANDOM, policy=AttackPolicy())
+            team2 = MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM, policy=AttackPolicy())
+            b = Battle(verbosity=0)
+            b.battle(team1, team2)
+            team1.regenerate_team()
+        finally:
+            tracer.stop()
+        self.assertIs(Battle.process_turn, original)
+
+        names = [event["name"] for event in tracer.events()]
+        self.assertEqual(names.count("MonsterTeam.select_randomly"), 2)
+        self.assertEqual(names.count("Battle.process_turn"), b.turn_number)
+        self.assertEqual(names[-2:], ["Battle.battle", "MonsterTeam.regenerate_team"])
+        # Turns are nested inside the battle.
+        battle = tracer.events()[-2]
+        for event in tracer.events():
+            if event["name"] == "Battle.process_turn":
+                self.assertGreaterEqual(event["ts"], battle["ts"])
+                self.assertLessEqual(event["ts"] + event["dur"], battle["ts"] + battle["dur"])
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trace.json")
+            tracer.export(path)
+            with open(path) as f:
+                self.assertEqual(json.load(f)["traceEvents"], tracer.events())
+
+    @number("13.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_ring_buffer(self):
+        tracer = Tracer(capacity=4)
+        for i in range(10):
+            tracer.record(f"span{i}", i, i + 0.5)
+        self.assertEqual(len(tracer), 4)
+        self.assertEqual(tracer.dropped, 6)
+        self.assertEqual([event["name"] for event in tracer.events()], ["span6", "span7", "span8", "span9"])
+        other = Tracer(capacity=4)
+        tracer.start()
+        try:
+            self.assertRaises(RuntimeError, other.start)
+        finally:
+            tracer.stop()
+        self.assertIsNone(Tracer.active)
+
+    @number("13.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_interleaved_with_instrumentation(self):
+        originals = {
+            (cls, method): cls.__dict__[method] for cls, method in instrumentation.TARGETS + tracing.SPANS
+        }
+        for order in (("enable", "start", "disable", "stop"), ("start", "enable", "stop", "disable")):
+            tracer = Tracer(capacity=100)
+            steps = {
+                "enable": instrumentation.enable,
+                "disable": instrumentation.disable,
+                "start": tracer.start,
+                "stop": tracer.stop,
+            }
+            try:
+                for step in order:
+                    steps[step]()
+            finally:
+                tracer.stop()
+                instrumentation.disable()
+                instrumentation.reset()
+            for (cls, method), function in originals.items():
+                self.assertIs(cls.__dict__[method], function, f"{cls.__name__}.{method} after {order}")
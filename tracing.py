@@ -0,0 +1,134 @@
+"""
+Timeline tracing of tower and battle runs, exported as Chrome trace JSON.
+
+While a `Tracer` is started, every method in SPANS records a span (its name,
+start and end time) into a preallocated ring buffer. Once the buffer is full
+the oldest spans are overwritten, so a long run keeps its most recent spans in
+bounded memory. `export` writes the spans in the Chrome trace event format,
+which chrome://tracing and https://ui.perfetto.dev can open.
+
+Nothing is wrapped until a tracer is started, so tracing is free while off.
+Wrappers go through the shared `patches` registry, so `instrumentation` can be
+enabled and disabled in between.
+
+Usage:
+```
+tracer = Tracer()
+tracer.start()
+tower_run()
+tracer.stop()
+tracer.export("tower.trace.json")
+```
+"""
+from __future__ import annotations
+
+import functools
+import json
+import os
+import time
+from array import array
+
+import patches
+from battle import Battle
+from team import MonsterTeam
+from tower import BattleTower
+
+SPANS = [
+    (BattleTower, "next_battle"),
+    (BattleTower, "generate_teams"),
+    (Battle, "battle"),
+    (Battle, "process_turn"),
+    (MonsterTeam, "regenerate_team"),
+    (MonsterTeam, "select_randomly"),
+    (MonsterTeam, "select_provided"),
+]
+
+
+class Tracer:
+    """
+    :capacity: The most spans kept. Older spans are overwritten once it is reached.
+    """
+
+    # The tracer whose wrappers are installed, if any.
+    active = None
+
+    def __init__(self, capacity: int = 1 << 20) -> None:
+        self.capacity = capacity
+        self.names = [None] * capacity
+        self.starts = array("d", bytes(8 * capacity))
+        self.ends = array("d", bytes(8 * capacity))
+        self.count = 0
+        self.origin = time.perf_counter()
+
+    def __len__(self) -> int:
+        """The number of spans held."""
+        return min(self.count, self.capacity)
+
+    @property
+    def dropped(self) -> int:
+        """The number of spans overwritten because the buffer was full."""
+        return max(0, self.count - self.capacity)
+
+    def record(self, name: str, start: float, end: float) -> None:
+        # O(1)
+        i = self.count % self.capacity
+        self.names[i] = name
+        self.starts[i] = start
+        self.ends[i] = end
+        self.count += 1
+
+    def _wrap(self, name: str, function):
+        perf_counter = time.perf_counter
+        record = self.record
+
+        @functools.wraps(function)
+        def traced(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(name, start, perf_counter())
+
+        return traced
+
+    def start(self) -> None:
+        """Starts recording spans for every method in SPANS."""
+        if Tracer.active is self:
+            return
+        if Tracer.active is not None:
+            raise RuntimeError("Another tracer is already started.")
+        Tracer.active = self
+        for cls, method in SPANS:
+            patches.wrap(self, cls, method, functools.partial(self._wrap, f"{cls.__name__}.{method}"))
+
+    def stop(self) -> None:
+        """Removes the tracing wrappers. The spans are kept."""
+        patches.unwrap(self)
+        if Tracer.active is self:
+            Tracer.active = None
+
+    def clear(self) -> None:
+        self.count = 0
+
+    def events(self) -> list[dict]:
+        """The spans held, oldest first, as Chrome trace complete ("X") events in microseconds."""
+        pid = os.getpid()
+        events = []
+        first = self.count - len(self)
+        for n in range(first, self.count):
+            i = n % self.capacity
+            events.append({
+                "name": self.names[i],
+                "cat": self.names[i].split(".")[0],
+                "ph": "X",
+                "ts": (self.starts[i] - self.origin) * 1e6,
+                "dur": (self.ends[i] - self.starts[i]) * 1e6,
+                "pid": pid,
+                "tid": 0,
+            })
+        return events
+
+    def export(self, path: str) -> None:
+        """Writes the spans held to `path` as Chrome trace JSON."""
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.events(), "displayTimeUnit": "ms"}, f)